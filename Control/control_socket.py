@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from Files.config_files import merge_external_config, save_current_config
+from Files.config_watcher import start_config_watcher
+from Files.config_writer import start_config_writer, stop_config_writer
+from Files.log_sink import start_log_sink, stop_log_sink
+from Screen.hotplug import start_hotplug_monitor
+from Screen.screen_detection import update_detected_screens
+from Screen.topology import get_topology
+from Scripts.apply_queue import get_apply_lock, start_apply_queue
+from Scripts.config_setter import apply_assigned_screens, set_screen_wallpaper
+from Scripts.launch_plan import OPTION_CHOICES, PROPERTY_NAME, GlobalOptions
+from Scripts.profiles import activate_profile, get_profiles, save_profile
+from Wallpaper_Engine.idle_monitor import IDLE_DEFAULTS, start_idle_monitor
+from Wallpaper_Engine.metrics import get_metrics, record_metric
+from Wallpaper_Engine.playlists import PLAYLIST_DEFAULTS, PLAYLIST_MODES, parse_times, start_playlists
+from Wallpaper_Engine.power_profiles import POWER_DEFAULTS, start_power_profiles
+from Wallpaper_Engine.process_manager import check_wallpaper_process
+from Wallpaper_Engine.scheduling import IO_CLASSES, SCHED_POLICIES, SCHEDULING_DEFAULTS, parse_cpu_list
+from Wallpaper_Engine.supervisor import start_supervisor
+from Wallpaper_Engine.systemd_backend import LAUNCHER_DEFAULTS
+
+# Operations that change the target configuration and need an apply afterwards
+MUTATING_OPS = ("assign", "unassign", "set_properties", "set_config", "switch_profile")
+
+# The Screen config keys set_config accepts, with the default giving each one's type
+CONFIG_DEFAULTS = {
+    **vars(GlobalOptions()),
+    "scaling": "fill",
+    **LAUNCHER_DEFAULTS,
+    **SCHEDULING_DEFAULTS,
+    **IDLE_DEFAULTS,
+    **POWER_DEFAULTS,
+    **PLAYLIST_DEFAULTS,
+}
+CONFIG_CHOICES = {
+    **OPTION_CHOICES,
+    "launcher": ("script", "systemd"),
+    "sched_policy": tuple(SCHED_POLICIES),
+    "io_class": tuple(IO_CLASSES),
+    "battery_profile": ("reduced", "static"),
+    "playlist_mode": PLAYLIST_MODES,
+}
+
+
+def get_socket_path():
+    """Get the control socket path (per-user runtime directory)"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/wallpaper-engine-{os.getuid()}"
+    os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+    return os.path.join(runtime_dir, "wallpaper-engine-configurator.sock")
+
+
+def get_status(self):
+    """Return the current assignments and engine state"""
+    screens = {}
+    for screen in self.detected_screens:
+        wallpaper_id = self.selected_wallpapers.get(screen)
+        info = self.wallpapers.get(wallpaper_id) if wallpaper_id else None
+        screens[screen] = {
+            "wallpaper": wallpaper_id,
+            "title": info["title"] if info else None,
+            "config": self.screen_configs.get(screen, {}),
+        }
+    return {
+        "screens": screens,
+        "engine_running": check_wallpaper_process(self),
+        "script_path": self.script_path,
+        "power_profile": getattr(self, "power_profile", "full"),
+        "active_profile": getattr(self, "active_profile", None),
+    }
+
+
+def _require_screen(self, request):
+    screen = request.get("screen")
+    if screen not in self.detected_screens:
+        raise ValueError(f"Unknown screen: {screen}")
+    return screen
+
+
+def validate_properties(properties):
+    """Raise ValueError unless properties is an object of wallpaper property names to plain values"""
+    if not isinstance(properties, dict):
+        raise ValueError("'properties' must be an object")
+    for key, value in properties.items():
+        if not PROPERTY_NAME.fullmatch(key):
+            raise ValueError(f"Invalid property name: {key!r}")
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(f"Property {key} must be a string, number or boolean")
+
+
+def validate_config(config):
+    """Raise ValueError unless every key of a Screen config is known and has a valid value"""
+    if not isinstance(config, dict):
+        raise ValueError("'config' must be an object")
+    for key, value in config.items():
+        if key == "properties":
+            validate_properties(value)
+            continue
+        if key not in CONFIG_DEFAULTS:
+            raise ValueError(f"Unknown config key: {key}")
+        default = CONFIG_DEFAULTS[key]
+        # bool is an int subclass: compare the exact types, so True is no fps
+        if type(value) is not type(default):
+            raise ValueError(f"'{key}' must be of type {type(default).__name__}")
+        if key in CONFIG_CHOICES and value not in CONFIG_CHOICES[key]:
+            raise ValueError(f"'{key}' must be one of: {', '.join(CONFIG_CHOICES[key])}")
+        if isinstance(value, list) and not all(isinstance(item, str) for item in value):
+            raise ValueError(f"'{key}' must be a list of strings")
+    parse_cpu_list(config.get("cpu_affinity", ""))
+    parse_times(config.get("playlist_times", []))
+
+
+def execute_operation(self, request):
+    """Run a single operation on the configurator state. Mutations are not applied here"""
+    op = request.get("op")
+    if op == "assign":
+        set_screen_wallpaper(self, _require_screen(self, request), request.get("wallpaper"))
+        return None
+    if op == "unassign":
+        set_screen_wallpaper(self, _require_screen(self, request), None)
+        return None
+    if op == "set_properties":
+        screen = _require_screen(self, request)
+        properties = request.get("properties")
+        validate_properties(properties)
+        self.screen_configs.setdefault(screen, {})["properties"] = properties
+        save_current_config(self)
+        return None
+    if op == "set_config":
+        screen = _require_screen(self, request)
+        config = request.get("config")
+        validate_config(config)
+        self.screen_configs.setdefault(screen, {}).update(config)
+        save_current_config(self)
+        return None
+    if op == "switch_profile":
+        activate_profile(self, request.get("profile"))
+        return None
+    if op == "save_profile":
+        save_profile(self, request.get("profile"))
+        return None
+    if op == "profiles":
+        return {"profiles": sorted(get_profiles(self)), "active": getattr(self, "active_profile", None)}
+    if op == "apply":
+        return None
+    if op == "status":
+        return get_status(self)
+    if op == "metrics":
+        return get_metrics()
+    raise ValueError(f"Unknown operation: {op}")
+
+
+def handle_request(self, request, apply_func=apply_assigned_screens):
+    """
+    Handle one request object or a batch (a JSON list, or {"op": "batch", "requests": [...]}).
+    All mutations of a batch are applied with a single engine restart at the end.
+    With apply_func=None the apply is left to the caller (response["needs_apply"]).
+    """
+    if isinstance(request, dict) and request.get("op") == "batch":
+        requests = request.get("requests", [])
+        apply = request.get("apply", True)
+    elif isinstance(request, list):
+        requests = request
+        apply = True
+    else:
+        requests = [request]
+        apply = request.get("apply", True) if isinstance(request, dict) else True
+
+    results = []
+    needs_apply = False
+    for item in requests:
+        if not isinstance(item, dict):
+            results.append({"ok": False, "error": "Request must be an object"})
+            continue
+        try:
+            results.append({"ok": True, "result": execute_operation(self, item)})
+            needs_apply = needs_apply or item.get("op") in MUTATING_OPS or item.get("op") == "apply"
+        except Exception as e:
+            results.append({"ok": False, "error": str(e)})
+
+    response = {"ok": all(r["ok"] for r in results), "results": results}
+    if needs_apply and apply:
+        if apply_func is None:
+            response["needs_apply"] = True
+        else:
+            add_apply_result(response, *apply_func(self))
+    return response
+
+
+def add_apply_result(response, ok, message):
+    response["applied"] = {"ok": ok, "message": message}
+    response["ok"] = response["ok"] and ok
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON response per line"""
+
+    def handle(self):
+        for raw in self.rfile:
+            raw = raw.strip()
+            if not raw:
+                continue
+            started = time.monotonic()
+            try:
+                request = json.loads(raw)
+                with self.server.state_lock:
+                    response = handle_request(self.server.state, request, apply_func=None)
+                # Applies of concurrent clients are coalesced, wait outside the state lock
+                if response.pop("needs_apply", False):
+                    add_apply_result(response, *self.server.apply_queue.apply_and_wait())
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Invalid JSON: {e}"}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            record_metric("control_request_ms", (time.monotonic() - started) * 1000)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, state, socket_path=None):
+        self.state = state
+        # Also held by the apply queue and by power profile switches
+        self.state_lock = get_apply_lock(state)
+        self.socket_path = socket_path or get_socket_path()
+        # Remove a stale socket left by a previous run
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        super().__init__(self.socket_path, _ControlHandler)
+        os.chmod(self.socket_path, 0o600)
+        self.apply_queue = start_apply_queue(state)
+        start_log_sink(state)
+        start_config_writer(state)
+        start_config_watcher(state, self.on_config_changed)
+
+    def on_playlist_rotate(self, screen, wallpaper_id):
+        """Show the next playlist item on a screen, through the coalescing apply queue"""
+        with self.state_lock:
+            set_screen_wallpaper(self.state, screen, wallpaper_id)
+        self.apply_queue.request()
+
+    def on_displays_changed(self, previous_topology):
+        """Follow a monitor hotplug: take the present screens and reapply"""
+        with self.state_lock:
+            if get_topology(self.state) == previous_topology:
+                return
+            added, removed = update_detected_screens(self.state)
+        if added or removed:
+            print(f"Displays changed: +{added} -{removed}")
+        self.apply_queue.request()
+
+    def on_config_changed(self, config):
+        """Merge an external edit of the config store and apply the changed screens"""
+        with self.state_lock:
+            changed = merge_external_config(self.state, config)
+        if changed & set(self.state.detected_screens):
+            self.apply_queue.request()
+
+    def server_close(self):
+        super().server_close()
+        self.apply_queue.stop()
+        self.state.apply_queue = None
+        self.state.config_watcher.stop()
+        self.state.config_watcher = None
+        for name in ("playlist_scheduler", "hotplug_monitor"):
+            if getattr(self.state, name, None) is not None:
+                getattr(self.state, name).stop()
+        stop_config_writer(self.state)
+        stop_log_sink(self.state)
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def send_request(request, socket_path=None, timeout=60.0):
+    """Send a request (or a list of requests as a batch) to the running control server"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or get_socket_path())
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def serve(state, socket_path=None):
+    """Serve the control API until interrupted"""
+    server = ControlServer(state, socket_path)
+    start_supervisor(state)
+    start_idle_monitor(state)
+    start_power_profiles(state)
+    start_playlists(state, server.on_playlist_rotate)
+    start_hotplug_monitor(state, server.on_displays_changed)
+    print(f"Control socket listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main():
+    from Control.headless import HeadlessConfigurator
+
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+    serve(HeadlessConfigurator().load())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print(" Process interrupted by user.")
+        sys.exit(0)
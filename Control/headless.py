@@ -0,0 +1,54 @@
+from typing import Optional, Dict
+
+from Files.config_files import get_autostart_path, load_current_config
+from Screen.screen_detection import detect_screens
+from Screen.topology import invalidate_topology
+from Scripts.start_script import get_script_path
+from Steam.wallpaper_location import find_wallpaper_directory
+from Steam.workshop_items import scan_wallpapers, load_catalog_cache, save_catalog_cache
+
+
+class HeadlessConfigurator:
+    """
+    Configurator state without any Qt window.
+    Exposes the same attributes as WallpaperConfigQt so the Scripts/Files/Steam
+    helpers that take `self` can be reused by the control socket and the CLI.
+    """
+
+    def __init__(self, detect=True):
+        self.screen_configs = {}
+        self.script_path = get_script_path(self)
+        self.autostart_path = get_autostart_path()
+        self.wallpapers: Dict[str, dict] = {}
+        self.selected_wallpapers: Dict[str, Optional[str]] = {}
+        self.current_selection: Optional[str] = None
+        self.wallpaper_base_path = find_wallpaper_directory(self)
+        self.detected_screens = detect_screens(self) if detect else []
+        for screen in self.detected_screens:
+            self.selected_wallpapers[screen] = None
+
+    def rescan(self):
+        """Detect screens and scan wallpapers again, refreshing the catalog cache"""
+        invalidate_topology(self)
+        self.detected_screens = detect_screens(self)
+        scan_wallpapers(self)
+        save_catalog_cache(self)
+        return self
+
+    def load_cached(self):
+        """Load the catalog from the cache (rescanning only if there is none) and the saved config"""
+        if not load_catalog_cache(self):
+            self.rescan()
+        return self._load_config()
+
+    def load(self):
+        """Load the wallpaper catalog, the saved assignments and the per-Screen configs"""
+        scan_wallpapers(self)
+        save_catalog_cache(self)
+        return self._load_config()
+
+    def _load_config(self):
+        for screen in self.detected_screens:
+            self.selected_wallpapers.setdefault(screen, None)
+        load_current_config(self)
+        return self
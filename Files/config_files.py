@@ -1,27 +1,263 @@
+import collections
 import os
+import hashlib
 import json
+import shutil
+import tempfile
 
-from PySide6.QtCore import QTimer
-from PySide6.QtWidgets import QMessageBox
+
+# Version of the config store layout, bump it and add a migration when it changes
+CONFIG_VERSION = 4
+# Previous versions of the config store kept next to it (.1 is the newest)
+CONFIG_BACKUPS = 3
+
+# Hashes of the store contents recently read or written by this process, per path
+_known_stores = {}
+KNOWN_STORES_KEPT = 8
+
+
+def _store_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def remember_store(path, content):
+    """Record content as read or written by the configurator itself"""
+    known = _known_stores.setdefault(path, collections.deque(maxlen=KNOWN_STORES_KEPT))
+    known.append(_store_hash(content))
+
+
+def is_known_store(path, content):
+    """Whether content was recently read or written by the configurator (not an external edit)"""
+    return _store_hash(content) in _known_stores.get(path, ())
+
+
+def get_config_path():
+    """Get the config store path"""
+    return os.path.expanduser("~/.config/wallpaper-engine-configurator/wallpaperengine_config.json")
+
+
+def _migrate_v1(self, config):
+    """
+    Version 1 only stored {screen: wallpaper_id}; the Screen configs lived in the
+    start script. Import them from the script once, after this the script is output only.
+    """
+    from Scripts.start_script import load_config_from_script
+
+    return {
+        "version": 2,
+        "selected_wallpapers": {k: v for k, v in config.items() if isinstance(v, (str, type(None)))},
+        "screen_configs": load_config_from_script(self),
+    }
+
+
+def _migrate_v2(self, config):
+    """Version 3 adds the named profiles"""
+    return dict(config, version=3, profiles={}, active_profile=None)
+
+
+def _migrate_v3(self, config):
+    """Version 4 records which physical monitor (EDID identity) was on each connector"""
+    return dict(config, version=4, monitor_identities={})
+
+
+# Migration from each old version to the next one
+MIGRATIONS = {1: _migrate_v1, 2: _migrate_v2, 3: _migrate_v3}
+
+
+def migrate_config(self, config):
+    """Upgrade a loaded config store to CONFIG_VERSION. Returns (config, migrated)"""
+    version = config.get("version", 1) if isinstance(config.get("version"), int) else 1
+    migrated = False
+    while version < CONFIG_VERSION:
+        config = MIGRATIONS[version](self, config)
+        version = config["version"]
+        migrated = True
+    if version > CONFIG_VERSION:
+        print(f"Config store version {version} is newer than this configurator ({CONFIG_VERSION})")
+    return config, migrated
+
+
+def get_backup_path(path, index):
+    return f"{path}.{index}"
+
+
+def read_config_store(path):
+    """
+    Read the config store, falling back to the newest readable backup
+    if the store itself is missing or corrupt. Returns None if nothing is readable.
+    """
+    for candidate in [path] + [get_backup_path(path, i) for i in range(1, CONFIG_BACKUPS + 1)]:
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                content = f.read()
+            config = json.loads(content)
+        except (OSError, ValueError) as e:
+            print(f"Error reading config {candidate}: {e}")
+            continue
+        if candidate == path:
+            remember_store(path, content)
+        else:
+            print(f"Config store unreadable, restored from {candidate}")
+        return config
+    return None
+
+
+def rotate_backups(path):
+    """Shift the backups by one and keep the current store as .1"""
+    for index in range(CONFIG_BACKUPS - 1, 0, -1):
+        if os.path.exists(get_backup_path(path, index)):
+            os.replace(get_backup_path(path, index), get_backup_path(path, index + 1))
+    # A hard link keeps the store in place, it is only replaced by the rename of the new one
+    try:
+        os.link(path, get_backup_path(path, 1))
+    except OSError:
+        shutil.copy2(path, get_backup_path(path, 1))
+
+
+def write_config_store(path, content):
+    """Write the config store durably, rotating the previous one into the backups"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            if f.read() == content:
+                return False
+        rotate_backups(path)
+    remember_store(path, content)
+    write_file_atomic(path, content)
+    return True
+
+
+def build_config_store(self):
+    """The config store content for the current state"""
+    return {
+        "version": CONFIG_VERSION,
+        "selected_wallpapers": dict(self.selected_wallpapers),
+        "screen_configs": self.screen_configs,
+        "profiles": getattr(self, "profiles", {}),
+        "active_profile": getattr(self, "active_profile", None),
+        "monitor_identities": getattr(self, "monitor_identities", {}),
+    }
+
+
+def merge_external_config(self, config):
+    """
+    Merge a config store edited by another program into the state.
+    Returns the screens whose assignment or config changed.
+    """
+    config, _ = migrate_config(self, config)
+    changed = set()
+    selected = config.get("selected_wallpapers", {})
+    for screen in set(selected) | set(self.selected_wallpapers):
+        wallpaper_id = selected.get(screen)
+        if wallpaper_id == self.selected_wallpapers.get(screen):
+            continue
+        if wallpaper_id is not None and screen in self.detected_screens and wallpaper_id not in self.wallpapers:
+            print(f"Ignoring unknown wallpaper {wallpaper_id} for {screen}")
+            continue
+        self.selected_wallpapers[screen] = wallpaper_id
+        changed.add(screen)
+    screen_configs = config.get("screen_configs", {})
+    for screen in set(screen_configs) | set(self.screen_configs):
+        screen_config = screen_configs.get(screen)
+        if screen_config == self.screen_configs.get(screen):
+            continue
+        if screen_config is None:
+            del self.screen_configs[screen]
+        else:
+            self.screen_configs[screen] = screen_config
+        changed.add(screen)
+    # Profiles do not change what runs, only the stored snapshots
+    self.profiles = config.get("profiles", {})
+    self.active_profile = config.get("active_profile")
+    # A save still waiting in the writer predates the edit, queue the merged state instead
+    writer = getattr(self, "config_writer", None)
+    if changed and writer is not None and writer.pending:
+        save_current_config(self)
+    return changed
+
+
+def follow_monitors(self):
+    """
+    Move assignments and Screen configs along with the physical monitors: a monitor
+    (EDID identity) now on another connector than when it was saved takes its settings along.
+    Only runs once the topology was detected. Returns True if the store has to be saved.
+    """
+    topology = getattr(self, "topology", None)
+    if topology is None:
+        return False
+    current = topology.identities()
+    known = getattr(self, "monitor_identities", None) or {}
+
+    def unique(mapping):
+        # Identical monitors without a serial number share an identity, they cannot be told apart
+        identities = list(mapping.values())
+        return {identity: name for name, identity in mapping.items() if identities.count(identity) == 1}
+
+    previous = unique(known)
+    moves = {
+        name: previous[identity]
+        for identity, name in unique(current).items()
+        if identity in previous and previous[identity] != name
+    }
+    if moves:
+        selected = dict(self.selected_wallpapers)
+        configs = dict(self.screen_configs)
+        # The connectors left behind lose the settings that moved away
+        for old in set(moves.values()) - set(moves):
+            self.selected_wallpapers[old] = None
+            self.screen_configs.pop(old, None)
+        for new, old in moves.items():
+            self.selected_wallpapers[new] = selected.get(old)
+            if old in configs:
+                self.screen_configs[new] = configs[old]
+            else:
+                self.screen_configs.pop(new, None)
+            print(f"Monitor {current[new]} moved from {old} to {new}, its wallpaper follows it")
+    identities = {name: identity for name, identity in known.items() if identity not in current.values()}
+    identities.update(current)
+    changed = bool(moves) or identities != known
+    self.monitor_identities = identities
+    return changed
 
 
 def load_current_config(self):
     """
-    Load the current wallpaper configuration for each Screen, if available.
-    This method should set self.selected_wallpapers for each detected Screen.
+    Load the wallpaper assignments and the Screen configs from the config store, if available.
+    This method sets self.selected_wallpapers for each detected Screen and self.screen_configs.
     """
-    config_path = os.path.expanduser("~/.config/wallpaper-engine-configurator/wallpaperengine_config.json")
-    if os.path.exists(config_path):
+    writer = getattr(self, "config_writer", None)
+    if writer is not None:
+        # A save still in the debounce window is newer than the store on disk
+        writer.flush()
+    config = read_config_store(get_config_path())
+    if config is None and os.path.exists(getattr(self, "script_path", "")):
+        from Scripts.start_script import load_assignments_from_script
+
+        # An install from before the config store: the start script holds the settings,
+        # migrated like a version 1 store ({screen: wallpaper_id}) whose configs are in the script
+        config = load_assignments_from_script(self)
+    if config is not None:
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            config, migrated = migrate_config(self, config)
+            selected = config.get("selected_wallpapers", {})
+            # Keep the assignments of screens that are not connected right now
+            self.selected_wallpapers.update(selected)
             for screen in self.detected_screens:
-                wallpaper_id = config.get(screen)
+                wallpaper_id = selected.get(screen)
                 # Only assign if the wallpaper exists in self.wallpapers or is None
                 if wallpaper_id is None or wallpaper_id in self.wallpapers:
                     self.selected_wallpapers[screen] = wallpaper_id
                 else:
                     self.selected_wallpapers[screen] = None
+            self.screen_configs.clear()
+            self.screen_configs.update(config.get("screen_configs", {}))
+            self.profiles = config.get("profiles", {})
+            self.active_profile = config.get("active_profile")
+            self.monitor_identities = config.get("monitor_identities", {})
+            if follow_monitors(self) or migrated:
+                save_current_config(self)
         except Exception as e:
             print(f"Error loading config: {e}")
     else:
@@ -31,6 +267,8 @@ def load_current_config(self):
 
 def ensure_required_files(self):
     """Check and create required files if they don't exist"""
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QMessageBox
     from Scripts.start_script import create_wallpaper_script
     files_created = []
 
@@ -63,15 +301,44 @@ def get_autostart_path():
     os.makedirs(autostart_dir, exist_ok=True)
     return os.path.join(autostart_dir, "start-wallpaperengine.sh.desktop")
 
-def save_current_config(self, key, value):
+def save_current_config(self, key=None, value=None):
     """
-    Save the current wallpaper configuration for each Screen.
+    Save the wallpaper assignments and the Screen configs to the config store.
+    With a running config writer the save is debounced and written in the background.
     """
-    config_path = os.path.expanduser("~/.config/wallpaper-engine-configurator/wallpaperengine_config.json")
-    config_dir = os.path.dirname(config_path)
-    os.makedirs(config_dir, exist_ok=True)  # Ensure directory exists
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(self.selected_wallpapers, f, indent=2)
+        content = json.dumps(build_config_store(self), indent=2, ensure_ascii=False) + "\n"
+        writer = getattr(self, "config_writer", None)
+        if writer is not None:
+            writer.submit(content)
+        else:
+            write_config_store(get_config_path(), content)
     except Exception as e:
         print(f"Error saving config: {e}")
+
+def write_file_atomic(path, content, mode=0o644):
+    """
+    Write a file through a temporary file in the same directory and a rename,
+    so readers (and a running bash) never see a half-written file.
+    The data and the rename are synced, so a crash leaves either the old or the new file.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,138 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import threading
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+# Atomic writes replace the file, and with it a watch on its inode
+STORE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+POLL_SECONDS = 2.0
+
+
+def open_inotify(directory, mask=STORE_EVENTS):
+    """Watch a directory with inotify. Returns the inotify file descriptor, raises OSError if unavailable"""
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        error = ctypes.get_errno()
+        os.close(fd)
+        raise OSError(error, f"inotify_add_watch failed for {directory}")
+    return fd
+
+
+def parse_inotify_events(data):
+    """Return the file names of the events in an inotify read buffer"""
+    names = []
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(data):
+        _wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        names.append(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+        offset += length
+    return names
+
+
+class ConfigWatcher(threading.Thread):
+    """
+    Watches the config store for changes made by other programs and calls
+    on_change(config) with the new content. A change is detected by mtime and size
+    first and confirmed by a content hash, so the configurator's own writes are ignored.
+    """
+
+    def __init__(self, path, on_change, settle=0.2):
+        super().__init__(name="config-watcher", daemon=True)
+        self.path = path
+        self.on_change = on_change
+        # Editors write in several steps, wait for this long without events before reading
+        self.settle = settle
+        self._stop_event = threading.Event()
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check(self):
+        """Compare the store with the last seen version, and report it if another program changed it"""
+        from Files.config_files import is_known_store, remember_store
+
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except OSError:
+            return False
+        self._signature = signature
+        if is_known_store(self.path, content):
+            return False
+        try:
+            config = json.loads(content)
+        except ValueError as e:
+            print(f"Ignoring invalid config store edit: {e}")
+            return False
+        remember_store(self.path, content)
+        print("Config store changed on disk, reloading")
+        try:
+            self.on_change(config)
+        except Exception as e:
+            print(f"Config reload error: {e}")
+        return True
+
+    def run(self):
+        try:
+            fd = open_inotify(os.path.dirname(self.path))
+        except OSError as e:
+            print(f"inotify unavailable ({e}), polling the config store every {POLL_SECONDS:.0f} s")
+            while not self._stop_event.wait(POLL_SECONDS):
+                self.check()
+            return
+        name = os.path.basename(self.path)
+        try:
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                changed = False
+                # Drain the burst of events of one save before reading the file
+                while ready:
+                    try:
+                        changed |= name in parse_inotify_events(os.read(fd, 65536))
+                    except BlockingIOError:
+                        pass
+                    ready, _, _ = select.select([fd], [], [], self.settle)
+                if changed:
+                    self.check()
+        finally:
+            os.close(fd)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_config_watcher(self, on_change):
+    """Start watching the config store of a configurator state (once)"""
+    from Files.config_files import get_config_path
+
+    if getattr(self, "config_watcher", None) is None:
+        path = get_config_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.config_watcher = ConfigWatcher(path, on_change)
+        self.config_watcher.start()
+    return self.config_watcher
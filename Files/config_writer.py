@@ -0,0 +1,115 @@
+import atexit
+import threading
+import time
+
+from Wallpaper_Engine.metrics import record_metric
+
+
+class ConfigWriter(threading.Thread):
+    """
+    Writes the config store in the background.
+    Saves arriving within `debounce` seconds of each other (but no later than
+    `max_delay` after the first one) are written once, with the latest content.
+    """
+
+    def __init__(self, path, debounce=0.5, max_delay=2.0, clock=time.monotonic):
+        super().__init__(name="config-writer", daemon=True)
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.clock = clock
+        self._cond = threading.Condition()
+        # Held while a write is running, so flush() never returns before an in-flight write
+        self._write_lock = threading.Lock()
+        self._stopping = False
+        self._content = None
+        self._merged = 0
+        self._first_request = None
+        self._last_request = None
+
+    def submit(self, content):
+        """Queue the config store content to be written"""
+        with self._cond:
+            now = self.clock()
+            self._content = content
+            self._merged += 1
+            self._last_request = now
+            if self._first_request is None:
+                self._first_request = now
+            self._cond.notify_all()
+
+    @property
+    def pending(self):
+        """Whether a save is waiting to be written"""
+        with self._cond:
+            return self._content is not None
+
+    def _take(self):
+        with self._cond:
+            content, merged = self._content, self._merged
+            self._content = None
+            self._merged = 0
+            self._first_request = None
+            return content, merged
+
+    def _write_pending(self):
+        from Files.config_files import write_config_store
+
+        with self._write_lock:
+            content, merged = self._take()
+            if content is None:
+                return
+            try:
+                write_config_store(self.path, content)
+            except Exception as e:
+                print(f"Error saving config: {e}")
+            record_metric("config_saves_coalesced", merged)
+
+    def flush(self):
+        """Write any pending content now, on the calling thread"""
+        self._write_pending()
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._content is not None or self._stopping)
+                if self._stopping:
+                    return
+                # Debounce: wait for a quiet period, bounded by max_delay since the first save
+                while not self._stopping:
+                    deadline = min(self._last_request + self.debounce, self._first_request + self.max_delay)
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._write_pending()
+
+    def stop(self):
+        """Stop the writer and flush what is still pending"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.flush()
+
+
+def start_config_writer(self):
+    """Start the config writer for a configurator state (once)"""
+    from Files.config_files import get_config_path
+
+    if getattr(self, "config_writer", None) is None:
+        self.config_writer = ConfigWriter(get_config_path())
+        self.config_writer.start()
+        # Pending saves must reach the disk even if the process exits without stop()
+        atexit.register(self.config_writer.flush)
+    return self.config_writer
+
+
+def stop_config_writer(self):
+    """Flush and stop the config writer, later saves are written synchronously"""
+    writer = getattr(self, "config_writer", None)
+    if writer is not None:
+        writer.stop()
+        self.config_writer = None
+        # Catch saves submitted while the writer was stopping
+        writer.flush()
+        atexit.unregister(writer.flush)
@@ -0,0 +1,251 @@
+import bisect
+import mmap
+import os
+import re
+from array import array
+
+# Bytes of the mapped log scanned for line ends at once
+INDEX_CHUNK = 4 * 1024 * 1024
+# Bytes searched per call: between calls other threads run and a search can be cancelled
+SEARCH_CHUNK = 8 * 1024 * 1024
+
+# Severity of a log line, from the engine's and the configurator's own wording (whole words, any case)
+SEVERITIES = ("error", "warning", "info")
+SEVERITY_WORDS = {
+    "error": (b"error", b"fatal", b"critical", b"failed", b"failure", b"exception", b"traceback", b"segfault"),
+    "warning": (b"warn", b"warning", b"deprecated"),
+}
+
+
+def _is_word_char(byte):
+    return byte == 95 or 48 <= byte <= 57 or 65 <= byte <= 90 or 97 <= byte <= 122
+
+
+def _find_all(data, needle):
+    """Offsets of needle in data, found by bytes.find in C"""
+    offset = data.find(needle)
+    while offset >= 0:
+        yield offset
+        offset = data.find(needle, offset + 1)
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class LogIndex:
+    """
+    Line index of a log file that is memory-mapped, never read into Python strings as a whole.
+    update() indexes only what was appended since the last call (or everything again
+    after the file was truncated or rotated); lines are decoded one at a time on request.
+    The severity of the lines is indexed along the way.
+    A mapping is replaced rather than closed, so a search running in another thread keeps its own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._inode = None
+        self._size = 0
+        # Start offset of every line, plus the end of the indexed data
+        self._starts = array("Q", [0])
+        # {line: "error" | "warning"}, lines that are missing are info
+        self._levels = {}
+        # A last line without a newline yet is indexed when it is completed
+        self._indexed = 0
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    @property
+    def size(self):
+        return self._size
+
+    def close(self):
+        self._map = None
+
+    def _reset(self):
+        self._map = None
+        self._inode = None
+        self._size = 0
+        self._starts = array("Q", [0])
+        self._levels = {}
+        self._indexed = 0
+
+    def update(self):
+        """
+        Map and index the data appended since the last call.
+        Returns (first_new_line, reset): reset is True when the file was truncated or replaced.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            if self._inode is None:
+                return len(self), False
+            self._reset()
+            return 0, True
+        reset = False
+        if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._size):
+            self._reset()
+            reset = True
+        first = len(self)
+        if st.st_size == self._size and self._map is not None:
+            return first, reset
+        self._inode = st.st_ino
+        if not st.st_size:
+            return first, reset
+        try:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), st.st_size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Truncated since the stat, the next update starts over
+            return first, reset
+        self._size = st.st_size
+        self._index_lines()
+        return first, reset
+
+    def _index_lines(self):
+        mapped = self._map
+        position = self._indexed
+        starts = self._starts
+        while True:
+            chunk = mapped[position:position + INDEX_CHUNK]
+            cut = chunk.rfind(b"\n")
+            if cut < 0:
+                break
+            chunk = chunk[:cut + 1]
+            first_line = len(starts) - 1
+            # Offsets of the line ends within the chunk, computed by split() in C
+            offset = position
+            for line in chunk[:cut].split(b"\n"):
+                offset += len(line) + 1
+                starts.append(offset)
+            self._index_levels(chunk, position, first_line)
+            position += cut + 1
+        self._indexed = position
+
+    def _index_levels(self, chunk, position, first_line):
+        lowered = chunk.lower()
+        starts = self._starts
+        levels = self._levels
+        for level in ("warning", "error"):
+            for word in SEVERITY_WORDS[level]:
+                for offset in _find_all(lowered, word):
+                    end = offset + len(word)
+                    if offset and _is_word_char(lowered[offset - 1]):
+                        continue
+                    if end < len(lowered) and _is_word_char(lowered[end]):
+                        continue
+                    # Errors are indexed last and win over warnings of the same line
+                    levels[bisect.bisect_right(starts, position + offset, lo=first_line) - 1] = level
+
+    def line_range(self, number):
+        """(start, end) byte offsets of a line, without its newline"""
+        return self._starts[number], self._starts[number + 1] - 1
+
+    def line(self, number):
+        start, end = self.line_range(number)
+        return self._map[start:end].decode("utf-8", errors="replace")
+
+    def severity(self, number):
+        """The severity of a line: error, warning or info"""
+        return self._levels.get(number, "info")
+
+    def severe_lines(self, min_severity, first_line=0):
+        """Numbers of the lines from first_line on with at least the given severity"""
+        wanted = SEVERITIES[:SEVERITIES.index(min_severity) + 1]
+        return array("Q", sorted(
+            number for number, level in list(self._levels.items()) if level in wanted and number >= first_line
+        ))
+
+    def _windows(self, first_line, cancelled):
+        """(mapping, starts, start, end) of whole-line windows of about SEARCH_CHUNK bytes"""
+        mapped, starts = self._map, self._starts
+        if mapped is None or first_line >= len(starts) - 1:
+            return
+        position = starts[first_line]
+        end = starts[-1]
+        while position < end:
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+            window = starts[min(bisect.bisect_right(starts, position + SEARCH_CHUNK), len(starts) - 1)]
+            yield mapped, starts, position, window
+            position = window
+
+    def find(self, pattern, first_line=0, cancelled=None):
+        """
+        Numbers of the lines from first_line on in which a compiled bytes pattern matches.
+        The pattern runs over the mapped file in C; Python only steps once per matching line
+        and once per SEARCH_CHUNK. Returns None if cancelled() turned true meanwhile.
+        """
+        lines = array("Q")
+        try:
+            for mapped, starts, position, window in self._windows(first_line, cancelled):
+                while True:
+                    match = pattern.search(mapped, position, window)
+                    if match is None:
+                        break
+                    number = bisect.bisect_right(starts, match.start()) - 1
+                    lines.append(number)
+                    # The next line, a line is listed once however often it matches
+                    position = starts[number + 1]
+        except SearchCancelled:
+            return None
+        return lines
+
+    def find_text(self, needle, ignore_case=True, first_line=0, cancelled=None):
+        """Like find() for a plain substring, with bytes.find (ASCII case folding). Returns None if cancelled"""
+        lines = array("Q")
+        if ignore_case:
+            needle = needle.lower()
+        try:
+            for mapped, starts, position, window in self._windows(first_line, cancelled):
+                data = mapped[position:window]
+                if ignore_case:
+                    data = data.lower()
+                offset = data.find(needle)
+                while offset >= 0:
+                    number = bisect.bisect_right(starts, position + offset) - 1
+                    lines.append(number)
+                    offset = data.find(needle, starts[number + 1] - position)
+        except SearchCancelled:
+            return None
+        return lines
+
+
+class LogSearch:
+    """A search of the log browser: a plain substring or a regular expression"""
+
+    def __init__(self, text, regex=False, ignore_case=True):
+        self.text = text
+        self.needle = text.encode("utf-8")
+        self.ignore_case = ignore_case
+        self.pattern = None
+        # bytes.lower() only folds ASCII, other text is case folded by the regex engine
+        if regex or (ignore_case and not text.isascii()):
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            try:
+                self.pattern = re.compile(self.needle if regex else re.escape(self.needle), flags)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}")
+
+    def find(self, index, first_line=0, cancelled=None):
+        if self.pattern is not None:
+            return index.find(self.pattern, first_line, cancelled)
+        return index.find_text(self.needle, self.ignore_case, first_line, cancelled)
+
+
+def filter_lines(index, search=None, min_severity=None, first_line=0, cancelled=None):
+    """
+    Numbers of the matching lines from first_line on, or a range when nothing filters.
+    search is a LogSearch; min_severity keeps lines of that severity and above.
+    Returns None if cancelled() turned true meanwhile.
+    """
+    severity = min_severity not in (None, "info")
+    if search is None:
+        return index.severe_lines(min_severity, first_line) if severity else range(first_line, len(index))
+    selected = search.find(index, first_line, cancelled)
+    if selected is not None and severity:
+        wanted = SEVERITIES[:SEVERITIES.index(min_severity) + 1]
+        selected = array("Q", (number for number in selected if index.severity(number) in wanted))
+    return selected
@@ -5,8 +5,14 @@ from PySide6.QtCore import QTimer, Qt
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import QMessageBox
 
+from Files.log_sink import LOG_FILE
+
+# Lines kept in the log viewer, the oldest ones are dropped as new ones arrive
+MAX_LOG_LINES = 5000
+
+
 def insert_text_to_log(self, text):
-    log_file = "/tmp/wallpaper-engine.log"
+    log_file = LOG_FILE
     from datetime import datetime
 
     # Get current local date and time
@@ -14,13 +20,18 @@ def insert_text_to_log(self, text):
 
     # Format as DD-MM-YYYY HH:MM:SS AM/PM
     date = now.strftime("%d-%m-%Y %I:%M:%S %p")
+    sink = getattr(self, "log_sink", None)
+    if sink is not None:
+        # Buffered, written with the engine output as a line of its own
+        sink.write(f"[{date}] {text}\n")
+        return
     with open(log_file, "a", encoding="utf-8") as file:
         file.write(f"\n[{date}] {text}")
 
 
 def clear_log(self):
     """ Clears the log file """
-    log_file = "/tmp/wallpaper-engine.log"
+    log_file = LOG_FILE
     try:
         if not os.path.exists(log_file):
             QMessageBox.information(self, "Logs", "No log file found yet.")
@@ -33,25 +44,73 @@ def clear_log(self):
         QMessageBox.critical(self, "Error", f"Error reading log: {e}")
 
 
+def watch_log_file(dialog, log_file, on_change):
+    """
+    Call on_change (on the GUI thread) when inotify reports a write to the log file, or
+    every 2 s if inotify is unavailable, for as long as the dialog is open.
+    """
+    from PySide6.QtCore import QSocketNotifier
+    from Files.config_watcher import IN_CREATE, IN_DELETE, IN_MODIFY, IN_MOVED_FROM, IN_MOVED_TO, \
+        open_inotify, parse_inotify_events
+
+    try:
+        inotify_fd = open_inotify(
+            os.path.dirname(log_file), IN_MODIFY | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        )
+    except OSError as e:
+        print(f"inotify unavailable ({e}), polling the log every 2 s")
+        poll_timer = QTimer(dialog)
+        poll_timer.timeout.connect(on_change)
+        poll_timer.start(2000)
+        return
+
+    log_name = os.path.basename(log_file)
+    notifier = QSocketNotifier(inotify_fd, QSocketNotifier.Type.Read, dialog)
+
+    def on_inotify():
+        try:
+            names = parse_inotify_events(os.read(inotify_fd, 65536))
+        except BlockingIOError:
+            return
+        if log_name in names:
+            on_change()
+
+    def close_inotify():
+        notifier.setEnabled(False)
+        os.close(inotify_fd)
+
+    notifier.activated.connect(on_inotify)
+    dialog.finished.connect(close_inotify)
+
+
+def open_log_browser(self):
+    from UI.log_browser import show_log_browser
+
+    show_log_browser(self, LOG_FILE)
+
+
 def view_logs(self):
     """
-    Show the content of the wallpaper engine log file in a popup window.
+    Show the wallpaper engine log file in a popup window, following it as it grows:
+    only the appended bytes are read, when inotify reports a write.
     """
-    log_file = "/tmp/wallpaper-engine.log"
+    log_file = LOG_FILE
     try:
         if not os.path.exists(log_file):
             QMessageBox.information(self, "Logs", "No log file found yet.")
             return
 
         # Use PySide6 widgets for the log window
+        from PySide6.QtGui import QTextCursor
         from PySide6.QtWidgets import (
             QDialog,
             QVBoxLayout,
             QHBoxLayout,
-            QTextEdit,
+            QPlainTextEdit,
             QCheckBox,
             QPushButton,
         )
+        from Files.log_tail import LogTail
 
         log_window = QDialog(self)
         log_window.setWindowTitle("Wallpaper Engine Logs")
@@ -70,17 +129,23 @@ def view_logs(self):
         check_box_layout.addStretch()
         layout.addLayout(check_box_layout)
 
-        # Text area to show logs
-        self.text_edit = QTextEdit()
+        # Text area to show logs, the oldest lines are dropped past MAX_LOG_LINES
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setReadOnly(True)
         self.text_edit.setFont(QFont("Monaco", 10))
+        self.text_edit.setMaximumBlockCount(MAX_LOG_LINES)
         layout.addWidget(self.text_edit)
+        text_edit = self.text_edit
 
         # Clear Logs Button
         btnc_layout = QHBoxLayout()
         clear_btn = QPushButton("Clear Logs")
         clear_btn.clicked.connect(lambda checked: clear_log(self))
+        # The whole log, indexed and searchable
+        search_btn = QPushButton("Search Full Log")
+        search_btn.clicked.connect(lambda checked: open_log_browser(self))
         btnc_layout.addStretch()
+        btnc_layout.addWidget(search_btn)
         btnc_layout.addWidget(clear_btn)
         layout.addLayout(btnc_layout)
 
@@ -92,52 +157,45 @@ def view_logs(self):
         btn_layout.addWidget(close_btn)
         layout.addLayout(btn_layout)
 
-        def read_last_lines(file_path, max_bytes=200 * 1024, max_lines=2000):
-            """Read only the last part of a large file efficiently."""
-            try:
-                with open(file_path, "rb") as f:
-                    f.seek(0, os.SEEK_END)
-                    file_size = f.tell()
-                    seek_pos = max(0, file_size - max_bytes)
-                    f.seek(seek_pos)
-                    data = f.read().decode("utf-8", errors="replace")
-                    lines = data.splitlines()
-                    # If not at start, skip possibly incomplete first line
-                    if seek_pos > 0 and lines:
-                        lines = lines[1:]
-                    if len(lines) > max_lines:
-                        lines = lines[-max_lines:]
-                    return "\n".join(lines)
-            except Exception as e:
-                return f"Error reading log: {e}"
+        tail = LogTail(log_file)
 
         def refresh_log_content():
-            # Stop accessing the widget if it was destroyed or window is closing
-            if not log_window.isVisible():
-                return
-            
             try:
-                content = read_last_lines(log_file)
-                self.text_edit.setPlainText(content)
-                if auto_follow_check.isChecked():
-                    from PySide6.QtGui import QTextCursor
-                    self.text_edit.moveCursor(QTextCursor.MoveOperation.End)
+                text, reset = tail.read_new()
             except Exception as e:
                 print(f"Error in refresh_log_content: {e}")
-
-            # Schedule next refresh if checkbox is checked
-            if auto_refresh_check.isChecked():
-                QTimer.singleShot(2000, refresh_log_content)
-
-        # Connect checkbox to refresh logic
+                return
+            if reset:
+                # Cleared or rotated, the file is shown again from its start
+                text_edit.clear()
+            if text:
+                # Appended at the end without moving the user's cursor or scroll position
+                cursor = QTextCursor(text_edit.document())
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                cursor.insertText(text)
+            if (text or reset) and auto_follow_check.isChecked():
+                scroll_bar = text_edit.verticalScrollBar()
+                scroll_bar.setValue(scroll_bar.maximum())
+
+        # A burst of writes is read in one go
+        refresh_timer = QTimer(log_window)
+        refresh_timer.setSingleShot(True)
+        refresh_timer.setInterval(100)
+        refresh_timer.timeout.connect(refresh_log_content)
+
+        def request_refresh():
+            if auto_refresh_check.isChecked() and not refresh_timer.isActive():
+                refresh_timer.start()
+
+        # Woken by inotify writes to the log
+        watch_log_file(log_window, log_file, request_refresh)
+
+        # Catch up with what was written while paused
         auto_refresh_check.stateChanged.connect(
             lambda state: refresh_log_content() if state == Qt.CheckState.Checked.value else None
         )
 
-        # Initial call to start the loop
-        # We use a short singleShot to ensure the window is visible/ready
-        QTimer.singleShot(100, refresh_log_content)
-
+        refresh_log_content()
         log_window.exec()
 
     except Exception as e:
@@ -0,0 +1,261 @@
+import gzip
+import os
+import re
+import select
+import shutil
+import subprocess
+import sys
+import threading
+
+LOG_FILE = "/tmp/wallpaper-engine.log"
+# The log is rotated past this size, keeping LOG_SEGMENTS older ones (path.1 is the newest)
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_SEGMENTS = 3
+# Buffered output is written once this much is pending, or when the pipes go quiet
+FLUSH_BYTES = 64 * 1024
+FLUSH_SECONDS = 0.5
+# Runs the sink instead of the configurator in the bundled executable, which cannot run `-m Files.log_sink`
+LOG_SINK_ARGUMENT = "--log-sink"
+
+
+def log_fd_variable(screen=None):
+    """Environment variable of the start script that holds the log pipe of a Screen (or of the whole engine)"""
+    return f"WPE_LOG_FD_{re.sub(r'[^A-Za-z0-9]', '_', screen)}" if screen else "WPE_LOG_FD"
+
+
+def rotate_log(path, segments=LOG_SEGMENTS):
+    """Shift path.1 .. path.N (plain or gzip) up by one, dropping the oldest, and move the log to path.1"""
+    for number in range(segments, 0, -1):
+        for suffix in ("", ".gz"):
+            segment = f"{path}.{number}{suffix}"
+            if not os.path.exists(segment):
+                continue
+            if number == segments:
+                os.remove(segment)
+            else:
+                os.replace(segment, f"{path}.{number + 1}{suffix}")
+    os.replace(path, f"{path}.1")
+
+
+def compress_segment(segment):
+    """gzip a rotated segment into segment.gz, replacing it"""
+    temp_path = f"{segment}.gz.tmp"
+    try:
+        with open(segment, "rb") as source, gzip.open(temp_path, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(temp_path, f"{segment}.gz")
+        os.remove(segment)
+    except OSError as e:
+        print(f"Could not compress {segment}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+class LogSink(threading.Thread):
+    """
+    Writes the wallpaper engine log. The engines' stdout/stderr are read from pipes (one per
+    Screen when each Screen runs its own engine, its lines prefixed with the Screen name) and
+    the configurator's own messages come through write(). Complete lines are written in batches
+    and the log is rotated at max_bytes, the older segments optionally gzip-compressed.
+    """
+
+    def __init__(self, path=LOG_FILE, max_bytes=LOG_MAX_BYTES, segments=LOG_SEGMENTS, compress=True,
+                 exit_when_drained=False):
+        super().__init__(name="log-sink", daemon=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segments = segments
+        self.compress = compress
+        self._lock = threading.Lock()
+        # A segment is not shifted while it is being compressed
+        self._compress_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._fd = None
+        self._inode = None
+        # {read fd: [label, partial line]}
+        self._streams = {}
+        # Wakes the select loop when a stream is added or the sink stops
+        self._wake_read, self._wake_write = os.pipe()
+        self._stop_event = threading.Event()
+        # Used by a handed-off sink, which ends with the last engine
+        self.exit_when_drained = exit_when_drained
+
+    def add_stream(self, fd, label=""):
+        with self._lock:
+            self._streams[fd] = [label.encode("utf-8"), b""]
+        os.write(self._wake_write, b"\0")
+
+    def open_pipe(self, label=""):
+        """A new stream: returns the write end for the engine, to be closed by the caller once it was passed on"""
+        read_fd, write_fd = os.pipe()
+        self.add_stream(read_fd, label)
+        return write_fd
+
+    def write(self, text):
+        """Queue a message of the configurator, written with the next batch"""
+        with self._lock:
+            self._buffer += text.encode("utf-8", errors="replace")
+            pending = len(self._buffer)
+        if pending >= FLUSH_BYTES:
+            self.flush()
+
+    def _read(self, fd):
+        try:
+            data = os.read(fd, 65536)
+        except OSError:
+            data = b""
+        with self._lock:
+            label, partial = self._streams[fd]
+            prefix = b"[" + label + b"] " if label else b""
+            if not data:
+                # Every writer exited
+                del self._streams[fd]
+                os.close(fd)
+                if partial:
+                    self._buffer += prefix + partial + b"\n"
+                return
+            lines = (partial + data).split(b"\n")
+            self._streams[fd][1] = lines.pop()
+            for line in lines:
+                self._buffer += prefix + line + b"\n"
+
+    def run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                fds = list(self._streams)
+            if not fds and self.exit_when_drained:
+                break
+            ready, _, _ = select.select(fds + [self._wake_read], [], [], FLUSH_SECONDS)
+            for fd in ready:
+                if fd == self._wake_read:
+                    os.read(self._wake_read, 4096)
+                else:
+                    self._read(fd)
+            # Written when the pipes went quiet: a burst of output is one write, and nothing waits long
+            self.flush()
+        self.flush()
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+
+    def flush(self):
+        """Write the pending output, rotating the log once it is over max_bytes"""
+        with self._lock:
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            try:
+                if self._fd is not None:
+                    # The start script or a user may have moved or removed the log
+                    try:
+                        moved = os.stat(self.path).st_ino != self._inode
+                    except OSError:
+                        moved = True
+                    if moved:
+                        os.close(self._fd)
+                        self._fd = None
+                if self._fd is None:
+                    self._open()
+                os.write(self._fd, data)
+                if os.fstat(self._fd).st_size >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                print(f"Could not write the log: {e}")
+
+    def _rotate(self):
+        os.close(self._fd)
+        self._fd = None
+        with self._compress_lock:
+            rotate_log(self.path, self.segments)
+        self._open()
+        if self.compress:
+            threading.Thread(target=self._compress, name="log-compress", daemon=True).start()
+
+    def _compress(self):
+        with self._compress_lock:
+            for number in range(1, self.segments + 1):
+                if os.path.exists(f"{self.path}.{number}"):
+                    compress_segment(f"{self.path}.{number}")
+
+    def stop(self, handoff=True):
+        """
+        Stop reading the pipes and write what is pending. The pipes of engines that keep
+        running are handed off to a detached sink process, which exits with the last engine.
+        """
+        self._stop_event.set()
+        os.write(self._wake_write, b"\0")
+        if self.is_alive():
+            self.join(timeout=2)
+        with self._lock:
+            streams = dict(self._streams)
+            self._streams.clear()
+            for label, partial in streams.values():
+                if partial:
+                    self._buffer += (b"[" + label + b"] " if label else b"") + partial + b"\n"
+        self.flush()
+        if streams and handoff:
+            handoff_streams(self.path, streams)
+        for fd in streams:
+            os.close(fd)
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+
+def handoff_streams(path, streams):
+    """Keep logging the {fd: [label, partial]} engine pipes to path in a detached sink process"""
+    if getattr(sys, "frozen", False):
+        # The bundled executable runs the sink itself when given LOG_SINK_ARGUMENT
+        command, cwd = [sys.executable, LOG_SINK_ARGUMENT, path], None
+    else:
+        command = [sys.executable, "-m", "Files.log_sink", path]
+        cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        subprocess.Popen(
+            command + [f"{fd}:{label.decode('utf-8')}" for fd, (label, _partial) in streams.items()],
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            pass_fds=tuple(streams),
+        )
+    except OSError as e:
+        print(f"Could not hand off the engine log: {e}")
+
+
+def main(argv):
+    """Log the engine pipes given as PATH FD:LABEL... until every engine closed them (see handoff_streams)"""
+    sink = LogSink(argv[0], exit_when_drained=True)
+    for spec in argv[1:]:
+        fd, _, label = spec.partition(":")
+        sink.add_stream(int(fd), label)
+    sink.run()
+    sink.stop(handoff=False)
+    return 0
+
+
+def start_log_sink(self):
+    """Start the log sink of a configurator state (once)"""
+    if getattr(self, "log_sink", None) is None:
+        self.log_sink = LogSink()
+        self.log_sink.start()
+    return self.log_sink
+
+
+def stop_log_sink(self):
+    sink = getattr(self, "log_sink", None)
+    if sink is not None:
+        self.log_sink = None
+        sink.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,55 @@
+import codecs
+import os
+
+# Bytes of an existing log shown when the viewer opens
+INITIAL_BYTES = 200 * 1024
+
+
+class LogTail:
+    """
+    Follows a growing log file by byte offset: read_new() returns only what was appended
+    since the last call. A truncated (cleared) or replaced (rotated) file is read again
+    from its start, and reported with reset=True.
+    """
+
+    def __init__(self, path, initial_bytes=INITIAL_BYTES):
+        self.path = path
+        self.initial_bytes = initial_bytes
+        self.offset = None
+        self.inode = None
+        self._decoder = None
+
+    def _reopen(self, st, start):
+        self.inode = st.st_ino
+        self.offset = start
+        # Keeps a UTF-8 sequence split across two reads intact
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read_new(self):
+        """Returns (text, reset). text is empty when nothing was appended"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return "", False
+        reset = False
+        first = self.offset is None
+        if first:
+            self._reopen(st, max(0, st.st_size - self.initial_bytes))
+        elif st.st_ino != self.inode or st.st_size < self.offset:
+            self._reopen(st, 0)
+            reset = True
+        if st.st_size == self.offset:
+            return "", reset
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(st.st_size - self.offset)
+        except OSError:
+            return "", reset
+        skip = first and self.offset > 0
+        self.offset += len(data)
+        text = self._decoder.decode(data)
+        if skip:
+            # Started in the middle of the file, drop the partial first line
+            text = text.partition("\n")[2]
+        return text, reset
@@ -3,6 +3,20 @@ import subprocess
 import sys
 
 
+def get_wallpaper_properties(self, wallpaper_id):
+    """Property schema of a wallpaper, cached per wallpaper (it only changes with the wallpaper files)"""
+    cache = getattr(self, "property_cache", None)
+    if cache is None:
+        cache = self.property_cache = {}
+    if wallpaper_id not in cache:
+        properties = load_wallpaper_properties(self, wallpaper_id)
+        if not properties:
+            # Not cached: the engine may have been missing or busy
+            return properties
+        cache[wallpaper_id] = properties
+    return cache[wallpaper_id]
+
+
 def load_wallpaper_properties(self, wallpaper_id):
     """Load properties of a specific wallpaper for configuration"""
     # Execute the command and parse the output
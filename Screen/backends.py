@@ -0,0 +1,345 @@
+import glob
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from dataclasses import replace
+
+from Screen.drm import DRM_CLASS_PATH, parse_edid, read_drm_connectors
+from Screen.topology import Monitor, build_topology
+
+# Recorded backend outputs, named <case>.<backend> (e.g. dual.xrandr)
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Replays a fixture instead of asking the real displays, e.g. to try a layout without the hardware
+REPLAY_ENV = "WALLPAPER_DISPLAY_REPLAY"
+
+
+def parse_xrandr(text):
+    """
+    Parse `xrandr --query --props`. Example:
+    DP-1 connected primary 1920x1080+0+0 (normal ...) 527mm x 296mm
+    \tEDID:
+    \t\t00ffffffffffff0010acc4a0...
+       1920x1080     60.00 +  144.00*
+    Only active outputs (with a position) are listed, or every connected one if none is active.
+    The identity comes from the EDID property: X11 drivers name the outputs differently from
+    the kernel (HDMI-1, HDMI-0, DisplayPort-0 for HDMI-A-1), so they cannot be matched to drm.
+    """
+    connected = []
+    current = None
+    edid = None
+    # The empty line at the end completes an EDID dump that ends the output
+    for line in text.split("\n") + [""]:
+        if edid is not None:
+            # The EDID hex dump, one indented line of 16 bytes after the other
+            if re.fullmatch(r"\s+[0-9a-fA-F]+", line):
+                edid += line.strip()
+                continue
+            info = parse_edid(bytes.fromhex(edid)) if len(edid) % 2 == 0 else None
+            if info is not None and current is not None:
+                current["identity"] = info.identity
+            edid = None
+        if line and not line[0].isspace():
+            current = None
+            parts = line.split()
+            if len(parts) < 2 or parts[1] != "connected":
+                continue
+            current = {"name": parts[0], "primary": "primary" in parts[2:3]}
+            match = re.search(r"(\d+)x(\d+)\+(\d+)\+(\d+)", line)
+            if match:
+                current["width"], current["height"], current["x"], current["y"] = map(int, match.groups())
+            connected.append(current)
+        elif current is None:
+            continue
+        elif line.strip() == "EDID:":
+            edid = ""
+        elif re.match(r"\s+\d+x\d+\S*\s", line) and "*" in line:
+            match = re.search(r"(\d+(?:\.\d+)?)\*", line)
+            if match:
+                current["refresh_rate"] = float(match.group(1))
+    active = [output for output in connected if "width" in output] or connected
+    return [Monitor(**output) for output in active]
+
+
+def parse_wlr_randr(text):
+    """
+    Parse `wlr-randr`. Example:
+    HDMI-A-1 "Dell Inc. DELL U2419H (HDMI-A-1)"
+      Enabled: yes
+      Modes:
+        1920x1080 px, 60.000000 Hz (preferred, current)
+      Position: 1920,0
+      Transform: normal
+      Scale: 1.000000
+    """
+    outputs = []
+    current = None
+    for line in text.split("\n"):
+        if line and not line[0].isspace():
+            parts = line.split()
+            # Older versions print "Output HDMI-A-1 ..."
+            name = parts[1] if parts[0] == "Output" and len(parts) > 1 else parts[0]
+            current = {"name": name, "enabled": True, "scale": 1.0, "transform": "normal"}
+            outputs.append(current)
+            continue
+        if current is None:
+            continue
+        stripped = line.strip()
+        if stripped.startswith("Enabled:"):
+            current["enabled"] = stripped.split(":", 1)[1].strip() == "yes"
+        elif stripped.startswith("Position:"):
+            match = re.search(r"(-?\d+),\s*(-?\d+)", stripped)
+            if match:
+                current["x"], current["y"] = map(int, match.groups())
+        elif stripped.startswith("Transform:"):
+            current["transform"] = stripped.split(":", 1)[1].strip()
+        elif stripped.startswith("Scale:"):
+            try:
+                current["scale"] = float(stripped.split(":", 1)[1]) or 1.0
+            except ValueError:
+                pass
+        elif "current" in stripped:
+            match = re.search(r"(\d+)x(\d+) px, (\d+(?:\.\d+)?) Hz", stripped)
+            if match:
+                current["width"], current["height"] = int(match.group(1)), int(match.group(2))
+                current["refresh_rate"] = float(match.group(3))
+    monitors = []
+    for output in outputs:
+        if not output["enabled"]:
+            continue
+        scale = output["scale"]
+        width, height = output.get("width", 0), output.get("height", 0)
+        # Modes are listed in panel orientation, the layout size of a rotated output is swapped
+        if output["transform"].endswith(("90", "270")):
+            width, height = height, width
+        monitors.append(Monitor(
+            name=output["name"],
+            x=output.get("x", 0),
+            y=output.get("y", 0),
+            # Positions are in layout (scaled) coordinates, like the sizes below
+            width=round(width / scale),
+            height=round(height / scale),
+            refresh_rate=output.get("refresh_rate"),
+        ))
+    return monitors
+
+
+def parse_swaymsg_outputs(text):
+    """Parse `swaymsg -t get_outputs` (JSON). The focused output counts as primary"""
+    monitors = []
+    for output in json.loads(text):
+        if not output.get("active"):
+            continue
+        rect = output.get("rect") or {}
+        refresh = (output.get("current_mode") or {}).get("refresh")
+        monitors.append(Monitor(
+            name=output.get("name"),
+            x=int(rect.get("x", 0)),
+            y=int(rect.get("y", 0)),
+            width=int(rect.get("width", 0)),
+            height=int(rect.get("height", 0)),
+            # swaymsg reports millihertz
+            refresh_rate=refresh / 1000.0 if refresh else None,
+            primary=bool(output.get("focused")),
+            identity="-".join(
+                output.get(key) for key in ("make", "model", "serial") if output.get(key) not in (None, "", "Unknown")
+            ) or None,
+        ))
+    return monitors
+
+
+def monitors_from_drm(connectors):
+    """
+    Monitors of the connected drm connectors. sysfs has no layout, so the
+    monitors are placed left to right in connector order.
+    """
+    monitors = []
+    x = 0
+    for connector in connectors:
+        if connector.status != "connected" or not connector.enabled:
+            continue
+        edid = connector.edid
+        width, height = (edid.width, edid.height) if edid and edid.width else (0, 0)
+        if not width and connector.modes:
+            match = re.match(r"(\d+)x(\d+)", connector.modes[0])
+            if match:
+                width, height = map(int, match.groups())
+        monitors.append(Monitor(
+            name=connector.name,
+            x=x,
+            width=width,
+            height=height,
+            refresh_rate=edid.refresh_rate if edid else None,
+            primary=not monitors,
+            identity=edid.identity if edid else None,
+        ))
+        x += width
+    return monitors
+
+
+def add_monitor_identities(monitors, connectors):
+    """
+    Set the EDID identity of monitors found by a Wayland tool, matching drm connectors by name:
+    wlroots compositors use the kernel connector names. The EDID one is preferred, so a monitor
+    keeps its identity whatever backend found it. A name shared by connectors of several GPUs
+    (card0-DP-1, card1-DP-1) cannot be matched, those monitors get no identity.
+    """
+    identities = {}
+    for connector in connectors:
+        if connector.edid and connector.status == "connected":
+            identities[connector.name] = None if connector.name in identities else connector.edid.identity
+    return [
+        replace(monitor, identity=identities[monitor.name]) if identities.get(monitor.name) else monitor
+        for monitor in monitors
+    ]
+
+
+class DisplayBackend(ABC):
+    """One way of listing the monitors"""
+    name = None
+
+    @abstractmethod
+    def available(self):
+        pass
+
+    @abstractmethod
+    def detect(self):
+        """The connected monitors, in no particular order"""
+
+
+class ToolBackend(DisplayBackend):
+    """
+    Runs the X11/Wayland tool `command` and parses its output. The EDID identities
+    are added from the drm connectors unless the tool reports them.
+    """
+    command = None
+
+    def available(self):
+        return shutil.which(self.command[0]) is not None
+
+    def read(self):
+        """The raw output of the tool"""
+        return subprocess.run(self.command, capture_output=True, text=True, timeout=10).stdout
+
+    @abstractmethod
+    def parse(self, text):
+        """The monitors listed in the output of the tool"""
+
+    def detect(self):
+        return add_monitor_identities(self.parse(self.read()), read_drm_connectors())
+
+
+class XrandrBackend(ToolBackend):
+    name = "xrandr"
+    # --props adds the EDID of every output
+    command = ["xrandr", "--query", "--props"]
+
+    def parse(self, text):
+        return parse_xrandr(text)
+
+    def detect(self):
+        return self.parse(self.read())
+
+
+class WlrRandrBackend(ToolBackend):
+    name = "wlr-randr"
+    command = ["wlr-randr"]
+
+    def parse(self, text):
+        return parse_wlr_randr(text)
+
+
+class SwaymsgBackend(ToolBackend):
+    name = "swaymsg"
+    command = ["swaymsg", "-t", "get_outputs"]
+
+    def parse(self, text):
+        return parse_swaymsg_outputs(text)
+
+
+class DrmBackend(DisplayBackend):
+    """In-process, from the kernel's connector status and EDID (no subprocess)"""
+    name = "drm"
+
+    def __init__(self, root=DRM_CLASS_PATH):
+        self.root = root
+
+    def available(self):
+        return os.path.isdir(self.root)
+
+    def detect(self):
+        return monitors_from_drm(read_drm_connectors(self.root))
+
+
+# In order of preference: the engine needs the X11/compositor output names
+BACKENDS = {backend.name: backend for backend in (XrandrBackend, WlrRandrBackend, SwaymsgBackend, DrmBackend)}
+
+
+class ReplayBackend(DisplayBackend):
+    """Replays a recorded output of a tool backend from a fixture file named <case>.<backend>"""
+
+    def __init__(self, path):
+        self.path = path
+        self.case, extension = os.path.splitext(os.path.basename(path))
+        self.name = extension.lstrip(".")
+        if not issubclass(BACKENDS.get(self.name, DisplayBackend), ToolBackend):
+            raise ValueError(f"Unknown backend of fixture {path}: {self.name!r}")
+        self.recorded = BACKENDS[self.name]()
+
+    def available(self):
+        return os.path.isfile(self.path)
+
+    def read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def parse(self, text):
+        return self.recorded.parse(text)
+
+    def detect(self):
+        # The drm connectors of this machine have nothing to do with the recording
+        return self.parse(self.read())
+
+
+def get_display_backend(self):
+    """The backend to detect the screens with: the replayed fixture if one is set, else the first available"""
+    replay = os.environ.get(REPLAY_ENV)
+    if replay:
+        return ReplayBackend(replay)
+    for backend_class in BACKENDS.values():
+        backend = backend_class()
+        if backend.available():
+            return backend
+    return None
+
+
+def list_fixtures(path=FIXTURES_PATH):
+    return sorted(glob.glob(os.path.join(path, "*.*")))
+
+
+def benchmark_backends(runs=200, fixtures=None):
+    """
+    Time detection plus the topology build for every fixture, and for the live backend if there is one.
+    Returns [(label, median_ms, topology)]. The topologies expected of the fixtures are checked by the tests.
+    """
+    results = []
+    backends = [ReplayBackend(path) for path in (fixtures or list_fixtures())]
+    live = get_display_backend(None)
+    if live is not None and not isinstance(live, ReplayBackend):
+        backends.append(live)
+    for backend in backends:
+        label = f"{backend.case}.{backend.name}" if isinstance(backend, ReplayBackend) else f"live {backend.name}"
+        # The live backend starts a process per run, a few runs are enough
+        count = runs if isinstance(backend, ReplayBackend) or backend.name == "drm" else max(1, runs // 20)
+        timings = []
+        topology = None
+        for _ in range(count):
+            started = time.perf_counter()
+            topology = build_topology(backend.name, backend.detect())
+            timings.append((time.perf_counter() - started) * 1000)
+        results.append((label, statistics.median(timings), topology))
+    return results
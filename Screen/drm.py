@@ -0,0 +1,109 @@
+import glob
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+DRM_CLASS_PATH = "/sys/class/drm"
+EDID_HEADER = b"\x00\xff\xff\xff\xff\xff\xff\x00"
+
+
+@dataclass(frozen=True)
+class EdidInfo:
+    vendor: str
+    product: int
+    serial: int
+    serial_text: str = ""
+    model: str = ""
+    width: int = 0
+    height: int = 0
+    refresh_rate: Optional[float] = None
+
+    @property
+    def identity(self):
+        """Stable id of the physical monitor: vendor, product code and serial number"""
+        serial = self.serial_text or (f"{self.serial:08X}" if self.serial else "")
+        return "-".join(part for part in (self.vendor, f"{self.product:04X}", serial) if part)
+
+
+def _descriptor_text(block):
+    return block[5:18].split(b"\n")[0].decode("cp437", errors="replace").strip()
+
+
+def parse_edid(data):
+    """Parse the base block of an EDID blob. Returns None if it is not a valid EDID"""
+    if len(data) < 128 or data[:8] != EDID_HEADER:
+        return None
+    word = (data[8] << 8) | data[9]
+    vendor = "".join(chr(((word >> shift) & 0x1F) + 64) for shift in (10, 5, 0))
+    product = data[10] | (data[11] << 8)
+    serial = int.from_bytes(data[12:16], "little")
+    serial_text = model = ""
+    width = height = 0
+    refresh_rate = None
+    for offset in (54, 72, 90, 108):
+        block = data[offset:offset + 18]
+        pixel_clock = block[0] | (block[1] << 8)
+        if pixel_clock:
+            # Detailed timing descriptor, the first one is the preferred mode
+            if refresh_rate is None:
+                h_active = block[2] | ((block[4] & 0xF0) << 4)
+                h_blank = block[3] | ((block[4] & 0x0F) << 8)
+                v_active = block[5] | ((block[7] & 0xF0) << 4)
+                v_blank = block[6] | ((block[7] & 0x0F) << 8)
+                if h_active + h_blank and v_active + v_blank:
+                    width, height = h_active, v_active
+                    refresh_rate = round(pixel_clock * 10000 / ((h_active + h_blank) * (v_active + v_blank)), 2)
+        elif block[3] == 0xFF:
+            serial_text = _descriptor_text(block)
+        elif block[3] == 0xFC:
+            model = _descriptor_text(block)
+    return EdidInfo(vendor, product, serial, serial_text, model, width, height, refresh_rate)
+
+
+@dataclass(frozen=True)
+class DrmConnector:
+    name: str
+    status: str
+    enabled: bool
+    modes: tuple
+    edid: Optional[EdidInfo]
+
+
+def connector_name(sysfs_name):
+    """card0-DP-1 -> DP-1"""
+    return re.sub(r"^card\d+-", "", sysfs_name)
+
+
+def _read(path, mode="r"):
+    try:
+        with open(path, mode) as f:
+            return f.read()
+    except OSError:
+        return b"" if "b" in mode else ""
+
+
+def read_drm_status(root=DRM_CLASS_PATH):
+    """{card0-DP-1: "connected" | "disconnected" | ...}: only the status, cheap enough to poll"""
+    status = {}
+    for path in glob.glob(os.path.join(root, "card*-*", "status")):
+        value = _read(path).strip()
+        if value:
+            status[os.path.basename(os.path.dirname(path))] = value
+    return status
+
+
+def read_drm_connectors(root=DRM_CLASS_PATH):
+    """Read every connector of /sys/class/drm in-process: status, modes and EDID"""
+    connectors = []
+    for path in sorted(glob.glob(os.path.join(root, "card*-*"))):
+        if not os.path.exists(os.path.join(path, "status")):
+            continue
+        connectors.append(DrmConnector(
+            name=connector_name(os.path.basename(path)),
+            status=_read(os.path.join(path, "status")).strip(),
+            enabled=_read(os.path.join(path, "enabled")).strip() != "disabled",
+            modes=tuple(line for line in _read(os.path.join(path, "modes")).split("\n") if line),
+            edid=parse_edid(_read(os.path.join(path, "edid"), "rb")),
+        ))
+    return connectors
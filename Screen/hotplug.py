@@ -0,0 +1,83 @@
+import threading
+
+from Screen.drm import read_drm_status
+from Screen.topology import invalidate_topology
+
+# A dock or a monitor waking up sends a burst of events, wait for it to settle
+DEBOUNCE_SECONDS = 1.5
+# Fallback when kernel uevents are not available
+POLL_SECONDS = 5.0
+
+
+class HotplugMonitor:
+    """
+    Reacts to monitors being connected or disconnected. Driven by drm kernel uevents
+    (or by polling the connector status as fallback); a burst of events is debounced
+    into one on_change(previous_topology) call, after the cached topology was dropped.
+    """
+
+    def __init__(self, state, on_change, read_status=read_drm_status, debounce=DEBOUNCE_SECONDS,
+                 timer_factory=threading.Timer):
+        self.state = state
+        self.on_change = on_change
+        self.read_status = read_status
+        self.debounce = debounce
+        self.timer_factory = timer_factory
+        self._lock = threading.Lock()
+        self._timer = None
+        self._listener = None
+        self._poll_stop = threading.Event()
+
+    def start(self):
+        from System.uevents import UeventListener
+
+        try:
+            self._listener = UeventListener(["drm"], lambda event: self.notify())
+            self._listener.start()
+        except OSError as e:
+            print(f"drm uevents unavailable ({e}), polling connectors every {POLL_SECONDS:.0f} s")
+            threading.Thread(target=self._poll, name="hotplug-poll", daemon=True).start()
+        return self
+
+    def _poll(self):
+        last = self.read_status()
+        while not self._poll_stop.wait(POLL_SECONDS):
+            status = self.read_status()
+            if status != last:
+                last = status
+                self.notify()
+
+    def notify(self):
+        """A display change was seen: (re)start the debounce timer"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self.timer_factory(self.debounce, self._settled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _settled(self):
+        with self._lock:
+            self._timer = None
+        previous = getattr(self.state, "topology", None)
+        invalidate_topology(self.state)
+        try:
+            self.on_change(previous)
+        except Exception as e:
+            print(f"Hotplug handler error: {e}")
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._listener is not None:
+            self._listener.stop()
+        self._poll_stop.set()
+
+
+def start_hotplug_monitor(self, on_change):
+    """Start the hotplug monitor for a configurator state (once)"""
+    if getattr(self, "hotplug_monitor", None) is None:
+        self.hotplug_monitor = HotplugMonitor(self, on_change).start()
+    return self.hotplug_monitor
@@ -0,0 +1,98 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from Wallpaper_Engine.metrics import record_metric
+
+# Outputs that never get a wallpaper
+IGNORED_OUTPUT_WORDS = ("virtual", "none", "disconnected", "unknown")
+
+
+@dataclass(frozen=True)
+class Monitor:
+    name: str
+    x: int = 0
+    y: int = 0
+    width: int = 0
+    height: int = 0
+    refresh_rate: Optional[float] = None
+    primary: bool = False
+    # EDID vendor-product-serial: follows the physical monitor across connectors and docks
+    identity: Optional[str] = None
+
+    @property
+    def geometry(self):
+        return self.x, self.y, self.width, self.height
+
+
+@dataclass(frozen=True)
+class Topology:
+    """One snapshot of the connected monitors, as reported by a single backend run"""
+    method: Optional[str]
+    monitors: List[Monitor] = field(default_factory=list)
+
+    @property
+    def names(self):
+        return [monitor.name for monitor in self.monitors]
+
+    def get(self, name):
+        return next((monitor for monitor in self.monitors if monitor.name == name), None)
+
+    def geometries(self):
+        """{name: (x, y, w, h)} of the monitors with a known geometry"""
+        return {m.name: m.geometry for m in self.monitors if m.width and m.height}
+
+    def refresh_rates(self):
+        """{name: Hz} of the monitors with a known refresh rate"""
+        return {m.name: m.refresh_rate for m in self.monitors if m.refresh_rate}
+
+    def identities(self):
+        """{name: identity} of the monitors with an EDID identity"""
+        return {m.name: m.identity for m in self.monitors if m.identity}
+
+
+def build_topology(method, monitors):
+    """Topology of the monitors found by a backend, without the outputs that never get a wallpaper"""
+    monitors = [
+        monitor for monitor in monitors
+        if monitor.name and not any(word in monitor.name.lower() for word in IGNORED_OUTPUT_WORDS)
+    ]
+    monitors.sort(key=lambda monitor: monitor.name)
+    return Topology(method=method, monitors=monitors)
+
+
+def detect_topology(self, backend=None):
+    """Run the display backend once and return a Topology snapshot (no monitors if it fails)"""
+    from Screen.backends import get_display_backend
+
+    backend = backend or get_display_backend(self)
+    if backend is None:
+        print("No supported Screen detection method found.")
+        return Topology(method=None)
+    started = time.monotonic()
+    try:
+        monitors = backend.detect()
+    except Exception as e:
+        print(f"Error detecting screens with {backend.name}: {e}")
+        return Topology(method=backend.name)
+    record_metric("topology_detect_ms", (time.monotonic() - started) * 1000)
+    return build_topology(backend.name, monitors)
+
+
+_topology_lock = threading.Lock()
+
+
+def get_topology(self):
+    """The display topology, detected once and cached on the configurator until invalidate_topology()"""
+    with _topology_lock:
+        if getattr(self, "topology", None) is None:
+            self.topology = detect_topology(self)
+            print(f"Screen detection method: {self.topology.method}, screens: {self.topology.names}")
+        return self.topology
+
+
+def invalidate_topology(self):
+    """Forget the cached topology, the next get_topology() runs the backend again"""
+    with _topology_lock:
+        self.topology = None
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from Wallpaper_Engine.metrics import record_metric
+
+
+class ApplyQueue(threading.Thread):
+    """
+    Coalesces apply requests into as few engine restarts as possible.
+    Requests arriving within `debounce` seconds of each other (but no later than
+    `max_delay` after the first one) are applied together, and requests made while
+    an apply is running are folded into a single follow-up apply.
+    The apply always reads the latest configurator state, so merged requests apply
+    their combined target state.
+    """
+
+    def __init__(self, state, apply_func, debounce=0.4, max_delay=2.0, lock=None, on_applied=None,
+                 clock=time.monotonic):
+        super().__init__(name="apply-queue", daemon=True)
+        self.state = state
+        self.apply_func = apply_func
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.lock = lock or threading.Lock()
+        self.on_applied = on_applied
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._pending = 0
+        self._first_request = None
+        self._last_request = None
+        # Each request gets a ticket, an apply cycle completes every ticket issued before it started
+        self._issued = 0
+        self._completed = 0
+        self._last_result = (True, "Nothing to apply")
+        self.applying = False
+
+    def request(self):
+        """Queue an apply. Returns a ticket for wait()"""
+        with self._cond:
+            now = self.clock()
+            self._pending += 1
+            self._last_request = now
+            if self._first_request is None:
+                self._first_request = now
+            self._issued += 1
+            self._cond.notify_all()
+            return self._issued
+
+    def wait(self, ticket, timeout=None):
+        """Wait until the apply cycle covering the ticket has finished. Returns its (ok, message)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._completed >= ticket or self._stopping, timeout)
+            return self._last_result
+
+    def apply_and_wait(self, timeout=None):
+        return self.wait(self.request(), timeout)
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping:
+                    return
+                # Debounce: wait for a quiet period, bounded by max_delay since the first request
+                while not self._stopping:
+                    deadline = min(self._last_request + self.debounce, self._first_request + self.max_delay)
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                merged = self._pending
+                ticket = self._issued
+                self._pending = 0
+                self._first_request = None
+                self.applying = True
+
+            try:
+                with self.lock:
+                    result = self.apply_func(self.state)
+            except Exception as e:
+                result = (False, f"Error applying changes: {e}")
+            record_metric("apply_requests_coalesced", merged)
+
+            with self._cond:
+                self.applying = False
+                self._completed = ticket
+                self._last_result = result
+                self._cond.notify_all()
+            if self.on_applied:
+                try:
+                    self.on_applied(*result)
+                except Exception as e:
+                    print(f"Apply callback error: {e}")
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+
+_apply_lock_guard = threading.Lock()
+
+
+def get_apply_lock(self):
+    """
+    The lock of a configurator state held while the engine is stopped and started:
+    by the apply queue, and by anything else that restarts the engine (power profiles)
+    """
+    with _apply_lock_guard:
+        if getattr(self, "apply_lock", None) is None:
+            self.apply_lock = threading.Lock()
+        return self.apply_lock
+
+
+def start_apply_queue(self, on_applied=None, lock=None):
+    """Start the apply queue for a configurator state (once)"""
+    from Scripts.config_setter import apply_assigned_screens
+
+    if getattr(self, "apply_queue", None) is None:
+        self.apply_queue = ApplyQueue(
+            self, apply_assigned_screens, lock=lock or get_apply_lock(self), on_applied=on_applied
+        )
+        self.apply_queue.start()
+    return self.apply_queue
@@ -1,15 +1,177 @@
 import os
+import time
 
-from PySide6.QtWidgets import QMessageBox, QApplication
+from Files.config_files import merge_external_config, save_current_config
+from Screen.screen_detection import detect_screens, update_detected_screens
 
-from Files.config_files import save_current_config
-from Screen.screen_detection import detect_screens
 
+from Wallpaper_Engine.metrics import record_metric
+from Wallpaper_Engine.playlists import reschedule_playlists
+from Wallpaper_Engine.power_profiles import build_active_plan, get_profile_script_path, write_profile_scripts
+from Wallpaper_Engine.process_manager import stop_wallpaper_engine, start_wallpaper_engine, check_wallpaper_process, \
+    stop_engine_screens
+from Wallpaper_Engine.scheduling import apply_engine_scheduling
+from Wallpaper_Engine.systemd_backend import uses_systemd
 
-from Wallpaper_Engine.process_manager import stop_wallpaper_engine, start_wallpaper_engine, check_wallpaper_process
+
+def set_screen_wallpaper(self, screen_name, wallpaper_id):
+    """Assign (or unassign with None) a wallpaper to a Screen and save the config, without touching the UI"""
+    if screen_name not in self.detected_screens:
+        raise ValueError(f"Unknown screen: {screen_name}")
+    if wallpaper_id is not None and wallpaper_id not in self.wallpapers:
+        raise ValueError(f"Unknown wallpaper: {wallpaper_id}")
+    self.selected_wallpapers[screen_name] = wallpaper_id
+    save_current_config(self, screen_name, wallpaper_id)
+
+
+def get_assigned_wallpaper_paths(self):
+    """
+    Return (wallpaper_paths, error) for the screens that have a wallpaper assigned.
+    error is a message describing the first missing wallpaper, or None.
+    """
+    wallpaper_paths = {}
+    for screen in self.detected_screens:
+        wallpaper_id = self.selected_wallpapers.get(screen)
+        if not wallpaper_id:
+            continue
+        wallpaper_path = os.path.join(self.wallpaper_base_path, wallpaper_id)
+        if not os.path.exists(wallpaper_path):
+            return {}, f"Wallpaper for {screen} does not exist: {wallpaper_path}"
+        wallpaper_paths[screen] = wallpaper_path
+    return wallpaper_paths, None
+
+
+def get_managed_script_paths(self):
+    """The start script and the power profile scripts written by an apply"""
+    return [self.script_path] + [get_profile_script_path(self, profile) for profile in ("reduced", "static")]
+
+
+def snapshot_scripts(self):
+    """Read the managed scripts, to be restored by a rollback"""
+    snapshot = {}
+    for path in get_managed_script_paths(self):
+        try:
+            with open(path, "r") as f:
+                snapshot[path] = f.read()
+        except OSError:
+            continue
+    return snapshot
+
+
+def rollback_apply(self, reason):
+    """
+    Restore the last known-good scripts and restart the engine with them.
+    Returns (False, message) with the reason the new configuration failed.
+    """
+    from Scripts.launch_plan import write_script
+
+    record_metric("apply_rollbacks", 1)
+    good_scripts = getattr(self, "last_good_scripts", None)
+    if not good_scripts:
+        stop_wallpaper_engine(self)
+        self.running_plan = None
+        return False, f"{reason}. No previous working configuration to restore"
+
+    print(f"Apply failed ({reason}), restoring the previous configuration")
+    for path, content in good_scripts.items():
+        write_script(path, content)
+    stop_wallpaper_engine(self)
+    if not start_wallpaper_engine(self):
+        self.running_plan = None
+        return False, (
+            f"{reason}. Restoring the previous configuration also failed: "
+            f"{getattr(self, 'last_start_reason', 'unknown reason')}"
+        )
+    self.running_plan = getattr(self, "last_good_plan", None)
+    return False, f"{reason}. The previous configuration was restored"
+
+
+def apply_assigned_screens(self):
+    """
+    Regenerate the script for the assigned screens and restart only what changed:
+    nothing when the engine arguments are the same as the running ones, only the
+    changed screens in one engine per Screen mode, everything otherwise.
+    The apply is transactional: if the engine does not become ready, the last
+    known-good scripts are restored and restarted.
+    The engine is stopped when no Screen has a wallpaper. Returns (ok, message).
+    """
+    from Scripts.launch_plan import diff_launch_plans
+    from Scripts.start_script import update_script_with_assigned_screens
+
+    apply_started = time.monotonic()
+    # Playlist edits take effect with the apply that carries them
+    reschedule_playlists(self)
+    wallpaper_paths, error = get_assigned_wallpaper_paths(self)
+    if error:
+        return False, error
+
+    if not wallpaper_paths:
+        stop_wallpaper_engine(self)
+        self.running_plan = None
+        return True, "No wallpapers assigned, engine stopped"
+
+    # An engine found running at the first apply runs a working script
+    running = check_wallpaper_process(self)
+    if running and getattr(self, "last_good_scripts", None) is None:
+        self.last_good_scripts = snapshot_scripts(self)
+        self.last_good_plan = getattr(self, "running_plan", None)
+
+    # Step 1: Update script configuration (only with assigned screens).
+    # Scripts are replaced atomically, a running engine keeps its old script
+    try:
+        changed = update_script_with_assigned_screens(self, wallpaper_paths)
+        changed = write_profile_scripts(self, wallpaper_paths) or changed
+    except Exception as e:
+        return rollback_apply(self, str(e)) if running else (False, str(e))
+    target = build_active_plan(self, wallpaper_paths)
+
+    # Step 2: Work out what has to be restarted
+    if not running:
+        restart_all, screens = True, set()
+    elif getattr(self, "running_plan", None) is not None:
+        restart_all, screens = diff_launch_plans(self.running_plan, target)
+    else:
+        # Started outside this configurator: trust the script on disk
+        restart_all, screens = changed, set()
+    if screens and (uses_systemd(self) or target is None):
+        # Single screens can only be restarted when the configurator owns the processes
+        restart_all, screens = True, set()
+
+    if not restart_all and not screens:
+        # Comment-only settings (scheduling, idle, power) apply without a restart
+        apply_engine_scheduling(self)
+        self.running_plan = target
+        record_metric("apply_skipped", 1)
+        return True, "No engine changes, wallpaper engine left running"
+
+    # Step 3: Restart the changed screens, or the whole engine, and verify readiness
+    if screens:
+        stop_engine_screens(self, screens)
+        for screen in sorted(screens):
+            if target.get_screen(screen) and not start_wallpaper_engine(self, screen):
+                reason = f"Engine for {screen} did not start: {getattr(self, 'last_start_reason', 'unknown reason')}"
+                return rollback_apply(self, reason)
+        applied = f"Updated {', '.join(sorted(screens))}"
+    else:
+        if running:
+            stop_wallpaper_engine(self)
+        if not start_wallpaper_engine(self):
+            reason = f"Wallpaper engine did not start: {getattr(self, 'last_start_reason', 'unknown reason')}"
+            return rollback_apply(self, reason)
+        applied = "Applied"
+
+    # Commit: this configuration is the new known-good one
+    self.running_plan = target
+    self.last_good_plan = target
+    self.last_good_scripts = snapshot_scripts(self)
+
+    apply_latency_ms = (time.monotonic() - apply_started) * 1000
+    record_metric("apply_latency_ms", apply_latency_ms)
+    return True, f"{applied} in {apply_latency_ms / 1000:.1f} s"
 
 
 def assign_and_apply(self, screen_name):
+    from PySide6.QtWidgets import QMessageBox
     from UI.user_interface import update_screen_status
     """Assign wallpaper to a Screen and automatically apply changes"""
     if self.current_selection is None:
@@ -29,32 +191,86 @@ def assign_and_apply(self, screen_name):
 
 def unassign_wallpaper(self, screen_name):
     from UI.user_interface import update_screen_status
-    from Scripts.start_script import update_script_with_assigned_screens
     """Unassign the wallpaper from a Screen and update the status"""
     self.selected_wallpapers[screen_name] = None
     save_current_config(self, screen_name, None)  # Save config after unassignment
     update_screen_status(self)
-    # Optionally: stop the engine if there are no wallpapers assigned
-    assigned = [s for s in self.detected_screens if self.selected_wallpapers.get(s)]
-    if not assigned:
-        stop_wallpaper_engine(self)
-    else:
-        wallpaper_paths = {}
-        for screen in assigned:
-            wallpaper_id = self.selected_wallpapers.get(screen)
-            if wallpaper_id:
-                wallpaper_paths[screen] = os.path.join(
-                    self.wallpaper_base_path, wallpaper_id
-                )
-        update_script_with_assigned_screens(self, wallpaper_paths)
-        start_wallpaper_engine(self)
-    # Update the UI
+    # Stops the engine if there are no wallpapers assigned
+    request_apply(self)
+
+def request_apply(self):
+    from PySide6.QtCore import QTimer
+    from Scripts.apply_queue import start_apply_queue
+    """Queue a background apply, changes made in quick succession are applied with one restart"""
+    queue = start_apply_queue(
+        self,
+        # The queue calls back from its own thread, report on the GUI thread
+        on_applied=lambda ok, message: QTimer.singleShot(0, self, lambda: report_apply_result(self, ok, message)),
+    )
+    self.statusBar().showMessage("Applying changes...")
+    queue.request()
+
+def rotate_playlist(self, screen_name, wallpaper_id):
+    from UI.user_interface import update_screen_status
+    """Show the next playlist item on a Screen (GUI thread)"""
+    set_screen_wallpaper(self, screen_name, wallpaper_id)
+    update_screen_status(self, {screen_name})
+    request_apply(self)
+
+def on_displays_changed(self, previous_topology):
+    from Screen.topology import get_topology
+    from Steam.workshop_items import load_wallpapers
+    from UI.UI_Tools import discard_overlays
+    from UI.user_interface import setup_ui
+    """Follow a monitor hotplug: rebuild the per-screen UI if the screens changed and reapply"""
+    if get_topology(self) == previous_topology:
+        return
+    # The overlays are created again, at the new positions, by the next Identify Monitors
+    discard_overlays(self)
+    added, removed = update_detected_screens(self)
+    if added or removed:
+        setup_ui(self)
+        load_wallpapers(self)
+        changes = [f"+{screen}" for screen in added] + [f"-{screen}" for screen in removed]
+        self.statusBar().showMessage(f"Displays changed: {', '.join(changes)}", 8000)
+    # Geometry or refresh rate changes matter too, the apply restarts only what differs
+    # (and stops the engine of a screen that went away)
+    request_apply(self)
+
+def reload_external_config(self, config):
+    from UI.user_interface import update_screen_status
+    """Merge a config store edited outside the configurator, then refresh and apply only what changed"""
+    from UI.profiles_interface import refresh_profile_combo
+    changed = merge_external_config(self, config)
+    refresh_profile_combo(self)
+    if not changed:
+        return
+    update_screen_status(self, changed)
+    # The apply diffs against the running plan, so only the changed screens restart
+    if changed & set(self.detected_screens):
+        request_apply(self)
+    self.statusBar().showMessage(f"Config reloaded from disk: {', '.join(sorted(changed))}", 8000)
+
+def report_apply_result(self, ok, message):
+    from PySide6.QtWidgets import QMessageBox
+    from UI.user_interface import update_screen_status
+    """Show the result of a background apply: errors in a dialog, success in the status bar"""
     update_screen_status(self)
+    if not ok:
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error", message)
+        return
+    assigned_titles = [
+        self.wallpapers[wallpaper_id]["title"][:30]
+        for wallpaper_id in (self.selected_wallpapers.get(s) for s in self.detected_screens)
+        if wallpaper_id in self.wallpapers
+    ]
+    self.statusBar().showMessage(f"✓ {message}: {', '.join(assigned_titles)}", 8000)
 
 def apply_changes_automatically(self):
-    from Scripts.start_script import update_script_with_assigned_screens
+    from PySide6.QtWidgets import QMessageBox
     """Automatically apply changes when at least one Screen is configured"""
-    # Detect screens again in case the session changed (e.g., xrdp vs physical session)
+    # Screens from the cached topology, which is refreshed when the displays change
     self.detected_screens = detect_screens(self)
 
     # Check that at least one wallpaper is assigned
@@ -70,66 +286,10 @@ def apply_changes_automatically(self):
         return
 
     # Check that assigned wallpapers exist
-    wallpaper_paths = {}
-    for screen in assigned_screens:
-        wallpaper_id = self.selected_wallpapers.get(screen)
-        if wallpaper_id is None:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"No wallpaper assigned for {screen}.",
-            )
-            return
-
-        wallpaper_path = os.path.join(self.wallpaper_base_path, wallpaper_id)
-        if not os.path.exists(wallpaper_path):
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Wallpaper for {screen} does not exist: {wallpaper_path}",
-            )
-            return
-
-        wallpaper_paths[screen] = wallpaper_path
-
-    # Update interface
-    QApplication.processEvents()
-
-    try:
-        # Step 1: Stop wallpaper engine if running
-        was_running = check_wallpaper_process(self)
-        if was_running:
-            stop_wallpaper_engine(self)
-
-        # Step 2: Update script configuration (only with assigned screens)
-        update_script_with_assigned_screens(self, wallpaper_paths)
-
-        # Step 3: Restart wallpaper engine
-        QApplication.processEvents()
-
-        start_wallpaper_engine(self)
-
-        # Show confirmation
-        success_lines = ["Wallpapers applied successfully:\n"]
-        for screen in self.detected_screens:
-            wallpaper_id = self.selected_wallpapers.get(screen)
-            if wallpaper_id is not None and wallpaper_id in self.wallpapers:
-                title = self.wallpapers[wallpaper_id]["title"]
-                success_lines.append(
-                    f"✓ {screen}: {title[:30]}{'...' if len(title) > 30 else ''}"
-                )
-            else:
-                success_lines.append(f"○ {screen}: Not assigned")
-
-        QMessageBox.information(
-            self,
-            "Changes Applied",
-            "\n".join(success_lines),
-        )
+    _, error = get_assigned_wallpaper_paths(self)
+    if error:
+        QMessageBox.critical(self, "Error", error)
+        return
 
-    except Exception as e:
-        QMessageBox.critical(
-            self,
-            "Error",
-            f"Error applying changes: {e}",
-        )
+    # Restart the engine in the background, merged with any other pending change
+    request_apply(self)
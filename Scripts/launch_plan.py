@@ -0,0 +1,355 @@
+import hashlib
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from Files.config_files import write_file_atomic
+from Files.log_sink import LOG_FILE, LOG_MAX_BYTES, log_fd_variable
+from Screen.screen_detection import get_effective_fps, get_refresh_rates
+from Wallpaper_Engine.idle_monitor import get_idle_timeout
+from Wallpaper_Engine.power_profiles import get_power_settings
+from Wallpaper_Engine.scheduling import get_screen_scheduling
+from Wallpaper_Engine.systemd_backend import get_launcher_settings
+
+# "single": one engine renders every Screen, "per_screen": one engine per Screen,
+# so a change to one Screen only restarts that Screen's engine
+PROCESS_MODES = ("single", "per_screen")
+SCALING_MODES = ("fill", "fit", "stretch", "default")
+CLAMP_MODES = ("border", "clamp", "repeat")
+# Names of the wallpaper properties passed with --set-property
+PROPERTY_NAME = re.compile(r"[\w.-]+")
+
+
+@dataclass
+class ScreenPlan:
+    """One --screen-root of the engine command"""
+    name: str
+    wallpaper_path: str
+    scaling: str = "fill"
+    properties: Dict[str, object] = field(default_factory=dict)
+    refresh_rate: Optional[float] = None
+    effective_fps: int = 30
+
+
+@dataclass
+class GlobalOptions:
+    """Engine options that apply to every Screen (taken from the first assigned Screen config)"""
+    fps: int = 30
+    volume: int = 15
+    silent: bool = True
+    noautomute: bool = False
+    no_audio_proc: bool = False
+    mouse: bool = True
+    parallax: bool = True
+    fs_pause: bool = True
+    clamp: str = "border"
+    process_mode: str = "single"
+
+
+@dataclass
+class LaunchPlan:
+    """Everything the start script does, rendered by render_launch_plan()"""
+    screens: List[ScreenPlan]
+    options: GlobalOptions
+    engine_fps: int
+    launcher: Dict[str, object] = field(default_factory=dict)
+    # Settings applied outside the engine command, recorded as comment lines
+    metadata: List[str] = field(default_factory=list)
+
+    def get_screen(self, name):
+        return next((screen for screen in self.screens if screen.name == name), None)
+
+
+def get_startup_wait_block():
+    """
+    Bash snippet that waits for the graphical session instead of a fixed sleep.
+    The configurator sets WPE_SKIP_STARTUP_WAIT because the session is already up.
+    """
+    return (
+        "# Wait until the display server accepts clients (max 10 seconds)\n"
+        'if [[ -z "$WPE_SKIP_STARTUP_WAIT" ]]; then\n'
+        '    RUNTIME_DIR="${XDG_RUNTIME_DIR:-/run/user/$(id -u)}"\n'
+        "    for _ in $(seq 1 100); do\n"
+        '        if [[ -n "$WAYLAND_DISPLAY" && -S "$RUNTIME_DIR/$WAYLAND_DISPLAY" ]]; then\n'
+        "            break\n"
+        "        fi\n"
+        '        DISPLAY_NUM="${DISPLAY#*:}"\n'
+        '        if [[ -n "$DISPLAY" && -S "/tmp/.X11-unix/X${DISPLAY_NUM%%.*}" ]]; then\n'
+        "            break\n"
+        "        fi\n"
+        "        sleep 0.1\n"
+        "    done\n"
+        "fi\n\n"
+    )
+
+
+def get_launcher_comment(self):
+    """Comment line that records the launcher backend and its resource limits in the script"""
+    s = get_launcher_settings(self)
+    return (
+        f"# Launcher: {s['launcher']} CPUQuota={s['cpu_quota']} MemoryMax={s['memory_max']} "
+        f"IOWeight={s['io_weight']} Nice={s['nice']}\n"
+    )
+
+
+def get_idle_comment(self):
+    """Comment line that records the idle suspension timeout (applied by the idle monitor)"""
+    return f"# Idle: timeout={get_idle_timeout(self)}\n"
+
+
+def get_power_comment(self):
+    """Comment line that records the power profile settings (applied by the power profile manager)"""
+    s = get_power_settings(self)
+    return (
+        f"# Power: enabled={int(bool(s['power_profiles']))} battery={s['battery_profile']} "
+        f"fps={s['reduced_fps']} low={s['static_below']}\n"
+    )
+
+
+def get_requested_fps(self, screens):
+    """FPS set in the Config dialog (global key, taken from the first Screen config)"""
+    for screen in screens:
+        cfg = self.screen_configs.get(screen)
+        if cfg and "fps" in cfg:
+            return int(cfg["fps"])
+    return GlobalOptions.fps
+
+
+def get_engine_fps(self, screens, fps):
+    """
+    FPS passed to the engine. --fps applies to every Screen of the process, so it is the
+    highest of the per-Screen effective values (each capped to its refresh rate or a divisor)
+    """
+    return max((get_effective_fps(self, screen, fps) for screen in screens), default=fps)
+
+
+def get_scheduling_comments(self, screens):
+    """Comment lines that record the per-Screen scheduling options (applied by the process manager)"""
+    lines = ""
+    for screen in screens:
+        o = get_screen_scheduling(self, screen)
+        lines += (
+            f"# Scheduling {screen}: cpu_affinity={o['cpu_affinity'] or 'all'} process_nice={o['process_nice']} "
+            f"sched_policy={o['sched_policy']} io_class={o['io_class']}\n"
+        )
+    return lines
+
+
+# The allowed values of the string options, the others only need the type of their default
+OPTION_CHOICES = {"clamp": CLAMP_MODES, "process_mode": PROCESS_MODES, "scaling": SCALING_MODES}
+
+
+def checked_option(config, name, default):
+    """A Screen config value, or the default if it has another type than the default or is not one of its choices"""
+    value = config.get(name, default)
+    if type(value) is not type(default) or value not in OPTION_CHOICES.get(name, (value,)):
+        print(f"Ignoring invalid {name}: {value!r}")
+        return default
+    return value
+
+
+def build_launch_plan(self, wallpaper_paths, max_fps=None):
+    """
+    Build the launch plan for the given {screen: wallpaper_path} (in engine order).
+    max_fps lowers the FPS, as used by the reduced power profile.
+    """
+    names = list(wallpaper_paths.keys())
+    first = self.screen_configs.get(names[0], {}) if names else {}
+    options = GlobalOptions(**{
+        name: checked_option(first, name, default) for name, default in vars(GlobalOptions()).items()
+    })
+    fps = min(options.fps, max_fps) if max_fps else options.fps
+
+    refresh_rates = get_refresh_rates(self)
+    screens = []
+    for name in names:
+        cs = self.screen_configs.get(name, {})
+        properties = cs.get("properties")
+        properties = dict(properties) if isinstance(properties, dict) else {}
+        for key in [key for key in properties if not PROPERTY_NAME.fullmatch(str(key))]:
+            print(f"Ignoring invalid property name of {name}: {key!r}")
+            del properties[key]
+        screens.append(
+            ScreenPlan(
+                name=name,
+                wallpaper_path=wallpaper_paths[name],
+                scaling=checked_option(cs, "scaling", "fill"),
+                properties=properties,
+                refresh_rate=refresh_rates.get(name),
+                effective_fps=get_effective_fps(self, name, fps),
+            )
+        )
+
+    metadata = [
+        get_launcher_comment(self),
+        get_idle_comment(self),
+        get_power_comment(self),
+        f"# Processes: {options.process_mode}\n",
+        f"# FPS: requested={options.fps}\n",
+    ]
+    for screen in screens:
+        refresh_text = f"{screen.refresh_rate:.2f}Hz" if screen.refresh_rate else "unknown"
+        metadata.append(f"# Refresh {screen.name}: {refresh_text} effective_fps={screen.effective_fps}\n")
+    metadata.append(get_scheduling_comments(self, names))
+
+    return LaunchPlan(
+        screens=screens,
+        options=options,
+        engine_fps=get_engine_fps(self, names, fps),
+        launcher=get_launcher_settings(self),
+        metadata=metadata,
+    )
+
+
+def render_launch_plan(plan):
+    """Render a launch plan into the bash start script"""
+    content = "#!/bin/bash\n\n"
+    content += "# Automatically generated file by WallpaperEngineConfigurator.py\n"
+    content += "# Do not edit manually - changes will be overwritten\n"
+    content += "".join(plan.metadata) + "\n"
+    content += "# Create log file if it doesn't exist\n"
+    content += f'LOG_FILE="{LOG_FILE}"\ntouch "$LOG_FILE"\n'
+    content += "# Started without the configurator: rotate the log over the size cap, engine output is appended to it\n"
+    content += (
+        f'if [[ -z "$WPE_LOG_SINK" && $(stat -c %s "$LOG_FILE" 2>/dev/null || echo 0) -gt {LOG_MAX_BYTES} ]]; then\n'
+        '    mv -f "$LOG_FILE" "$LOG_FILE.1"\n    touch "$LOG_FILE"\nfi\n'
+    )
+    content += 'exec 3>>"$LOG_FILE"\n'
+    content += "# The configurator's log sink passes pipes instead; an engine must not die writing to a closed one\n"
+    content += "trap '' PIPE\n\n"
+    content += 'echo "$(date): Starting Wallpaper Engine..." >> "$LOG_FILE"\n\n'
+    content += get_startup_wait_block()
+
+    for idx, screen in enumerate(plan.screens, 1):
+        content += f"WALLPAPER{idx}={shlex.quote(screen.wallpaper_path)}\n"
+
+    content += "\n# Check that wallpapers exist\n"
+    for idx, screen in enumerate(plan.screens, 1):
+        content += f'if [[ ! -d "$WALLPAPER{idx}" ]]; then\n'
+        content += (
+            f'    echo "$(date): Error: Wallpaper for "{shlex.quote(screen.name)}" not found at $WALLPAPER{idx}"'
+            ' >> "$LOG_FILE"\n'
+        )
+        content += "    exit 1\nfi\n"
+
+    if plan.options.process_mode == "per_screen":
+        # A single-screen start leaves the engines of the other screens running
+        content += '# Clean up previous processes\nif [[ -z "$1" ]]; then\n    pkill -f linux-wallpaperengine 2>/dev/null\nfi\n\n'
+    else:
+        content += "# Clean up previous processes\npkill -f linux-wallpaperengine 2>/dev/null\n\n"
+    content += "# Environment variables for stability\n"
+    content += "export LD_LIBRARY_PATH=/opt/linux-wallpaperengine:$LD_LIBRARY_PATH\n"
+    content += "export __GL_THREADED_OPTIMIZATIONS=0\n"
+    content += 'export PULSE_RUNTIME_PATH="/run/user/$(id -u)/pulse"\n\n'
+    content += 'echo "$(date): Running with wallpapers:" >> "$LOG_FILE"\n'
+    for idx, screen in enumerate(plan.screens, 1):
+        content += f'echo {shlex.quote(f"  {screen.name}: ")}"$WALLPAPER{idx}" >> "$LOG_FILE"\n'
+
+    if plan.options.process_mode == "per_screen":
+        content += "\n# Run one wallpaper engine per screen (\"$1\" starts a single screen)\n"
+        content += "start_screen() {\n    case \"$1\" in\n"
+        for idx, screen in enumerate(plan.screens, 1):
+            content += f"        {shlex.quote(screen.name)})\n"
+            content += render_engine_command(plan, [(idx, screen)], screen.effective_fps) + " &\n"
+            content += "            ;;\n"
+        content += "    esac\n}\n\n"
+        content += 'if [[ -n "$1" ]]; then\n    start_screen "$1"\nelse\n'
+        for screen in plan.screens:
+            content += f"    start_screen {shlex.quote(screen.name)}\n"
+        content += "fi\nwait\n"
+    else:
+        content += "\n# Run wallpaper engine\n"
+        content += render_engine_command(plan, list(enumerate(plan.screens, 1)), plan.engine_fps) + "\n"
+    return content
+
+
+def render_engine_command(plan, indexed_screens, fps):
+    """Render the linux-wallpaperengine command for the given (index, ScreenPlan) pairs"""
+    o = plan.options
+    content = "linux-wallpaperengine \\\n"
+    for idx, screen in indexed_screens:
+        content += f" --scaling {shlex.quote(screen.scaling)} \\\n --screen-root {shlex.quote(screen.name)} \\\n"
+        content += f" --bg \"$WALLPAPER{idx}\" \\\n"
+        for p_key, p_val in screen.properties.items():
+            # Values are user text: quoted, they never reach bash as code
+            content += f" --set-property {p_key}={shlex.quote(str(p_val))} \\\n"
+
+    if o.silent:
+        content += " --silent \\\n"
+    else:
+        content += f" --volume {o.volume} \\\n"
+    if o.noautomute:
+        content += " --noautomute \\\n"
+    if o.no_audio_proc:
+        content += " --no-audio-processing \\\n"
+    if not o.mouse:
+        content += " --disable-mouse \\\n"
+    if o.clamp:
+        content += f" --clamp {shlex.quote(o.clamp)} \\\n"
+    if not o.parallax:
+        content += " --disable-parallax \\\n"
+    if not o.fs_pause:
+        content += " --no-fullscreen-pause \\\n"
+    content += f" --fps {fps} \\\n"
+    # The log pipe of the Screen (one engine per Screen) or of the engine, else the log file (fd 3)
+    if o.process_mode == "per_screen" and len(indexed_screens) == 1:
+        target = f'${{{log_fd_variable(indexed_screens[0][1].name)}:-3}}'
+    else:
+        target = f'${{{log_fd_variable()}:-3}}'
+    content += f'>&"{target}" 2>&1'
+    return content
+
+
+def diff_launch_plans(old, new):
+    """
+    Compare the engine arguments of two plans (comment-only settings are ignored).
+    Returns (restart_all, screens): screens are the ones whose engine must be
+    (re)started or stopped when each Screen runs its own engine.
+    """
+    if old is None or new is None:
+        return True, set()
+    if old.options != new.options or old.launcher != new.launcher:
+        return True, set()
+    old_screens = {screen.name: screen for screen in old.screens}
+    new_screens = {screen.name: screen for screen in new.screens}
+    changed = {
+        name for name in old_screens.keys() | new_screens.keys()
+        if old_screens.get(name) != new_screens.get(name)
+    }
+    if new.options.process_mode != "per_screen":
+        # A single engine renders every Screen, any change restarts it
+        return bool(changed) or old.engine_fps != new.engine_fps, set()
+    return False, changed
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_file_hash(path):
+    """Hash of a file on disk, or None if it cannot be read"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def write_script(path, content):
+    """
+    Write an executable script atomically, skipping the write when the content on disk
+    has the same hash. Returns True if the file changed.
+    """
+    if get_file_hash(path) == content_hash(content):
+        return False
+    write_file_atomic(path, content, mode=0o755)
+    return True
+
+
+def write_launch_plan(plan, path):
+    """Render and write a launch plan. Returns True if the script changed"""
+    changed = write_script(path, render_launch_plan(plan))
+    print(f"Script {'written' if changed else 'unchanged'}: {os.path.basename(path)}")
+    return changed
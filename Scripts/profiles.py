@@ -0,0 +1,100 @@
+import copy
+import re
+
+from Files.config_files import save_current_config
+
+PROFILE_NAME_PATTERN = re.compile(r"^[\w .-]{1,64}$")
+
+
+class _ProfileView:
+    """The configurator state as it would be with a profile active, without changing it"""
+
+    def __init__(self, state, profile):
+        self._state = state
+        self.selected_wallpapers = profile.get("selected_wallpapers", {})
+        self.screen_configs = profile.get("screen_configs", {})
+
+    def __getattr__(self, name):
+        return getattr(self._state, name)
+
+
+def get_profiles(self):
+    if getattr(self, "profiles", None) is None:
+        self.profiles = {}
+    return self.profiles
+
+
+def get_profile(self, name):
+    profile = get_profiles(self).get(name)
+    if profile is None:
+        raise ValueError(f"Unknown profile: {name}")
+    return profile
+
+
+def save_profile(self, name):
+    """Store the current assignments, options and properties as a named profile (and make it active)"""
+    if not PROFILE_NAME_PATTERN.match(name or ""):
+        raise ValueError(f"Invalid profile name: {name!r}")
+    get_profiles(self)[name] = {
+        "selected_wallpapers": dict(self.selected_wallpapers),
+        "screen_configs": copy.deepcopy(self.screen_configs),
+    }
+    self.active_profile = name
+    save_current_config(self)
+
+
+def delete_profile(self, name):
+    get_profile(self, name)
+    del self.profiles[name]
+    if getattr(self, "active_profile", None) == name:
+        self.active_profile = None
+    save_current_config(self)
+
+
+def compile_profile(self, name):
+    """
+    Build the launch plan of a profile against the current screens, without activating it.
+    Raises ValueError if the profile cannot run (unknown or missing wallpapers).
+    """
+    from Scripts.config_setter import get_assigned_wallpaper_paths
+    from Scripts.launch_plan import build_launch_plan
+
+    view = _ProfileView(self, get_profile(self, name))
+    for screen in self.detected_screens:
+        wallpaper_id = view.selected_wallpapers.get(screen)
+        if wallpaper_id is not None and wallpaper_id not in self.wallpapers:
+            raise ValueError(f"Profile {name}: unknown wallpaper {wallpaper_id} for {screen}")
+    wallpaper_paths, error = get_assigned_wallpaper_paths(view)
+    if error:
+        raise ValueError(f"Profile {name}: {error}")
+    return build_launch_plan(view, wallpaper_paths) if wallpaper_paths else None
+
+
+def activate_profile(self, name):
+    """
+    Make a profile the target configuration in one step. The profile is compiled first,
+    so a profile that cannot run leaves the current configuration untouched.
+    The caller applies it. Returns the compiled launch plan.
+    """
+    plan = compile_profile(self, name)
+    profile = get_profile(self, name)
+    selected = profile.get("selected_wallpapers", {})
+    for screen in set(self.selected_wallpapers) | set(selected):
+        self.selected_wallpapers[screen] = selected.get(screen)
+    self.screen_configs.clear()
+    self.screen_configs.update(copy.deepcopy(profile.get("screen_configs", {})))
+    self.active_profile = name
+    save_current_config(self)
+    return plan
+
+
+def switch_profile(self, name):
+    """Activate a profile and apply it with a single engine restart. Returns (ok, message)"""
+    from Scripts.config_setter import apply_assigned_screens
+
+    try:
+        activate_profile(self, name)
+    except ValueError as e:
+        return False, str(e)
+    ok, message = apply_assigned_screens(self)
+    return ok, f"Profile {name}: {message}"
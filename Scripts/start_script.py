@@ -1,123 +1,31 @@
 import os
 
-from PySide6.QtGui import QFont
-from PySide6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QTextEdit, QHBoxLayout, QPushButton
-
-from Files.config_files import load_current_config
 from Scripts.destok_file import create_desktop_file
-from Steam.workshop_items import load_wallpapers
-from UI.user_interface import setup_ui
+from Scripts.launch_plan import build_launch_plan, write_launch_plan
+from Wallpaper_Engine.idle_monitor import IDLE_DEFAULTS
+from Wallpaper_Engine.power_profiles import POWER_DEFAULTS
+from Wallpaper_Engine.scheduling import SCHEDULING_DEFAULTS
+from Wallpaper_Engine.systemd_backend import LAUNCHER_DEFAULTS
 
 
 def create_wallpaper_script(self):
     """Create the wallpaper engine script dynamically for assigned screens"""
     # Only include screens with assigned wallpapers
-    assigned = [
-        (screen, self.selected_wallpapers.get(screen))
+    wallpaper_paths = {
+        screen: os.path.join(self.wallpaper_base_path, self.selected_wallpapers[screen])
         for screen in getattr(self, "detected_screens", [])
-    ]
-    assigned = [(screen, wid) for screen, wid in assigned if wid is not None]
+        if self.selected_wallpapers.get(screen) is not None
+    }
 
     # If no wallpapers assigned, fallback to all screens with default paths
-    if not assigned:
+    if not wallpaper_paths:
         screens = getattr(self, "detected_screens", ["HDMI-A-1", "DP-1"])
-        assigned = [(screen, None) for screen in screens]
-
-    script_content = "#!/bin/bash\n\n"
-    script_content += "# Automatically generated file by WallpaperEngineConfigurator.py\n"
-    script_content += "# Do not edit manually - changes will be overwritten\n\n"
-    script_content += "# Create log file if it doesn't exist\n"
-    script_content += 'LOG_FILE="/tmp/wallpaper-engine.log"\ntouch "$LOG_FILE"\n\n'
-    script_content += (
-        'echo "$(date): Starting Wallpaper Engine..." >> "$LOG_FILE"\n\n'
-    )
-    script_content += "# Wait for the system to be ready\nsleep 5\n\n"
-
-    # Dynamically define WALLPAPER# variables
-    for idx, (screen, wid) in enumerate(assigned, 1):
-        if wid is not None:
-            wallpaper_path = os.path.join(self.wallpaper_base_path, wid)
-        else:
-            wallpaper_path = f"/path/to/default/wallpaper{idx}"
-        script_content += f'WALLPAPER{idx}="{wallpaper_path}"\n'
-
-    script_content += "\n# Check that wallpapers exist\n"
-    for idx, (screen, wid) in enumerate(assigned, 1):
-        script_content += f'if [[ ! -d "$WALLPAPER{idx}" ]]; then\n'
-        script_content += f'    echo "$(date): Error: Wallpaper for Screen not configured yet. Use WallpaperEngineConfigurator.py to configure." >> "$LOG_FILE"\n'
-        script_content += f"    exit 1\nfi\n"
-
-    # Clean up previous processes
-    script_content += "# Clean up previous processes\npkill -f linux-wallpaperengine 2>/dev/null\n\n"
-    script_content += "# Environment variables for stability\n"
-    script_content += (
-        "export LD_LIBRARY_PATH=/opt/linux-wallpaperengine:$LD_LIBRARY_PATH\n"
-    )
-    script_content += "export __GL_THREADED_OPTIMIZATIONS=0\n"
-    script_content += 'export PULSE_RUNTIME_PATH="/run/user/$(id -u)/pulse"\n\n'
-    script_content += 'echo "$(date): Running with wallpapers:" >> "$LOG_FILE"\n'
-    for idx, (screen, _) in enumerate(assigned, 1):
-        script_content += f'echo "  {screen}: $WALLPAPER{idx}" >> "$LOG_FILE"\n'
-
-    # Build the linux-wallpaperengine command dynamically
-    script_content += "\n# Run wallpaper engine\nlinux-wallpaperengine\\\n"
-    for idx, (screen, _) in enumerate(assigned, 1):
-        cs = self.screen_configs.get(screen, {})
-        scaling = cs.get("scaling", "fill")
-        script_content += f" --scaling {scaling} \\\n --screen-root {screen} \\\n --bg \"$WALLPAPER{idx}\" \\\n"
-
-    # Use defaults for global options
-    base_defaults = {
-        "fps": 30,
-        "volume": 15,
-        "silent": True,
-        "noautomute": False,
-        "no_audio_proc": False,
-        "mouse": True,
-        "parallax": True,
-        "fs_pause": True,
-        "clamp": "border",
-    }
-
-    # Try to get config from the first assigned Screen if available
-    if assigned:
-        first_screen = assigned[0][0]
-        c = base_defaults.copy()
-        c.update(self.screen_configs.get(first_screen, {}))
-    else:
-        c = base_defaults
-
-    if c["silent"]:
-        script_content += " --silent \\\n"
-    else:
-        script_content += f" --volume {c['volume']} \\\n"
-
-    if c["noautomute"]:
-        script_content += " --noautomute \\\n"
-
-    if c["no_audio_proc"]:
-        script_content += " --no-audio-processing \\\n"
-
-    if not c["mouse"]:
-        script_content += " --disable-mouse \\\n"
-
-    if c.get("clamp"):
-        script_content += f" --clamp {c['clamp']} \\\n"
-
-    if not c["parallax"]:
-        script_content += " --disable-parallax \\\n"
-
-    if not c["fs_pause"]:
-        script_content += " --no-fullscreen-pause \\\n"
-
-    script_content += f" --fps {c['fps']} \\\n"
-
-    script_content += '2>&1 | tee -a "$LOG_FILE"\n'
+        wallpaper_paths = {
+            screen: f"/path/to/default/wallpaper{idx}" for idx, screen in enumerate(screens, 1)
+        }
 
     try:
-        with open(self.script_path, "w") as f:
-            f.write(script_content)
-        os.chmod(self.script_path, 0o755)
+        write_launch_plan(build_launch_plan(self, wallpaper_paths), self.script_path)
         print(f"Script created: {self.script_path}")
     except Exception as e:
         print(f"Error creating script: {e}")
@@ -129,8 +37,42 @@ def get_script_path(self):
     os.makedirs(bin_dir, exist_ok=True)
     return os.path.join(bin_dir, "start-wallpaperengine.sh")
 
+def load_assignments_from_script(self):
+    """
+    Read the {screen: wallpaper_id} assignments of the .sh file: the wallpapers of
+    the Steam workshop folder given to each --screen-root. Only used to migrate an
+    install from before the config store.
+    """
+    import re
+    import shlex
+
+    try:
+        with open(self.script_path, "r") as f:
+            content = f.read()
+    except OSError:
+        return {}
+    paths = {}
+    # Shell quoted: "..." in old scripts, shlex.quote() in new ones
+    for idx, value in re.findall(r"^WALLPAPER(\d+)=(.*)$", content, re.MULTILINE):
+        try:
+            paths[idx] = "".join(shlex.split(value))
+        except ValueError:
+            continue
+    base_path = os.path.normpath(getattr(self, "wallpaper_base_path", None) or "")
+    assignments = {}
+    for screen, idx in re.findall(r'--screen-root\s+([\w-]+)\s*\\?\s*--bg\s+"\$WALLPAPER(\d+)"', content):
+        path = os.path.normpath(paths.get(idx, ""))
+        # The placeholder script of a new install points nowhere
+        if os.path.dirname(path) == base_path:
+            assignments[screen] = os.path.basename(path)
+    return assignments
+
+
 def load_config_from_script(self):
-    """Read the .sh file to extract the actual config"""
+    """
+    Read the .sh file to extract the config. The script is output only now:
+    this is only used to migrate a version 1 config store, or an install without one
+    """
     if not os.path.exists(self.script_path):
         return {}
 
@@ -144,21 +86,75 @@ def load_config_from_script(self):
             return {}
 
         import re
+        import shlex
 
         # Extraer FPS (Global)
         fps_match = re.search(r"--fps (\d+)", content)
         fps = int(fps_match.group(1)) if fps_match else 30
+        # --fps holds the refresh-capped value, keep the value the user asked for
+        requested_match = re.search(r"# FPS: requested=(\d+)", content)
+        if requested_match:
+            fps = int(requested_match.group(1))
 
         # Extract Audio (Global)
         silent = "--silent" in content
         vol_match = re.search(r"--volume (\d+)", content)
         volume = int(vol_match.group(1)) if vol_match else 15
 
+        # Extract launcher settings (Global)
+        launcher = LAUNCHER_DEFAULTS.copy()
+        launcher_match = re.search(
+            r"# Launcher: (\w+) CPUQuota=(\d+) MemoryMax=(\d+) IOWeight=(\d+) Nice=(-?\d+)", content
+        )
+        if launcher_match:
+            launcher["launcher"] = launcher_match.group(1)
+            for key, value in zip(
+                    ["cpu_quota", "memory_max", "io_weight", "nice"], launcher_match.groups()[1:]
+            ):
+                launcher[key] = int(value)
+
+        # Extract idle suspension timeout (Global)
+        idle = IDLE_DEFAULTS.copy()
+        idle_match = re.search(r"# Idle: timeout=(\d+)", content)
+        if idle_match:
+            idle["idle_timeout"] = int(idle_match.group(1))
+
+        # Extract power profile settings (Global)
+        power = POWER_DEFAULTS.copy()
+        power_match = re.search(r"# Power: enabled=([01]) battery=(\w+) fps=(\d+) low=(\d+)", content)
+        if power_match:
+            power = {
+                "power_profiles": power_match.group(1) == "1",
+                "battery_profile": power_match.group(2),
+                "reduced_fps": int(power_match.group(3)),
+                "static_below": int(power_match.group(4)),
+            }
+
+        # Extract engine process mode (Global)
+        process_match = re.search(r"# Processes: (\w+)", content)
+        process_mode = process_match.group(1) if process_match else "single"
+
         # Extract config per Screen
         # Search every --screen-root and everything before the next key arg
         screens = re.findall(r"--screen-root\s+([\w-]+)", content)
 
         for screen in screens:
+            # Extract scheduling options for this Screen
+            scheduling = SCHEDULING_DEFAULTS.copy()
+            sched_match = re.search(
+                rf"# Scheduling {re.escape(screen)}: cpu_affinity=(\S+) process_nice=(-?\d+) "
+                r"sched_policy=([\w-]+) io_class=([\w-]+)",
+                content,
+            )
+            if sched_match:
+                affinity, nice, policy, io_class = sched_match.groups()
+                scheduling = {
+                    "cpu_affinity": "" if affinity == "all" else affinity,
+                    "process_nice": int(nice),
+                    "sched_policy": policy,
+                    "io_class": io_class,
+                }
+
             # Look for the next text fragment for this Screen
             # (From this Screen-root to the next or the final of the line)
             pattern = rf"--screen-root\s+{screen}.*?--bg\s+[\"']\$WALLPAPER\d+[\"'](.*?)(?=--screen-root|$)"
@@ -167,9 +163,12 @@ def load_config_from_script(self):
 
             # Parse properties
             props = {}
-            prop_matches = re.findall(r"--set-property\s+([\w.-]+)=([^\s\\]+|'[^']*'|\"[^\"]*\")", block_text)
+            # One shell word: quoted parts (they may contain spaces) and unquoted ones
+            prop_matches = re.findall(
+                r"--set-property\s+([\w.-]+)=((?:'[^']*'|\"[^\"]*\"|[^\s\\'\"]+)+)", block_text
+            )
             for p_key, p_val in prop_matches:
-                props[p_key] = p_val.strip("'\"")
+                props[p_key] = "".join(shlex.split(p_val))
 
             configs[screen] = {
                 "fps": fps,
@@ -190,140 +189,33 @@ def load_config_from_script(self):
                 "mouse": "--disable-mouse" not in content,
                 "parallax": "--disable-parallax" not in content,
                 "fs_pause": "--no-fullscreen-pause" not in content,
+                "process_mode": process_mode,
                 "properties": props,
+                **launcher,
+                **idle,
+                **power,
+                **scheduling,
             }
         return configs
     except Exception as e:
         print(f"Error al leer el script: {e}")
         return {}
 
-def update_script_with_assigned_screens(self, wallpaper_paths):
-    """Update the script with only the screens that have assigned wallpapers"""
+def update_script_with_assigned_screens(self, wallpaper_paths, script_path=None, max_fps=None):
+    """
+    Update the script with only the screens that have assigned wallpapers.
+    script_path and max_fps are used to precompute the reduced power profile script.
+    Returns True if the script changed (an identical script is not rewritten).
+    """
     try:
-        assigned_screens = list(wallpaper_paths.keys())
-
-        # Generate full script content
-        script_content = f"""#!/bin/bash
-
-        # Automatically generated file by WallpaperEngineConfigurator.py
-        # Do not edit manually - changes will be overwritten
-        # Last updated: $(date)
-
-        # Create log file if it doesn't exist
-        LOG_FILE="/tmp/wallpaper-engine.log"
-        touch "$LOG_FILE"
-
-        echo "$(date): Starting Wallpaper Engine..." >> "$LOG_FILE"
-
-        # Wait for the system to be ready
-        sleep 5
-
-        # Check that wallpapers exist
-        """
-
-        # Add WALLPAPER variables only for assigned screens
-        for i, screen in enumerate(assigned_screens, 1):
-            wallpaper_path = wallpaper_paths[screen]
-            script_content += f'WALLPAPER{i}="{wallpaper_path}"\n'
-
-        script_content += "\n# Check that wallpapers exist\n"
-        # Add checks only for assigned screens
-        for i, screen in enumerate(assigned_screens, 1):
-            script_content += f'if [[ ! -d "$WALLPAPER{i}" ]]; then\n'
-            script_content += f'    echo "$(date): Error: Wallpaper for {screen} not found at $WALLPAPER{i}" >> "$LOG_FILE"\n'
-            script_content += f"    exit 1\nfi\n"
-
-        # Clean up previous processes
-        script_content += "# Clean up previous processes\npkill -f linux-wallpaperengine 2>/dev/null\n\n"
-        script_content += "# Environment variables for stability\n"
-        script_content += (
-            "export LD_LIBRARY_PATH=/opt/linux-wallpaperengine:$LD_LIBRARY_PATH\n"
-        )
-        script_content += "export __GL_THREADED_OPTIMIZATIONS=0\n"
-        script_content += 'export PULSE_RUNTIME_PATH="/run/user/$(id -u)/pulse"\n\n'
-        script_content += (
-            'echo "$(date): Running with wallpapers:" >> "$LOG_FILE"\n'
-        )
-        for idx, screen in enumerate(assigned_screens, 1):
-            script_content += f'echo "  {screen}: $WALLPAPER{idx}" >> "$LOG_FILE"\n'
-
-        # Generate command using only assigned screens
-        script_content += "\n# Run wallpaper engine\nlinux-wallpaperengine"
-        for i, screen in enumerate(assigned_screens, 1):
-            cs = self.screen_configs.get(screen, {})
-            scaling = cs.get("scaling", "fill")
-            script_content += f" --scaling {scaling} \\\n --screen-root {screen} \\\n --bg \"$WALLPAPER{i}\" \\\n"
-            # If defined, set custom properties for the wallpaper engine
-            if "properties" in cs and isinstance(cs["properties"], dict):
-                for p_key, p_val in cs["properties"].items():
-                    # Los strings con espacios deben ir entre comillas
-                    if isinstance(p_val, str) and " " in p_val:
-                        script_content += f" --set-property {p_key}=\"{p_val}\" \\\n"
-                    else:
-                        script_content += f" --set-property {p_key}={p_val} \\\n"
-
-        # Add --silent only ONCE at the end
-        base_defaults = {
-            "fps": 30,
-            "volume": 15,
-            "silent": True,
-            "noautomute": False,
-            "no_audio_proc": False,
-            "mouse": True,
-            "parallax": True,
-            "fs_pause": True,
-            "clamp": "border",
-        }
-
-        # 2. Obtenemos la config de la primera pantalla y le inyectamos los defaults
-        # para que nunca falte ninguna llave (KeyError)
-        first_screen = assigned_screens[0]
-        c = base_defaults.copy()
-        c.update(self.screen_configs.get(first_screen, {}))
-
-        # 3. Ahora usamos 'c' con total seguridad
-        if c["silent"]:
-            script_content += " --silent \\\n"
-        else:
-            script_content += f" --volume {c['volume']} \\\n"
-
-        if c["noautomute"]:
-            script_content += " --noautomute \\\n"
-
-        if c["no_audio_proc"]:
-            script_content += " --no-audio-processing \\\n"
-
-        if not c["mouse"]:
-            script_content += " --disable-mouse \\\n"
-
-        # Aquí es donde fallaba antes si 'clamp' no estaba en el .get()
-        if c.get("clamp"):
-            script_content += f" --clamp {c['clamp']} \\\n"
-
-        if not c["parallax"]:
-            script_content += " --disable-parallax \\\n"
-
-        if not c["fs_pause"]:
-            script_content += " --no-fullscreen-pause \\\n"
-
-        script_content += f" --fps {c['fps']} \\\n"
-
-        script_content += '2>&1 | tee -a "$LOG_FILE"\n'
-
-        print(f"Final script content:\n{script_content}")
-
-        # Write the file
-        with open(self.script_path, "w") as f:
-
-            f.write(script_content)
-
-        # Ensure it's executable
-        os.chmod(self.script_path, 0o755)
-
+        plan = build_launch_plan(self, wallpaper_paths, max_fps)
+        return write_launch_plan(plan, script_path or self.script_path)
     except Exception as e:
         raise Exception(f"Error updating script: {e}")
 
 def view_script(self):
+    from PySide6.QtGui import QFont
+    from PySide6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QTextEdit, QHBoxLayout, QPushButton
     """Show the current content of the script"""
     try:
         with open(self.script_path, "r") as f:
@@ -360,10 +252,45 @@ def view_script(self):
             f"Error reading script: {e}",
         )
 
+def manage_unit_autostart(self):
+    from PySide6.QtWidgets import QMessageBox
+    from Wallpaper_Engine.systemd_backend import is_unit_enabled, set_unit_enabled, write_unit_file
+    """Enable or disable the systemd user unit at login (systemd launcher)"""
+    enabled = is_unit_enabled()
+    answer = QMessageBox.question(
+        self,
+        "Autostart Configuration",
+        f"Autostart (systemd user unit) is currently {'ENABLED' if enabled else 'DISABLED'}.\n\n"
+        f"Do you want to {'disable' if enabled else 'enable'} autostart for Wallpaper Engine?",
+        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+    )
+    if answer != QMessageBox.StandardButton.Yes:
+        return
+    try:
+        write_unit_file(self)
+        set_unit_enabled(not enabled)
+        # The .desktop entry would start a second engine outside the unit
+        if not enabled and os.path.exists(self.autostart_path):
+            os.remove(self.autostart_path)
+        QMessageBox.information(
+            self,
+            "Autostart Disabled" if enabled else "Autostart Enabled",
+            f"Autostart has been {'disabled' if enabled else 'enabled'}.",
+        )
+    except Exception as e:
+        QMessageBox.critical(self, "Error", f"Could not change autostart:\n{e}")
+
 def manage_autostart(self):
+    from PySide6.QtWidgets import QMessageBox
+    from Steam.workshop_items import load_wallpapers
+    from UI.user_interface import setup_ui
     """
     Show a dialog to enable or disable autostart for the wallpaper engine.
     """
+    from Wallpaper_Engine.systemd_backend import uses_systemd
+    if uses_systemd(self):
+        manage_unit_autostart(self)
+        return
     autostart_exists = os.path.exists(self.autostart_path)
     answer = QMessageBox.question(
         self,
@@ -401,7 +328,6 @@ def manage_autostart(self):
                     "Error",
                     f"Could not create autostart file:\n{e}",
                 )
-    # Refresh UI info and reload wallpapers/config
+    # Refresh UI info and reload wallpapers (and with them the config)
     setup_ui(self)
     load_wallpapers(self)
-    load_current_config(self)
@@ -1,85 +1,19 @@
 import os
-import subprocess
 
 from PySide6.QtCore import Qt, QRectF, QTimer
 from PySide6.QtGui import QLinearGradient
 from PySide6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QApplication, QLabel
 
-from UI.UI_Tools import is_wayland
+from Screen.topology import get_topology
+from UI.UI_Tools import get_overlays, is_wayland, show_overlays
 
 
 def get_monitor_geometries(self):
-    """Return a dict {screen_name: (x, y, w, h)} by probing available tools (xrandr/wlr-randr/swaymsg) or QGuiApplication as fallback."""
-    geometries = {}
-    # Try xrandr first
-    try:
-        r = subprocess.run(["xrandr", "--query"], capture_output=True, text=True)
-        for line in r.stdout.splitlines():
-            if " connected" in line:
-                parts = line.split()
-                name = parts[0]
-                import re
-
-                m = re.search(r"(\d+)x(\d+)\+(\d+)\+(\d+)", line)
-                if m:
-                    w, h, x, y = map(int, m.groups())
-                    geometries[name] = (x, y, w, h)
-        if geometries:
-            print(f"get_monitor_geometries: using xrandr -> {geometries}")
-            return geometries
-    except Exception:
-        pass
-
-    # Try wlr-randr
-    try:
-        r = subprocess.run(["wlr-randr"], capture_output=True, text=True)
-        for line in r.stdout.splitlines():
-            if " connected" in line or line.startswith("Output "):
-                parts = line.split()
-                # wlr-randr has different format; try to extract name and resolution if present
-                name = parts[1] if len(parts) > 1 else parts[0]
-                import re
-
-                m = re.search(r"(\d+)x(\d+).*(\+\d+\+\d+)", line)
-                if m:
-                    w = int(m.group(1))
-                    h = int(m.group(2))
-                    pos = re.search(r"(\+\d+\+\d+)", line)
-                    if pos:
-                        xy = pos.group(1).lstrip("+").split("+")
-                        x = int(xy[0])
-                        y = int(xy[1])
-                    else:
-                        x = 0
-                        y = 0
-                    geometries[name] = (x, y, w, h)
-        if geometries:
-            print(f"get_monitor_geometries: using wlr-randr -> {geometries}")
-            return geometries
-    except Exception:
-        pass
-
-    # Try swaymsg
-    try:
-        r = subprocess.run(
-            ["swaymsg", "-t", "get_outputs"], capture_output=True, text=True
-        )
-        import json
-
-        outputs = json.loads(r.stdout)
-        for out in outputs:
-            if out.get("active"):
-                name = out.get("name")
-                x = int(out.get("rect", {}).get("x", 0))
-                y = int(out.get("rect", {}).get("y", 0))
-                w = int(out.get("rect", {}).get("width", 0))
-                h = int(out.get("rect", {}).get("height", 0))
-                geometries[name] = (x, y, w, h)
-        if geometries:
-            print(f"get_monitor_geometries: using swaymsg -> {geometries}")
-            return geometries
-    except Exception:
-        pass
+    """Return a dict {screen_name: (x, y, w, h)} from the display topology, or QGuiApplication as fallback."""
+    geometries = get_topology(self).geometries()
+    if geometries:
+        print(f"get_monitor_geometries: using {get_topology(self).method} -> {geometries}")
+        return geometries
 
     # Fallback: use QGuiApplication.screens()
     try:
@@ -241,10 +175,12 @@ def show_monitor_map(self, duration_ms=3000):
 def identify_monitor(self, screen_name, duration_ms=2000):
     """Show overlay only for a single Screen and log diagnostics."""
     print(f"identify_monitor: requested for {screen_name}")
-    # If overlays exist, show only that one
+    # Show only the overlay of that Screen
     ov = None
-    if hasattr(self, "_screen_overlays"):
-        ov = self._screen_overlays.get(screen_name)
+    try:
+        ov = get_overlays(self).get(screen_name)
+    except Exception as e:
+        print(f"Error creating overlays on demand: {e}")
     if ov:
         try:
             # Try re-asserting assigned Screen
@@ -316,7 +252,7 @@ def identify_monitors(self):
         )
     print("Showing persistent overlays for identify_monitors")
     try:
-        self.show_overlays(2000)
+        show_overlays(self, 2000)
     except Exception as e:
         print(
             f"Fallback: overlays failed with {e}, falling back to transient popups"
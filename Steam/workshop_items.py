@@ -1,28 +1,25 @@
 import json
 import os
-from PySide6.QtWidgets import QListWidgetItem, QLabel
-from PySide6.QtCore import Qt
 import re
 
 from Files.config_files import load_current_config
 from UI.UI_Tools import normalize_text
 from Wallpaper_Engine.support_types import is_wallpaper_supported
 
+# Size of the preview shown next to the wallpaper list
+PREVIEW_SIZE = (300, 170)
+
 
 def load_wallpapers(self):
     """
     Scan the wallpaper directory and populate self.wallpapers with available wallpapers.
     """
+    from PySide6.QtWidgets import QListWidgetItem, QLabel
+    from PySide6.QtCore import Qt
     from UI.user_interface import update_screen_status
 
-    self.wallpapers.clear()
-    if not os.path.exists(self.wallpaper_base_path):
-        print(f"Wallpaper directory does not exist: {self.wallpaper_base_path}")
+    if not scan_wallpapers(self):
         return
-    for wid in os.listdir(self.wallpaper_base_path):
-        wpath = os.path.join(self.wallpaper_base_path, wid)
-        if os.path.isdir(wpath):
-            load_wallpaper_info(self, wid, wpath)
     # Optionally update the UI list if needed
     if hasattr(self, "wallpaper_list"):
         self.wallpaper_list.clear()
@@ -71,6 +68,76 @@ def load_wallpapers(self):
     load_current_config(self)
     update_screen_status(self)
 
+def scan_wallpapers(self):
+    """Scan the wallpaper directory into self.wallpapers without touching the UI. Returns False if it is missing"""
+    self.wallpapers.clear()
+    if not os.path.exists(self.wallpaper_base_path):
+        print(f"Wallpaper directory does not exist: {self.wallpaper_base_path}")
+        return False
+    for wid in os.listdir(self.wallpaper_base_path):
+        wpath = os.path.join(self.wallpaper_base_path, wid)
+        if os.path.isdir(wpath):
+            load_wallpaper_info(self, wid, wpath)
+    return True
+
+def get_catalog_cache_path():
+    """Get the path of the cached wallpaper catalog used by the headless tools"""
+    return os.path.expanduser("~/.cache/wallpaper-engine-configurator/catalog.json")
+
+def save_catalog_cache(self):
+    """Save the scanned wallpapers and detected screens so the CLI can skip rescanning"""
+    cache_path = get_catalog_cache_path()
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "base_path": self.wallpaper_base_path,
+                    "screens": self.detected_screens,
+                    "wallpapers": self.wallpapers,
+                },
+                f,
+            )
+    except Exception as e:
+        print(f"Error saving catalog cache: {e}")
+
+def load_catalog_cache(self):
+    """Load the cached catalog into self. Returns False if there is no usable cache"""
+    try:
+        with open(get_catalog_cache_path(), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if cache.get("base_path") != self.wallpaper_base_path:
+        return False
+    self.wallpapers.clear()
+    self.wallpapers.update(cache.get("wallpapers", {}))
+    self.detected_screens = cache.get("screens", [])
+    return True
+
+def get_preview_thumbnail(self, wallpaper_id, size=PREVIEW_SIZE):
+    """
+    The wallpaper preview scaled down to size as an RGBA Pillow image, cached per wallpaper.
+    Returns None if the wallpaper has no readable local preview.
+    """
+    from PIL import Image
+
+    cache = getattr(self, "thumbnail_cache", None)
+    if cache is None:
+        cache = self.thumbnail_cache = {}
+    key = (wallpaper_id, size)
+    if key not in cache:
+        info = self.wallpapers.get(wallpaper_id)
+        if not info or not info.get("preview"):
+            return None
+        with Image.open(info["preview"]) as image:
+            # If GIF, show first frame (Pillow handles animated GIFs)
+            if getattr(image, "is_animated", False):
+                image.seek(0)
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            cache[key] = image.convert("RGBA")
+    return cache[key]
+
 def load_wallpaper_info(self, wallpaper_id, wallpaper_path):
     """Load info of a specific wallpaper with better encoding handling"""
     project_json = os.path.join(wallpaper_path, "project.json")
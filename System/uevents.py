@@ -0,0 +1,58 @@
+import socket
+import threading
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast group of the raw kernel events (udev re-broadcasts on group 2)
+KERNEL_EVENTS_GROUP = 1
+
+
+def parse_uevent(data):
+    """Parse a kernel uevent datagram ("action@devpath\\0KEY=VALUE\\0...") into a dict"""
+    parts = data.split(b"\0")
+    event = {}
+    header = parts[0].decode("utf-8", errors="replace")
+    if "@" in header:
+        event["ACTION"], event["DEVPATH"] = header.split("@", 1)
+    for part in parts[1:]:
+        if b"=" in part:
+            key, value = part.decode("utf-8", errors="replace").split("=", 1)
+            event[key] = value
+    return event
+
+
+class UeventListener(threading.Thread):
+    """
+    Listens to kernel uevents on a netlink socket (no udev or root needed) and
+    calls callback(event) for the events of the given subsystems.
+    """
+
+    def __init__(self, subsystems, callback):
+        super().__init__(name=f"uevents-{'-'.join(subsystems)}", daemon=True)
+        self.subsystems = set(subsystems)
+        self.callback = callback
+        self._stop_event = threading.Event()
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self._sock.bind((0, KERNEL_EVENTS_GROUP))
+        self._sock.settimeout(1.0)
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = self._sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError as e:
+                    print(f"Uevent listener error: {e}")
+                    break
+                event = parse_uevent(data)
+                if event.get("SUBSYSTEM") in self.subsystems:
+                    try:
+                        self.callback(event)
+                    except Exception as e:
+                        print(f"Uevent callback error: {e}")
+        finally:
+            self._sock.close()
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,8 +1,4 @@
 import os
-import subprocess
-
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtWidgets import QDialog, QLabel, QVBoxLayout, QApplication
 
 
 def is_wayland(self):
@@ -48,36 +44,24 @@ def create_overlays(self):
     """Create persistent per-Screen overlay widgets and keep them hidden.
     These persistent windows are more likely to be accepted by Wayland compositors
     than ephemeral transient popups created on demand.
+    Called through get_overlays(), the first time the monitors are identified.
     """
+    from PySide6.QtCore import Qt
     from PySide6.QtGui import QGuiApplication
+    from PySide6.QtWidgets import QDialog, QLabel, QVBoxLayout
+    from Screen.topology import get_topology
 
     self._screen_overlays = {}
     popup_w, popup_h = 300, 150
 
-    # Gather xrandr geometries as a primary source
-    geometries = {}
-    try:
-        result = subprocess.run(
-            ["xrandr", "--query"], capture_output=True, text=True
-        )
-        for line in result.stdout.splitlines():
-            if " connected" in line:
-                parts = line.split()
-                screen_name = parts[0]
-                import re
-
-                m = re.search(r"(\d+)x(\d+)\+(\d+)\+(\d+)", line)
-                if m:
-                    w, h, x, y = map(int, m.groups())
-                    geometries[screen_name] = (x, y, w, h)
-    except Exception:
-        pass
+    # Geometries of the display topology as a primary source
+    geometries = get_topology(self).geometries()
 
     screens = QGuiApplication.screens()
     assigned_qscreen = None
 
     for idx, screen in enumerate(self.detected_screens):
-        # Prefer xrandr geometry, fallback to QScreen lookup
+        # Prefer the topology geometry, fallback to QScreen lookup
         geom = geometries.get(screen)
         if geom is None:
             found_qs = None
@@ -149,10 +133,9 @@ def create_overlays(self):
                 pass
 
             assigned_qscreen = None
-            # Ensure a windowHandle exists by briefly showing the window
+            # Creates the native window (and its windowHandle) without mapping it
             try:
-                overlay.show()
-                QApplication.processEvents()
+                overlay.winId()
             except Exception:
                 pass
 
@@ -176,31 +159,42 @@ def create_overlays(self):
                         except Exception as e:
                             print(f"Overlay setScreen error for {screen}: {e}")
                         break
-
-            # Hide after assignment; will show later via show_overlays
-            try:
-                overlay.hide()
-                QApplication.processEvents()
-            except Exception:
-                pass
         except Exception as e:
             print(f"Overlay windowHandle/setup error for {screen}: {e}")
 
         # Remember the assigned qscreen for later reuse when showing
-        overlay.setProperty("_assigned_qscreen", assigned_qscreen)
-        self._screen_overlays[screen] = overlay.property("_assigned_qscreen")
+        overlay._assigned_qscreen = assigned_qscreen
+        self._screen_overlays[screen] = overlay
+
+
+def get_overlays(self):
+    """The per-Screen overlays, created on first use and reused afterwards"""
+    if getattr(self, "_screen_overlays", None) is None:
+        create_overlays(self)
+    return self._screen_overlays
+
+
+def discard_overlays(self):
+    """Drop the overlays (the screens changed), they are created again on the next use"""
+    for overlay in (getattr(self, "_screen_overlays", None) or {}).values():
+        try:
+            overlay.hide()
+            overlay.deleteLater()
+        except Exception:
+            pass
+    self._screen_overlays = None
 
 def show_overlays(self, duration_ms=2000):
     """Show the persistent overlays for duration_ms milliseconds and hide them."""
-    if not hasattr(self, "_screen_overlays") or not self._screen_overlays:
-        # Lazy-create if needed
-        try:
-            self.create_overlays()
-        except Exception as e:
-            print(f"Error creating overlays on demand: {e}")
-            return
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    try:
+        overlays = get_overlays(self)
+    except Exception as e:
+        print(f"Error creating overlays on demand: {e}")
+        return
 
-    for screen, overlay in list(self._screen_overlays.items()):
+    for screen, overlay in list(overlays.items()):
         try:
             # Re-assert assigned Screen (some compositors only honor setScreen when mapping)
             try:
@@ -1,15 +1,20 @@
+import os
+
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QGroupBox, QSpinBox, QCheckBox, QComboBox, \
-    QDialogButtonBox
+    QDialogButtonBox, QLabel, QLineEdit, QMessageBox, QPushButton
 
+from Screen.screen_detection import get_effective_fps, get_refresh_rates
+from Files.config_files import save_current_config
 from Scripts.config_setter import apply_changes_automatically
+from Scripts.launch_plan import CLAMP_MODES, PROCESS_MODES, SCALING_MODES
+from Wallpaper_Engine.idle_monitor import IDLE_DEFAULTS
+from Wallpaper_Engine.playlists import PLAYLIST_DEFAULTS, PLAYLIST_MODES, parse_times
+from Wallpaper_Engine.power_profiles import POWER_DEFAULTS
+from Wallpaper_Engine.scheduling import SCHEDULING_DEFAULTS, SCHED_POLICIES, IO_CLASSES, parse_cpu_list
+from Wallpaper_Engine.systemd_backend import LAUNCHER_DEFAULTS, is_systemd_available
 
 
 def config_wallpaper(self, screen_name):
-    from Scripts.start_script import load_config_from_script
-    if screen_name not in self.screen_configs:
-        file_configs = load_config_from_script(self)
-        if screen_name in file_configs:
-            self.screen_configs[screen_name] = file_configs[screen_name]
     defaults = {
         "fps": 30,
         "volume": 15,
@@ -21,8 +26,14 @@ def config_wallpaper(self, screen_name):
         "mouse": True,
         "parallax": True,
         "fs_pause": True,
+        "process_mode": "single",
+        **LAUNCHER_DEFAULTS,
+        **SCHEDULING_DEFAULTS,
+        **IDLE_DEFAULTS,
+        **POWER_DEFAULTS,
+        **PLAYLIST_DEFAULTS,
     }
-    cfg = self.screen_configs.get(screen_name, defaults)
+    cfg = {**defaults, **self.screen_configs.get(screen_name, {})}
 
     dialog = QDialog(self)
     dialog.setWindowTitle(f"Configuración Avanzada: {screen_name}")
@@ -59,25 +70,178 @@ def config_wallpaper(self, screen_name):
     fs_pause_cb = QCheckBox("Pause on Fullscreen")
     fs_pause_cb.setChecked(cfg["fs_pause"])
     perf_form.addRow("Max FPS:", fps_spin)
+    refresh = get_refresh_rates(self).get(screen_name)
+    effective_label = QLabel()
+
+    def update_effective_fps(value):
+        # The engine never renders faster than the output refreshes
+        if refresh:
+            effective_label.setText(
+                f"{get_effective_fps(self, screen_name, value)} FPS (monitor at {refresh:.2f} Hz)"
+            )
+        else:
+            effective_label.setText(f"{value} FPS (refresh rate unknown)")
+
+    fps_spin.valueChanged.connect(update_effective_fps)
+    update_effective_fps(fps_spin.value())
+    perf_form.addRow("Effective FPS:", effective_label)
     perf_form.addRow(mouse_cb)
     perf_form.addRow(parallax_cb)
     perf_form.addRow(fs_pause_cb)
+    idle_spin = QSpinBox()
+    idle_spin.setRange(0, 24 * 3600)
+    idle_spin.setSingleStep(30)
+    idle_spin.setSuffix(" s")
+    idle_spin.setSpecialValueText("Never")
+    idle_spin.setValue(cfg["idle_timeout"])
+    idle_spin.setToolTip("Suspend the engine after this much inactivity or when the screen is locked")
+    perf_form.addRow("Suspend when idle:", idle_spin)
 
     # --- Visual Section ---
     visual_group = QGroupBox("Visual")
     visual_form = QFormLayout(visual_group)
     scaling_combo = QComboBox()
-    scaling_combo.addItems(["fill", "fit", "stretch", "default"])
+    scaling_combo.addItems(list(SCALING_MODES))
     scaling_combo.setCurrentText(cfg["scaling"])
     clamp_combo = QComboBox()
-    clamp_combo.addItems(["border", "clamp", "repeat"])
+    clamp_combo.addItems(list(CLAMP_MODES))
     clamp_combo.setCurrentText(cfg["clamp"])
     visual_form.addRow("Scaling:", scaling_combo)
     visual_form.addRow("Clamping:", clamp_combo)
 
+    # --- Launcher & Resource Limits Section ---
+    launcher_group = QGroupBox("Launcher (resource limits need systemd)")
+    launcher_form = QFormLayout(launcher_group)
+    launcher_combo = QComboBox()
+    launcher_combo.addItems(["script", "systemd"])
+    if not is_systemd_available():
+        # Only the bash script launcher is usable without a systemd user manager
+        launcher_combo.model().item(1).setEnabled(False)
+    launcher_combo.setCurrentText(cfg["launcher"])
+    cpu_spin = QSpinBox()
+    cpu_spin.setRange(0, 100 * (os.cpu_count() or 1))
+    cpu_spin.setSuffix(" %")
+    cpu_spin.setSpecialValueText("No limit")
+    cpu_spin.setValue(cfg["cpu_quota"])
+    mem_spin = QSpinBox()
+    mem_spin.setRange(0, 1024 * 1024)
+    mem_spin.setSingleStep(128)
+    mem_spin.setSuffix(" MB")
+    mem_spin.setSpecialValueText("No limit")
+    mem_spin.setValue(cfg["memory_max"])
+    io_spin = QSpinBox()
+    io_spin.setRange(1, 10000)
+    io_spin.setValue(cfg["io_weight"])
+    nice_spin = QSpinBox()
+    nice_spin.setRange(0, 19)
+    nice_spin.setValue(cfg["nice"])
+    process_combo = QComboBox()
+    process_combo.addItems(list(PROCESS_MODES))
+    process_combo.setCurrentText(cfg["process_mode"])
+    process_combo.setToolTip("per_screen: one engine per screen, a change restarts only that screen")
+    launcher_form.addRow("Launcher:", launcher_combo)
+    launcher_form.addRow("Engine processes:", process_combo)
+    launcher_form.addRow("CPUQuota:", cpu_spin)
+    launcher_form.addRow("MemoryMax:", mem_spin)
+    launcher_form.addRow("IOWeight:", io_spin)
+    launcher_form.addRow("Nice:", nice_spin)
+
+    def update_limits_enabled(text):
+        for widget in (cpu_spin, mem_spin, io_spin, nice_spin):
+            widget.setEnabled(text == "systemd")
+
+    launcher_combo.currentTextChanged.connect(update_limits_enabled)
+    update_limits_enabled(launcher_combo.currentText())
+
+    # --- Power Profiles Section ---
+    power_group = QGroupBox("Power profiles (battery)")
+    power_form = QFormLayout(power_group)
+    power_cb = QCheckBox("Back off on battery")
+    power_cb.setChecked(cfg["power_profiles"])
+    battery_combo = QComboBox()
+    battery_combo.addItems(["reduced", "static"])
+    battery_combo.setCurrentText(cfg["battery_profile"])
+    battery_combo.setToolTip("reduced: lower FPS, static: show the preview image without the engine")
+    reduced_fps_spin = QSpinBox()
+    reduced_fps_spin.setRange(1, 144)
+    reduced_fps_spin.setValue(cfg["reduced_fps"])
+    static_below_spin = QSpinBox()
+    static_below_spin.setRange(0, 100)
+    static_below_spin.setSuffix(" %")
+    static_below_spin.setSpecialValueText("Never")
+    static_below_spin.setValue(cfg["static_below"])
+    power_form.addRow(power_cb)
+    power_form.addRow("On battery:", battery_combo)
+    power_form.addRow("Reduced FPS:", reduced_fps_spin)
+    power_form.addRow("Static below:", static_below_spin)
+
+    def update_power_enabled(checked):
+        for widget in (battery_combo, reduced_fps_spin, static_below_spin):
+            widget.setEnabled(checked)
+
+    power_cb.toggled.connect(update_power_enabled)
+    update_power_enabled(power_cb.isChecked())
+
+    # --- Scheduling Section (this Screen only) ---
+    sched_group = QGroupBox("Scheduling (this screen)")
+    sched_form = QFormLayout(sched_group)
+    affinity_edit = QLineEdit(cfg["cpu_affinity"])
+    affinity_edit.setPlaceholderText(f"All CPUs (e.g. 0-{(os.cpu_count() or 1) - 1})")
+    proc_nice_spin = QSpinBox()
+    proc_nice_spin.setRange(0, 19)
+    proc_nice_spin.setValue(cfg["process_nice"])
+    policy_combo = QComboBox()
+    policy_combo.addItems(list(SCHED_POLICIES))
+    policy_combo.setCurrentText(cfg["sched_policy"])
+    io_combo = QComboBox()
+    io_combo.addItems(list(IO_CLASSES))
+    io_combo.setCurrentText(cfg["io_class"])
+    sched_form.addRow("CPU affinity:", affinity_edit)
+    sched_form.addRow("Nice level:", proc_nice_spin)
+    sched_form.addRow("Scheduling policy:", policy_combo)
+    sched_form.addRow("I/O class:", io_combo)
+
+    # --- Playlist Section (this Screen only) ---
+    playlist_group = QGroupBox("Playlist (this screen)")
+    playlist_form = QFormLayout(playlist_group)
+    playlist_mode_combo = QComboBox()
+    playlist_mode_combo.addItems(list(PLAYLIST_MODES))
+    playlist_mode_combo.setCurrentText(cfg["playlist_mode"])
+    playlist_edit = QLineEdit(", ".join(cfg["playlist"]))
+    playlist_edit.setPlaceholderText("Wallpaper IDs, comma separated")
+    btn_add_selected = QPushButton("Add selected wallpaper")
+    btn_add_selected.clicked.connect(
+        lambda: playlist_edit.setText(", ".join(filter(None, [playlist_edit.text().strip(", "), self.current_selection])))
+    )
+    btn_add_selected.setToolTip("Append the wallpaper selected in the list")
+    playlist_interval_spin = QSpinBox()
+    playlist_interval_spin.setRange(1, 24 * 60)
+    playlist_interval_spin.setSuffix(" min")
+    playlist_interval_spin.setValue(cfg["playlist_interval"])
+    playlist_times_edit = QLineEdit(", ".join(cfg["playlist_times"]))
+    playlist_times_edit.setPlaceholderText("Start time of each item, e.g. 08:00, 18:30")
+    playlist_form.addRow("Rotation:", playlist_mode_combo)
+    playlist_form.addRow("Wallpapers:", playlist_edit)
+    playlist_form.addRow(btn_add_selected)
+    playlist_form.addRow("Every:", playlist_interval_spin)
+    playlist_form.addRow("At:", playlist_times_edit)
+
+    def update_playlist_enabled(mode):
+        playlist_edit.setEnabled(mode != "off")
+        btn_add_selected.setEnabled(mode != "off" and self.current_selection is not None)
+        playlist_interval_spin.setEnabled(mode == "interval")
+        playlist_times_edit.setEnabled(mode == "time_of_day")
+
+    playlist_mode_combo.currentTextChanged.connect(update_playlist_enabled)
+    update_playlist_enabled(playlist_mode_combo.currentText())
+
     main_layout.addWidget(audio_group)
     main_layout.addWidget(perf_group)
     main_layout.addWidget(visual_group)
+    main_layout.addWidget(launcher_group)
+    main_layout.addWidget(power_group)
+    main_layout.addWidget(sched_group)
+    main_layout.addWidget(playlist_group)
 
     buttons = QDialogButtonBox(
         QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
@@ -98,8 +262,31 @@ def config_wallpaper(self, screen_name):
             "clamp",
             "mouse",
             "parallax",
+            "process_mode",
+            *LAUNCHER_DEFAULTS.keys(),
+            *IDLE_DEFAULTS.keys(),
+            *POWER_DEFAULTS.keys(),
         ]
-        local_keys = ["scaling"]
+        local_keys = ["scaling", *SCHEDULING_DEFAULTS.keys(), *PLAYLIST_DEFAULTS.keys()]
+
+        try:
+            parse_cpu_list(affinity_edit.text())
+            cpu_affinity = affinity_edit.text().strip()
+        except ValueError as e:
+            QMessageBox.warning(dialog, "Invalid CPU affinity", f"{e}\nUsing all CPUs instead.")
+            cpu_affinity = ""
+
+        playlist = [item.strip() for item in playlist_edit.text().split(",") if item.strip()]
+        unknown = [item for item in playlist if item not in self.wallpapers]
+        if unknown:
+            QMessageBox.warning(dialog, "Unknown wallpapers", f"Removed from the playlist: {', '.join(unknown)}")
+            playlist = [item for item in playlist if item in self.wallpapers]
+        playlist_times = [t.strip() for t in playlist_times_edit.text().split(",") if t.strip()]
+        try:
+            parse_times(playlist_times)
+        except ValueError as e:
+            QMessageBox.warning(dialog, "Invalid playlist times", f"{e}\nThe playlist times were cleared.")
+            playlist_times = []
 
         # 2. Recopilamos los nuevos valores del diálogo
         new_config = {
@@ -113,6 +300,25 @@ def config_wallpaper(self, screen_name):
             "mouse": mouse_cb.isChecked(),
             "parallax": parallax_cb.isChecked(),
             "fs_pause": fs_pause_cb.isChecked(),
+            "process_mode": process_combo.currentText(),
+            "launcher": launcher_combo.currentText(),
+            "cpu_quota": cpu_spin.value(),
+            "memory_max": mem_spin.value(),
+            "io_weight": io_spin.value(),
+            "nice": nice_spin.value(),
+            "idle_timeout": idle_spin.value(),
+            "power_profiles": power_cb.isChecked(),
+            "battery_profile": battery_combo.currentText(),
+            "reduced_fps": reduced_fps_spin.value(),
+            "static_below": static_below_spin.value(),
+            "cpu_affinity": cpu_affinity,
+            "process_nice": proc_nice_spin.value(),
+            "sched_policy": policy_combo.currentText(),
+            "io_class": io_combo.currentText(),
+            "playlist": playlist,
+            "playlist_mode": playlist_mode_combo.currentText(),
+            "playlist_interval": playlist_interval_spin.value(),
+            "playlist_times": playlist_times,
         }
         # 3. Sync: Apply global keys to all the screens
         for s_name in getattr(self, "detected_screens", []):
@@ -128,5 +334,6 @@ def config_wallpaper(self, screen_name):
         for key in local_keys:
             self.screen_configs[screen_name][key] = new_config[key]
 
-        # 5. Regen script and apply changes
+        # 5. Save, regen script and apply changes
+        save_current_config(self)
         apply_changes_automatically(self)
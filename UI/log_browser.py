@@ -0,0 +1,190 @@
+import threading
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QComboBox, QListView, \
+    QLabel, QPushButton
+
+from Files.log_index import LogIndex, LogSearch, filter_lines
+from Files.log_manager import LOG_FILE, watch_log_file
+
+SEVERITY_COLORS = {"error": "#ff6b6b", "warning": "#f0c674"}
+SEVERITY_FILTERS = {"All lines": None, "Warnings and errors": "warning", "Errors only": "error"}
+
+
+class LogLinesModel(QAbstractListModel):
+    """The log lines selected by the filters. Qt only asks for the visible rows, decoded on request"""
+
+    def __init__(self, log, parent=None):
+        super().__init__(parent)
+        self.log = log
+        self.rows = range(0)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        try:
+            number = self.rows[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return f"{number + 1:>8}  {self.log.line(number)}"
+            if role == Qt.ItemDataRole.ForegroundRole:
+                color = SEVERITY_COLORS.get(self.log.severity(number))
+                return QColor(color) if color else None
+        except (IndexError, TypeError, ValueError):
+            # The log was truncated and is being indexed again, the rows are replaced shortly
+            return None
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not len(rows):
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        if isinstance(self.rows, range):
+            self.rows = range(self.rows.start, rows.stop)
+        else:
+            self.rows.extend(rows)
+        self.endInsertRows()
+
+
+def show_log_browser(self, log_file=LOG_FILE):
+    """
+    Browse the whole log: memory-mapped and indexed in the background, with substring or
+    regex search and a severity filter. Only the visible lines are decoded and drawn.
+    """
+    dialog = QDialog(self)
+    dialog.setWindowTitle("Search Wallpaper Engine Logs")
+    dialog.resize(1000, 700)
+    layout = QVBoxLayout(dialog)
+
+    filter_layout = QHBoxLayout()
+    search_edit = QLineEdit()
+    search_edit.setPlaceholderText("Search...")
+    search_edit.setClearButtonEnabled(True)
+    filter_layout.addWidget(search_edit)
+    regex_check = QCheckBox("Regex")
+    filter_layout.addWidget(regex_check)
+    case_check = QCheckBox("Match case")
+    filter_layout.addWidget(case_check)
+    severity_combo = QComboBox()
+    severity_combo.addItems(list(SEVERITY_FILTERS))
+    filter_layout.addWidget(severity_combo)
+    follow_check = QCheckBox("Auto-follow")
+    follow_check.setChecked(True)
+    filter_layout.addWidget(follow_check)
+    layout.addLayout(filter_layout)
+
+    log = LogIndex(log_file)
+    model = LogLinesModel(log, dialog)
+    view = QListView()
+    # Every row has the same height, so scrolling never measures the lines
+    view.setUniformItemSizes(True)
+    view.setFont(QFont("Monaco", 10))
+    view.setModel(model)
+    layout.addWidget(view)
+
+    bottom_layout = QHBoxLayout()
+    status_label = QLabel("Indexing...")
+    bottom_layout.addWidget(status_label)
+    bottom_layout.addStretch()
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    bottom_layout.addWidget(close_btn)
+    layout.addLayout(bottom_layout)
+
+    # Index and search in the background, one at a time; a newer filter cancels an older search
+    index_lock = threading.Lock()
+    state = {"generation": 0, "search": None, "severity": None, "shown": None}
+
+    def show_status(message=None):
+        if message is None:
+            message = f"{len(model.rows):,} of {len(log):,} lines ({log.size / (1024 * 1024):.1f} MB)"
+        status_label.setText(message)
+
+    def apply_rows(generation, rows, full):
+        if generation != state["generation"] or rows is None:
+            return
+        if not full and state["shown"] != generation:
+            # The complete result of this filter is still coming, and it includes these lines
+            return
+        state["shown"] = generation
+        scroll_bar = view.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        if full:
+            model.set_rows(rows)
+        else:
+            model.append_rows(rows)
+        if follow_check.isChecked() and (full or at_bottom):
+            view.scrollToBottom()
+        show_status()
+
+    def run(generation, search, severity, full):
+        def cancelled():
+            return generation != state["generation"]
+
+        with index_lock:
+            if cancelled():
+                return
+            try:
+                first, reset = log.update()
+                full = full or reset
+                rows = filter_lines(log, search, severity, 0 if full else first, cancelled)
+            except Exception as e:
+                print(f"Log browser error: {e}")
+                return
+        QTimer.singleShot(0, dialog, lambda: apply_rows(generation, rows, full))
+
+    def start(full):
+        threading.Thread(
+            target=run, args=(state["generation"], state["search"], state["severity"], full),
+            name="log-browser", daemon=True,
+        ).start()
+
+    def apply_filters():
+        text = search_edit.text()
+        try:
+            search = LogSearch(text, regex_check.isChecked(), not case_check.isChecked()) if text else None
+        except ValueError as e:
+            show_status(str(e))
+            return
+        state["generation"] += 1
+        state["search"] = search
+        state["severity"] = SEVERITY_FILTERS[severity_combo.currentText()]
+        show_status("Searching...")
+        start(full=True)
+
+    # Searches while typing, once the typing pauses
+    filter_timer = QTimer(dialog)
+    filter_timer.setSingleShot(True)
+    filter_timer.setInterval(250)
+    filter_timer.timeout.connect(apply_filters)
+    search_edit.textChanged.connect(lambda text: filter_timer.start())
+    regex_check.toggled.connect(lambda checked: apply_filters())
+    case_check.toggled.connect(lambda checked: apply_filters())
+    severity_combo.currentIndexChanged.connect(lambda index: apply_filters())
+
+    # New lines are indexed and filtered as the engine writes them
+    append_timer = QTimer(dialog)
+    append_timer.setSingleShot(True)
+    append_timer.setInterval(200)
+    append_timer.timeout.connect(lambda: start(full=False))
+
+    def request_append():
+        if not append_timer.isActive():
+            append_timer.start()
+
+    watch_log_file(dialog, log_file, request_append)
+
+    # Cancels a running search
+    dialog.finished.connect(lambda result: state.update(generation=state["generation"] + 1))
+
+    start(full=True)
+    dialog.exec()
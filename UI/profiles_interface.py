@@ -0,0 +1,79 @@
+from PySide6.QtWidgets import QComboBox, QPushButton, QInputDialog, QMessageBox, QLabel
+
+from Scripts.config_setter import request_apply
+from Scripts.profiles import get_profiles, save_profile, delete_profile, activate_profile
+
+NO_PROFILE = "(no profile)"
+
+
+def add_profile_controls(self, layout):
+    """Add the profile selector and its Save/Delete buttons to a layout"""
+    layout.addWidget(QLabel("Profile:"))
+    self.profile_combo = QComboBox()
+    self.profile_combo.setMinimumWidth(160)
+    # activated is only emitted by the user, not by refresh_profile_combo
+    self.profile_combo.activated.connect(lambda index: on_profile_selected(self))
+    layout.addWidget(self.profile_combo)
+    btn_save = QPushButton("Save Profile")
+    btn_save.clicked.connect(lambda: on_save_profile(self))
+    layout.addWidget(btn_save)
+    btn_delete = QPushButton("Delete Profile")
+    btn_delete.clicked.connect(lambda: on_delete_profile(self))
+    layout.addWidget(btn_delete)
+    refresh_profile_combo(self)
+
+
+def refresh_profile_combo(self):
+    combo = getattr(self, "profile_combo", None)
+    if combo is None:
+        return
+    combo.clear()
+    combo.addItem(NO_PROFILE)
+    combo.addItems(sorted(get_profiles(self)))
+    combo.setCurrentText(getattr(self, "active_profile", None) or NO_PROFILE)
+
+
+def on_profile_selected(self):
+    from UI.user_interface import update_screen_status
+    """Switch to the selected profile: one config change and a single background apply"""
+    name = self.profile_combo.currentText()
+    if name == NO_PROFILE or name == getattr(self, "active_profile", None):
+        return
+    try:
+        activate_profile(self, name)
+    except ValueError as e:
+        QMessageBox.critical(self, "Profile Error", str(e))
+        refresh_profile_combo(self)
+        return
+    update_screen_status(self)
+    request_apply(self)
+
+
+def on_save_profile(self):
+    current = getattr(self, "active_profile", None) or ""
+    name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:", text=current)
+    if not ok or not name.strip():
+        return
+    name = name.strip()
+    if name in get_profiles(self) and name != current:
+        answer = QMessageBox.question(self, "Save Profile", f"Overwrite the profile '{name}'?")
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+    try:
+        save_profile(self, name)
+    except ValueError as e:
+        QMessageBox.critical(self, "Profile Error", str(e))
+        return
+    refresh_profile_combo(self)
+    self.statusBar().showMessage(f"Profile '{name}' saved", 5000)
+
+
+def on_delete_profile(self):
+    name = self.profile_combo.currentText()
+    if name == NO_PROFILE:
+        return
+    answer = QMessageBox.question(self, "Delete Profile", f"Delete the profile '{name}'?")
+    if answer != QMessageBox.StandardButton.Yes:
+        return
+    delete_profile(self, name)
+    refresh_profile_combo(self)
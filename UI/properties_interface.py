@@ -1,13 +1,13 @@
 from PySide6.QtWidgets import QMessageBox, QScrollArea, QWidget, QFormLayout, QVBoxLayout, QDialog, QCheckBox, QSpinBox, \
     QDoubleSpinBox, QLineEdit, QDialogButtonBox, QPushButton, QColorDialog
 
-from Files.wallpaper_properties import load_wallpaper_properties
+from Files.config_files import save_current_config
+from Files.wallpaper_properties import get_wallpaper_properties
 from Scripts.config_setter import apply_changes_automatically
 from UI.UI_Tools import we_to_qt_color, qt_to_we_color
 
 
 def wallpaper_property_setup(self, screen):
-    from Scripts.start_script import load_config_from_script
     """Open a dialog to configure properties of the assigned wallpaper for a specific Screen"""
     wallpaper_id = self.selected_wallpapers.get(screen)
     if not wallpaper_id:
@@ -22,24 +22,20 @@ def wallpaper_property_setup(self, screen):
 
     # Ensure screen_configs entry exists with defaults
     if screen not in self.screen_configs:
-        file_configs = load_config_from_script(self)
-        if screen in file_configs:
-            self.screen_configs[screen] = file_configs[screen]
-        else:
-            self.screen_configs[screen] = {
-                "fps": 30,
-                "volume": 15,
-                "silent": True,
-                "scaling": "fill",
-                "noautomute": False,
-                "no_audio_proc": False,
-                "clamp": "border",
-                "mouse": True,
-                "parallax": True,
-                "fs_pause": True,
-            }
-
-    base_properties = load_wallpaper_properties(self, wallpaper_id)
+        self.screen_configs[screen] = {
+            "fps": 30,
+            "volume": 15,
+            "silent": True,
+            "scaling": "fill",
+            "noautomute": False,
+            "no_audio_proc": False,
+            "clamp": "border",
+            "mouse": True,
+            "parallax": True,
+            "fs_pause": True,
+        }
+
+    base_properties = get_wallpaper_properties(self, wallpaper_id)
 
     saved_props = self.screen_configs.get(screen, {}).get("properties", {})
     if not isinstance(saved_props, dict):
@@ -182,5 +178,6 @@ def wallpaper_property_setup(self, screen):
 
         self.screen_configs[screen]["properties"] = new_props
 
-        # Aplicar cambios al script .sh y reiniciar
+        # Guardar y aplicar cambios al script .sh y reiniciar
+        save_current_config(self)
         apply_changes_automatically(self)
@@ -10,6 +10,7 @@ from Files.log_manager import view_logs
 from Scripts.config_setter import assign_and_apply, unassign_wallpaper
 from Steam.screen_tools import identify_monitors
 from UI.config_interface import config_wallpaper
+from UI.profiles_interface import add_profile_controls
 from UI.properties_interface import wallpaper_property_setup
 from UI.wallpaper_list import on_wallpaper_select
 
@@ -175,6 +176,8 @@ def setup_ui(self):
     btn_logs = QPushButton("View Logs")
     btn_logs.clicked.connect(lambda: view_logs(self))
     util_layout.addWidget(btn_logs)
+    util_layout.addStretch()
+    add_profile_controls(self, util_layout)
     main_layout.addLayout(util_layout)
 
     # Central panel (wallpapers and preview)
@@ -252,11 +255,14 @@ def setup_ui(self):
 def get_title_color(self):
     return "#FFFFFF" if self.theme_slider.value() == 0 else "#000000"
 
-def update_screen_status(self):
+def update_screen_status(self, screens=None):
     """
-    Update the status labels for each Screen to reflect the currently assigned wallpaper.
+    Update the status labels for each Screen (or only the given screens)
+    to reflect the currently assigned wallpaper.
     """
     for screen in self.detected_screens:
+        if screens is not None and screen not in screens:
+            continue
         label = self.status_labels.get(screen)
         wallpaper_id = self.selected_wallpapers.get(screen)
         if label is not None:
@@ -4,6 +4,8 @@ import subprocess
 
 from PIL import Image
 
+from Steam.workshop_items import get_preview_thumbnail
+
 def kill_preview_process(self):
     proc = getattr(self, '_preview_process', None)
     if proc is None:
@@ -64,14 +66,10 @@ def on_wallpaper_select(self):
     # Update preview with larger size
     if wallpaper_info["preview"]:
         try:
-            image = Image.open(wallpaper_info["preview"])
-            # If GIF, show first frame (Pillow handles animated GIFs)
-            if getattr(image, "is_animated", False):
-                image.seek(0)
-            image.thumbnail((300, 170), Image.Resampling.LANCZOS)
+            # Cached, and prewarmed before a playlist switches to it
+            image = get_preview_thumbnail(self, wallpaper_id)
             from PySide6.QtGui import QImage, QPixmap
 
-            image = image.convert("RGBA")
             data = image.tobytes("raw", "RGBA")
             qimage = QImage(
                 data, image.width, image.height, QImage.Format.Format_RGBA8888
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Headless command line interface for scripted and login-time use.
+Shares the catalog, config and script generation code with the GUI but never imports Qt.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Budget for `WallpaperEngineCLI.py status`, checked by `bench`
+STATUS_BUDGET_MS = 150
+# Budget for parsing one recorded display backend output into a topology, checked by `bench-displays`
+DISPLAY_PARSE_BUDGET_MS = 2
+
+
+def cmd_list(args):
+    from Control.headless import HeadlessConfigurator
+
+    state = HeadlessConfigurator(detect=False).load_cached()
+    for wallpaper_id, info in sorted(state.wallpapers.items(), key=lambda x: x[1]["title"].lower()):
+        line = f"{wallpaper_id}\t{info['title']}"
+        if not info.get("supported", True):
+            line += f"\t[NOT SUPPORTED: {info['unsupported_reason']}]"
+        print(line)
+    return 0
+
+
+def cmd_status(args):
+    from Control.control_socket import get_status
+    from Control.headless import HeadlessConfigurator
+
+    status = get_status(HeadlessConfigurator(detect=False).load_cached())
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return 0
+    print(f"Engine: {'running' if status['engine_running'] else 'stopped'}")
+    for screen, info in status["screens"].items():
+        if info["wallpaper"]:
+            print(f"{screen}: {info['title'] or info['wallpaper']} (ID: {info['wallpaper']})")
+        else:
+            print(f"{screen}: Not assigned")
+    return 0
+
+
+def cmd_assign(args):
+    from Control.headless import HeadlessConfigurator
+    from Scripts.config_setter import apply_assigned_screens, set_screen_wallpaper
+
+    state = HeadlessConfigurator(detect=False).load_cached()
+    wallpaper_id = None if args.command == "unassign" else args.wallpaper
+    try:
+        set_screen_wallpaper(state, args.screen, wallpaper_id)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    if args.no_apply:
+        return 0
+    ok, message = apply_assigned_screens(state)
+    print(message)
+    return 0 if ok else 1
+
+
+def cmd_apply(args):
+    from Control.headless import HeadlessConfigurator
+    from Scripts.config_setter import apply_assigned_screens
+
+    # Detect screens again in case the session changed (e.g., xrdp vs physical session)
+    state = HeadlessConfigurator(detect=False).load_cached().rescan()
+    ok, message = apply_assigned_screens(state)
+    print(message)
+    return 0 if ok else 1
+
+
+def cmd_rescan(args):
+    from Control.headless import HeadlessConfigurator
+
+    state = HeadlessConfigurator(detect=False).rescan()
+    print(f"Screens: {', '.join(state.detected_screens)}")
+    print(f"Wallpapers: {len(state.wallpapers)}")
+    return 0
+
+
+def cmd_profile(args):
+    from Control.headless import HeadlessConfigurator
+    from Scripts.profiles import delete_profile, get_profiles, save_profile, switch_profile
+
+    state = HeadlessConfigurator(detect=False).load_cached()
+    if args.action == "list":
+        for name in sorted(get_profiles(state)):
+            print(f"{'*' if name == getattr(state, 'active_profile', None) else ' '} {name}")
+        return 0
+    if not args.name:
+        print(f"Error: 'profile {args.action}' needs a profile name")
+        return 1
+    try:
+        if args.action == "save":
+            save_profile(state, args.name)
+            print(f"Profile {args.name} saved")
+        elif args.action == "delete":
+            delete_profile(state, args.name)
+            print(f"Profile {args.name} deleted")
+        else:
+            ok, message = switch_profile(state, args.name)
+            print(message)
+            return 0 if ok else 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def cmd_playlist(args):
+    from Control.headless import HeadlessConfigurator
+    from Files.config_files import save_current_config
+    from Wallpaper_Engine.playlists import parse_times
+
+    state = HeadlessConfigurator(detect=False).load_cached()
+    if args.screen not in state.detected_screens:
+        print(f"Error: Unknown screen: {args.screen}")
+        return 1
+    config = state.screen_configs.setdefault(args.screen, {})
+    if args.off:
+        config["playlist_mode"] = "off"
+    else:
+        unknown = [wallpaper_id for wallpaper_id in args.wallpapers if wallpaper_id not in state.wallpapers]
+        if unknown or not args.wallpapers:
+            print(f"Error: Unknown wallpapers: {', '.join(unknown)}" if unknown else "Error: No wallpapers given")
+            return 1
+        config["playlist"] = args.wallpapers
+        if args.at:
+            times = [t.strip() for t in args.at.split(",") if t.strip()]
+            try:
+                parse_times(times)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+            config.update(playlist_mode="time_of_day", playlist_times=times)
+        else:
+            config.update(playlist_mode="interval", playlist_interval=args.every)
+    save_current_config(state)
+    print(f"Playlist of {args.screen}: {config.get('playlist_mode')}")
+    return 0
+
+
+def cmd_serve(args):
+    from Control.control_socket import serve
+    from Control.headless import HeadlessConfigurator
+
+    serve(HeadlessConfigurator(detect=False).load_cached().rescan(), args.socket)
+    return 0
+
+
+def cmd_bench(args):
+    """Measure `status` start-up time in fresh interpreters and check it against the budget"""
+    command = [sys.executable, os.path.abspath(__file__), "status"]
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # The CLI must not pull in Qt, even indirectly
+    qt_modules = []
+    if args.check_imports:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cmd_status(argparse.Namespace(json=True))
+        qt_modules = [m for m in sys.modules if m.split(".")[0] in ("PySide6", "qdarktheme")]
+
+    median = statistics.median(timings)
+    print(f"status: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms ({args.runs} runs)")
+    print(f"budget: {args.budget} ms -> {'OK' if median <= args.budget else 'OVER BUDGET'}")
+    if qt_modules:
+        print(f"Qt modules imported: {', '.join(sorted(qt_modules))}")
+    return 0 if median <= args.budget and not qt_modules else 1
+
+
+def cmd_bench_displays(args):
+    """Measure screen detection and topology build per backend, on the recorded fixtures and the live system"""
+    from Screen.backends import benchmark_backends
+
+    over = []
+    for label, median, topology in benchmark_backends(args.runs, args.fixtures or None):
+        screens = ", ".join(
+            f"{m.name} {m.width}x{m.height}+{m.x}+{m.y}" + (f"@{m.refresh_rate:g}" if m.refresh_rate else "")
+            for m in topology.monitors
+        )
+        print(f"{label:<24} {median * 1000:9.1f} us  {screens or 'no screens'}")
+        # Only parsing is budgeted, the live backend includes starting the tool
+        if not label.startswith("live") and median > args.budget:
+            over.append(label)
+    print(f"budget: {args.budget} ms per fixture -> {'OVER BUDGET: ' + ', '.join(over) if over else 'OK'}")
+    return 1 if over else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless Linux-WallpaperEngine configurator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List available wallpapers").set_defaults(func=cmd_list)
+
+    p = sub.add_parser("status", help="Show assignments and engine state")
+    p.add_argument("--json", action="store_true", help="Print machine readable output")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("assign", help="Assign a wallpaper to a screen and apply")
+    p.add_argument("screen")
+    p.add_argument("wallpaper")
+    p.add_argument("--no-apply", action="store_true", help="Only save the assignment")
+    p.set_defaults(func=cmd_assign)
+
+    p = sub.add_parser("unassign", help="Remove the wallpaper of a screen and apply")
+    p.add_argument("screen")
+    p.add_argument("--no-apply", action="store_true", help="Only save the assignment")
+    p.set_defaults(func=cmd_assign)
+
+    sub.add_parser("apply", help="Regenerate the script and restart the engine").set_defaults(func=cmd_apply)
+    sub.add_parser("rescan", help="Detect screens and rescan wallpapers").set_defaults(func=cmd_rescan)
+
+    p = sub.add_parser("profile", help="List, save, switch to or delete named profiles")
+    p.add_argument("action", choices=["list", "save", "switch", "delete"])
+    p.add_argument("name", nargs="?")
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser("playlist", help="Rotate the wallpapers of a screen (runs in the GUI or `serve`)")
+    p.add_argument("screen")
+    p.add_argument("wallpapers", nargs="*")
+    p.add_argument("--every", type=int, default=30, help="Minutes between wallpapers")
+    p.add_argument("--at", default=None, help="Start time of each wallpaper, e.g. 08:00,18:30")
+    p.add_argument("--off", action="store_true", help="Stop rotating")
+    p.set_defaults(func=cmd_playlist)
+
+    p = sub.add_parser("serve", help="Serve the control socket API")
+    p.add_argument("--socket", default=None, help="Socket path")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("bench", help="Check `status` start-up time against the budget")
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--budget", type=float, default=STATUS_BUDGET_MS, help="Budget in ms")
+    p.add_argument("--no-check-imports", dest="check_imports", action="store_false")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("bench-displays", help="Time screen detection per backend on recorded outputs")
+    p.add_argument("fixtures", nargs="*", help="Recorded outputs named <case>.<backend> (default: all)")
+    p.add_argument("--runs", type=int, default=200)
+    p.add_argument("--budget", type=float, default=DISPLAY_PARSE_BUDGET_MS, help="Budget in ms")
+    p.set_defaults(func=cmd_bench_displays)
+    return parser
+
+
+def main():
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+    # Resolve the package modules when launched from another directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    args = build_parser().parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print(" Process interrupted by user.")
+        sys.exit(130)
@@ -11,13 +11,20 @@ from PySide6.QtWidgets import (
 )
 
 from Files.config_files import ensure_required_files, get_autostart_path
+from Files.config_watcher import start_config_watcher
+from Files.config_writer import start_config_writer, stop_config_writer
 from Files.icon_file import set_icon_file
+from Files.log_sink import LOG_SINK_ARGUMENT, start_log_sink, stop_log_sink, main as log_sink_main
 from Screen.screen_detection import detect_screens
+from Screen.hotplug import start_hotplug_monitor
 from Scripts.start_script import get_script_path
 from Steam.wallpaper_location import find_wallpaper_directory
 from Steam.workshop_items import load_wallpapers
-from UI.UI_Tools import create_overlays
 from UI.user_interface import setup_ui
+from Wallpaper_Engine.idle_monitor import start_idle_monitor
+from Wallpaper_Engine.playlists import start_playlists
+from Wallpaper_Engine.power_profiles import start_power_profiles
+from Wallpaper_Engine.supervisor import start_supervisor
 from dependencies import check_and_install_dependencies
 
 
@@ -48,29 +55,69 @@ class WallpaperConfigQt(QMainWindow):
         for screen in self.detected_screens:
             self.selected_wallpapers[screen] = None
 
-        try:
-            create_overlays(self)
-        except Exception as exc:
-            print(f"Warning: could not create overlays at init: {exc}")
-
-
         # Main UI
         qdarktheme.setup_theme("dark")
         set_icon_file(self)
         self._preview_process = None
         setup_ui(self)
+        start_log_sink(self)
+        start_config_writer(self)
         load_wallpapers(self)
         ensure_required_files(self)
+        start_supervisor(self)
+        start_idle_monitor(self)
+        start_power_profiles(self)
+        start_config_watcher(self, self.on_config_changed)
+        start_playlists(self, self.on_playlist_rotate)
+        # The cached display topology is only detected again when the outputs change
+        hotplug = start_hotplug_monitor(self, self.on_displays_changed)
+        app = QApplication.instance()
+        app.screenAdded.connect(lambda screen: hotplug.notify())
+        app.screenRemoved.connect(lambda screen: hotplug.notify())
+        app.primaryScreenChanged.connect(lambda screen: hotplug.notify())
+
+    def on_displays_changed(self, previous_topology):
+        from PySide6.QtCore import QTimer
+        from Scripts.config_setter import on_displays_changed
+        # Called from the hotplug timer thread, update on the GUI thread
+        QTimer.singleShot(0, self, lambda: on_displays_changed(self, previous_topology))
+
+    def on_playlist_rotate(self, screen, wallpaper_id):
+        from PySide6.QtCore import QTimer
+        from Scripts.config_setter import rotate_playlist
+        # Called from a timer thread, rotate on the GUI thread
+        QTimer.singleShot(0, self, lambda: rotate_playlist(self, screen, wallpaper_id))
+
+    def on_config_changed(self, config):
+        from PySide6.QtCore import QTimer
+        from Scripts.config_setter import reload_external_config
+        # Called from the watcher thread, merge on the GUI thread
+        QTimer.singleShot(0, self, lambda: reload_external_config(self, config))
 
     def closeEvent(self, event):
         from UI.wallpaper_list import kill_preview_process
         kill_preview_process(self)
+        # Never leave the engine suspended after the configurator exits
+        self.idle_monitor.stop()
+        self.idle_monitor.join(timeout=1)
+        self.power_profile_manager.stop()
+        if getattr(self, "apply_queue", None) is not None:
+            self.apply_queue.stop()
+        self.config_watcher.stop()
+        self.playlist_scheduler.stop()
+        self.hotplug_monitor.stop()
+        stop_config_writer(self)
+        stop_log_sink(self)
         super().closeEvent(event)
 
 def main():
     # Force UTF-8
     os.environ["PYTHONIOENCODING"] = "utf-8"
 
+    # The log sink handed the engine pipes when the configurator exited (bundled executable)
+    if len(sys.argv) > 1 and sys.argv[1] == LOG_SINK_ARGUMENT:
+        sys.exit(log_sink_main(sys.argv[2:]))
+
     check_and_install_dependencies()
 
     app = QApplication(sys.argv)
@@ -0,0 +1,283 @@
+import ctypes
+import ctypes.util
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+import psutil
+
+from Wallpaper_Engine.metrics import record_metric
+from Wallpaper_Engine.scheduling import find_engine_processes
+
+# Seconds of inactivity before the engine is suspended (0 disables the monitor)
+IDLE_DEFAULTS = {"idle_timeout": 0}
+
+# How often the idle source is polled while suspended, so input resumes within a frame
+FRAME_INTERVAL = 1 / 60
+# How often the process table is scanned while suspended, for engines started since the suspend
+ENGINE_RESCAN_SECONDS = 1.0
+
+
+class SimulatedIdleSource:
+    """Idle source driven by hand (tests and debugging): set_idle() / set_locked()"""
+
+    poll_interval = FRAME_INTERVAL
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._active_at = clock()
+        self._locked = False
+
+    def set_idle(self, seconds):
+        self._active_at = self.clock() - seconds
+
+    def set_locked(self, locked):
+        self._locked = locked
+
+    def get_idle_state(self):
+        return self.clock() - self._active_at, self._locked
+
+
+class _XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("event_mask", ctypes.c_ulong),
+    ]
+
+
+class X11IdleSource:
+    """
+    Idle time from the X11 MIT-SCREEN-SAVER extension (libXss), queried in-process.
+    X11 has no lock state: it comes from the logind session (LockedHint) when there is one.
+    """
+
+    poll_interval = FRAME_INTERVAL
+
+    def __init__(self, lock_source=None, clock=time.monotonic):
+        xlib = ctypes.CDLL(ctypes.util.find_library("X11"))
+        xss = ctypes.CDLL(ctypes.util.find_library("Xss"))
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+        xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XScreenSaverInfo)
+        ]
+        self._display = xlib.XOpenDisplay(None)
+        if not self._display:
+            raise RuntimeError("Cannot open X display")
+        self._root = xlib.XDefaultRootWindow(self._display)
+        self._info = xss.XScreenSaverAllocInfo()
+        self._xss = xss
+        if lock_source is None and LogindIdleSource.available():
+            lock_source = LogindIdleSource()
+        self.lock_source = lock_source
+        self.clock = clock
+        self._locked = False
+        self._locked_at = None
+
+    @staticmethod
+    def available():
+        return (
+            bool(os.environ.get("DISPLAY"))
+            and not os.environ.get("WAYLAND_DISPLAY")
+            and bool(ctypes.util.find_library("X11"))
+            and bool(ctypes.util.find_library("Xss"))
+        )
+
+    def get_idle_state(self):
+        self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info)
+        return self._info.contents.idle / 1000.0, self.get_locked()
+
+    def get_locked(self):
+        """The logind lock state, re-read at the logind poll interval (each read spawns loginctl)"""
+        if self.lock_source is None:
+            return False
+        now = self.clock()
+        if self._locked_at is None or now - self._locked_at >= self.lock_source.poll_interval:
+            _, self._locked = self.lock_source.get_idle_state()
+            self._locked_at = now
+        return self._locked
+
+
+class LogindIdleSource:
+    """Idle and lock state from the logind session (IdleHint/LockedHint) via loginctl"""
+
+    # Each poll spawns loginctl, so resume latency is bounded by this interval
+    poll_interval = 0.25
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id or os.environ.get("XDG_SESSION_ID")
+        if not self.session_id:
+            raise RuntimeError("No logind session id")
+
+    @staticmethod
+    def available():
+        return bool(shutil.which("loginctl")) and bool(os.environ.get("XDG_SESSION_ID"))
+
+    def get_idle_state(self):
+        result = subprocess.run(
+            [
+                "loginctl", "show-session", self.session_id,
+                "-p", "IdleHint", "-p", "IdleSinceHintMonotonic", "-p", "LockedHint",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        props = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        locked = props.get("LockedHint") == "yes"
+        if props.get("IdleHint") != "yes":
+            return 0.0, locked
+        try:
+            since = int(props.get("IdleSinceHintMonotonic", "0")) / 1_000_000
+        except ValueError:
+            since = 0
+        idle = time.clock_gettime(time.CLOCK_MONOTONIC) - since if since else float("inf")
+        return idle, locked
+
+
+def get_default_idle_source():
+    """Return the best available idle source for this session, or None"""
+    for source_cls in (X11IdleSource, LogindIdleSource):
+        try:
+            if source_cls.available():
+                return source_cls()
+        except Exception as e:
+            print(f"Idle source {source_cls.__name__} unavailable: {e}")
+    return None
+
+
+def get_idle_timeout(self):
+    """Return the configured idle timeout in seconds (global key, taken from the first Screen config)"""
+    for screen in getattr(self, "detected_screens", []):
+        cfg = self.screen_configs.get(screen)
+        if cfg and "idle_timeout" in cfg:
+            return int(cfg["idle_timeout"])
+    return IDLE_DEFAULTS["idle_timeout"]
+
+
+def find_engine_pids():
+    return [proc.pid for proc in find_engine_processes()]
+
+
+def signal_engines(sig, pids=None):
+    """Send a signal to the given PIDs, or to every running engine process. Returns the PIDs signalled"""
+    if pids is not None:
+        signalled = []
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+                signalled.append(pid)
+            except ProcessLookupError:
+                continue
+        return signalled
+    pids = []
+    for proc in find_engine_processes():
+        try:
+            proc.send_signal(sig)
+            pids.append(proc.pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return pids
+
+
+class IdleMonitor(threading.Thread):
+    """
+    Suspends the engines with SIGSTOP once the session has been idle (or locked)
+    for the configured timeout and resumes them with SIGCONT on user activity.
+    Engines started while suspended (playlist rotation, hotplug, power profile switch) are stopped too.
+    The idle source, clock, signal and PID functions are injectable for testing.
+    """
+
+    def __init__(self, state, source=None, clock=time.monotonic, signal_func=signal_engines,
+                 pids_func=find_engine_pids):
+        super().__init__(name="idle-monitor", daemon=True)
+        self.state = state
+        self.source = source
+        self.clock = clock
+        self.signal_func = signal_func
+        self.pids_func = pids_func
+        self.suspended = False
+        self._suspended_at = None
+        self._suspended_pids = None
+        self._scanned_at = None
+        self._stop_event = threading.Event()
+
+    def check(self):
+        """Evaluate the idle state once. Returns the number of seconds to wait before the next check"""
+        timeout = get_idle_timeout(self.state)
+        if timeout <= 0 or self.source is None:
+            if self.suspended:
+                self.resume()
+            return 5.0
+
+        idle, locked = self.source.get_idle_state()
+        if locked or idle >= timeout:
+            if not self.suspended:
+                self.suspend()
+            else:
+                self.suspend_new_engines()
+            return self.source.poll_interval
+        if self.suspended:
+            self.resume()
+        # Idle time cannot reach the timeout earlier than this (re-read the config every 5 s)
+        return min(5.0, max(self.source.poll_interval, timeout - idle))
+
+    def suspend(self):
+        pids = self.signal_func(signal.SIGSTOP)
+        self._suspended_pids = pids
+        self.suspended = True
+        self._suspended_at = self._scanned_at = self.clock()
+        print(f"Session idle: engine suspended (PIDs: {pids})")
+
+    def suspend_new_engines(self):
+        """Stop the engines started since the suspend (the process table is scanned once a second)"""
+        now = self.clock()
+        if now - self._scanned_at < ENGINE_RESCAN_SECONDS:
+            return
+        self._scanned_at = now
+        new_pids = [pid for pid in self.pids_func() if pid not in self._suspended_pids]
+        if new_pids:
+            pids = self.signal_func(signal.SIGSTOP, new_pids)
+            self._suspended_pids = self._suspended_pids + pids
+            print(f"Session idle: new engine suspended (PIDs: {pids})")
+
+    def resume(self):
+        # Continue the PIDs stopped earlier directly, without scanning the process table
+        pids = self.signal_func(signal.SIGCONT, self._suspended_pids)
+        self._suspended_pids = None
+        self.suspended = False
+        if self._suspended_at is not None:
+            record_metric("idle_suspended_seconds", self.clock() - self._suspended_at)
+        self._suspended_at = None
+        print(f"Session active: engine resumed (PIDs: {pids})")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                delay = self.check()
+            except Exception as e:
+                print(f"Idle monitor error: {e}")
+                delay = 5.0
+            self._stop_event.wait(delay)
+        if self.suspended:
+            self.resume()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_idle_monitor(self, source=None):
+    """Start the idle monitor for a configurator state (once)"""
+    if getattr(self, "idle_monitor", None) is None:
+        self.idle_monitor = IdleMonitor(self, source or get_default_idle_source())
+        self.idle_monitor.start()
+    return self.idle_monitor
@@ -0,0 +1,31 @@
+import threading
+import time
+
+_metrics = {}
+_lock = threading.Lock()
+
+
+def record_metric(name, value):
+    """Record a measured value (e.g. latency in ms) under the given metric name"""
+    with _lock:
+        entry = _metrics.get(name)
+        if entry is None:
+            entry = {"count": 0, "last": None, "min": None, "max": None, "total": 0.0}
+            _metrics[name] = entry
+        entry["count"] += 1
+        entry["last"] = value
+        entry["min"] = value if entry["min"] is None else min(entry["min"], value)
+        entry["max"] = value if entry["max"] is None else max(entry["max"], value)
+        entry["total"] += value
+        entry["updated"] = time.time()
+
+
+def get_metrics():
+    """Return a snapshot of all recorded metrics, including the running average"""
+    with _lock:
+        snapshot = {}
+        for name, entry in _metrics.items():
+            data = dict(entry)
+            data["avg"] = entry["total"] / entry["count"] if entry["count"] else None
+            snapshot[name] = data
+        return snapshot
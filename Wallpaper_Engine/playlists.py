@@ -0,0 +1,247 @@
+import copy
+import datetime
+import os
+import threading
+import time
+
+from Wallpaper_Engine.metrics import record_metric
+
+# Per-screen playlist, local keys of the Screen config
+PLAYLIST_DEFAULTS = {
+    "playlist": [],
+    "playlist_mode": "off",
+    # Minutes between rotations (interval mode)
+    "playlist_interval": 30,
+    # "HH:MM" start time of each playlist item (time_of_day mode)
+    "playlist_times": [],
+}
+PLAYLIST_MODES = ("off", "interval", "time_of_day")
+
+# The next wallpaper is prewarmed this long before the switch
+PREWARM_SECONDS = 30
+# Upper bound of the files read ahead into the page cache per prewarm
+READAHEAD_LIMIT = 256 * 1024 * 1024
+
+
+def get_playlist_settings(self, screen):
+    config = self.screen_configs.get(screen, {})
+    # Copies, so an in-place edit of the config is seen as a change by the scheduler
+    return {key: copy.copy(config.get(key, default)) for key, default in PLAYLIST_DEFAULTS.items()}
+
+
+def parse_times(times):
+    """Parse "HH:MM" strings into seconds after midnight. Raises ValueError on a bad entry"""
+    seconds = []
+    for entry in times:
+        try:
+            hours, minutes = (int(part) for part in entry.strip().split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid time: {entry!r} (expected HH:MM)")
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"Invalid time: {entry!r} (expected HH:MM)")
+        seconds.append(hours * 3600 + minutes * 60)
+    return seconds
+
+
+def _seconds_of_day(now):
+    moment = datetime.datetime.fromtimestamp(now)
+    return moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+
+
+def next_rotation(settings, position, now):
+    """
+    When the playlist switches next. position is the index of the item on screen (-1 for none).
+    Returns (delay_seconds, index) or None if the playlist does not rotate.
+    """
+    items = settings["playlist"]
+    if settings["playlist_mode"] == "interval" and len(items) >= 2:
+        return max(1, settings["playlist_interval"]) * 60, (position + 1) % len(items)
+    if settings["playlist_mode"] == "time_of_day" and items:
+        slots = parse_times(settings["playlist_times"])[:len(items)]
+        if not slots:
+            return None
+        elapsed = _seconds_of_day(now)
+        # Seconds until each slot comes round again (a slot at this very second is tomorrow's)
+        delays = [((slot - elapsed) % 86400) or 86400 for slot in slots]
+        index = min(range(len(slots)), key=lambda i: delays[i])
+        return delays[index], index
+    return None
+
+
+def current_slot(settings, now):
+    """The index of the time_of_day item that should be on screen now, or None"""
+    if settings["playlist_mode"] != "time_of_day" or not settings["playlist"]:
+        return None
+    slots = parse_times(settings["playlist_times"])[:len(settings["playlist"])]
+    if not slots:
+        return None
+    elapsed = _seconds_of_day(now)
+    # The most recent slot, which is yesterday's last one before the first slot of the day
+    return min(range(len(slots)), key=lambda i: (elapsed - slots[i]) % 86400)
+
+
+def readahead_files(path, limit=READAHEAD_LIMIT):
+    """Ask the kernel to read a wallpaper's files into the page cache. Returns the bytes requested"""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(file_path)
+                if total + size > limit:
+                    return total
+                fd = os.open(file_path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                continue
+            total += size
+    return total
+
+
+def prewarm_wallpaper(self, wallpaper_id):
+    """Load the preview thumbnail and property schema, and read the assets ahead, before a switch"""
+    from Files.wallpaper_properties import get_wallpaper_properties
+    from Steam.workshop_items import get_preview_thumbnail
+
+    started = time.monotonic()
+    info = self.wallpapers.get(wallpaper_id)
+    if info is None:
+        return
+    readahead_files(info.get("path") or os.path.join(self.wallpaper_base_path, wallpaper_id))
+    get_preview_thumbnail(self, wallpaper_id)
+    get_wallpaper_properties(self, wallpaper_id)
+    record_metric("playlist_prewarm_ms", (time.monotonic() - started) * 1000)
+
+
+class PlaylistScheduler:
+    """
+    Rotates the wallpaper of each screen with a playlist, on a timer per screen (no polling).
+    The next item is prewarmed PREWARM_SECONDS before it is shown.
+    rotate_func(screen, wallpaper_id) assigns and applies the item; clock and
+    timer_factory can be replaced to drive the scheduler in tests.
+    """
+
+    def __init__(self, state, rotate_func, clock=time.time, timer_factory=threading.Timer,
+                 prewarm_func=prewarm_wallpaper):
+        self.state = state
+        self.rotate_func = rotate_func
+        self.clock = clock
+        self.timer_factory = timer_factory
+        self.prewarm_func = prewarm_func
+        self._lock = threading.Lock()
+        self._timers = {}
+        # Settings each screen was scheduled with, to reschedule only what changed
+        self._scheduled = {}
+        self._positions = {}
+        # Bumped on every (re)schedule, so a timer that already fired for an old schedule does nothing
+        self._generations = {}
+
+    def start(self):
+        self.reschedule()
+        return self
+
+    def reschedule(self):
+        """Schedule the screens whose playlist settings changed since they were last scheduled"""
+        with self._lock:
+            for screen in set(self.state.detected_screens) | set(self._scheduled):
+                settings = get_playlist_settings(self.state, screen)
+                if screen not in self.state.detected_screens:
+                    self._cancel(screen)
+                    self._scheduled.pop(screen, None)
+                    continue
+                if self._scheduled.get(screen) == settings:
+                    continue
+                self._scheduled[screen] = settings
+                self._positions.pop(screen, None)
+                self._schedule(screen)
+
+    def _position(self, screen, settings):
+        if screen in self._positions:
+            return self._positions[screen]
+        current = self.state.selected_wallpapers.get(screen)
+        return settings["playlist"].index(current) if current in settings["playlist"] else -1
+
+    def _start_timer(self, delay, func, *args):
+        timer = self.timer_factory(delay, func, args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _cancel(self, screen):
+        self._generations[screen] = self._generations.get(screen, 0) + 1
+        for timer in self._timers.pop(screen, []):
+            timer.cancel()
+
+    def _schedule(self, screen):
+        self._cancel(screen)
+        settings = self._scheduled.get(screen)
+        if settings is None:
+            return
+        try:
+            now = self.clock()
+            slot = current_slot(settings, now)
+            rotation = next_rotation(settings, self._position(screen, settings), now)
+        except ValueError as e:
+            print(f"Playlist of {screen}: {e}")
+            return
+        generation = self._generations[screen]
+        timers = []
+        # A time_of_day playlist shows the item of the current slot right away
+        if slot is not None and screen not in self._positions and \
+                settings["playlist"][slot] != self.state.selected_wallpapers.get(screen):
+            timers.append(self._start_timer(0, self._rotate, screen, slot, generation))
+        elif rotation is not None:
+            delay, index = rotation
+            timers.append(
+                self._start_timer(max(0.0, delay - PREWARM_SECONDS), self._prewarm, screen, index, generation)
+            )
+            timers.append(self._start_timer(delay, self._rotate, screen, index, generation))
+        self._timers[screen] = timers
+
+    def _prewarm(self, screen, index, generation):
+        with self._lock:
+            if self._generations.get(screen) != generation:
+                return
+            wallpaper_id = self._scheduled[screen]["playlist"][index]
+        try:
+            self.prewarm_func(self.state, wallpaper_id)
+        except Exception as e:
+            print(f"Prewarm of {wallpaper_id} failed: {e}")
+
+    def _rotate(self, screen, index, generation):
+        with self._lock:
+            if self._generations.get(screen) != generation:
+                return
+            wallpaper_id = self._scheduled[screen]["playlist"][index]
+            self._positions[screen] = index
+        # Not under the lock: the rotation applies, and an apply reschedules
+        try:
+            self.rotate_func(screen, wallpaper_id)
+            record_metric("playlist_rotations", 1)
+        except Exception as e:
+            print(f"Playlist rotation of {screen} to {wallpaper_id} failed: {e}")
+        with self._lock:
+            if self._generations.get(screen) == generation:
+                self._schedule(screen)
+
+    def stop(self):
+        with self._lock:
+            for screen in list(self._timers):
+                self._cancel(screen)
+
+
+def start_playlists(self, rotate_func):
+    """Start the playlist scheduler for a configurator state (once)"""
+    if getattr(self, "playlist_scheduler", None) is None:
+        self.playlist_scheduler = PlaylistScheduler(self, rotate_func).start()
+    return self.playlist_scheduler
+
+
+def reschedule_playlists(self):
+    """Pick up playlist changes of the configurator state, if the scheduler runs"""
+    scheduler = getattr(self, "playlist_scheduler", None)
+    if scheduler is not None:
+        scheduler.reschedule()
@@ -0,0 +1,303 @@
+import os
+import shlex
+import shutil
+import threading
+import time
+
+# Global power settings: off by default, battery profile is "reduced" or "static"
+POWER_DEFAULTS = {
+    "power_profiles": False,
+    "battery_profile": "reduced",
+    "reduced_fps": 15,
+    "static_below": 20,
+}
+
+PROFILES = ("full", "reduced", "static")
+
+POWER_SUPPLY_PATH = "/sys/class/power_supply"
+
+# Battery percentage above static_below needed to leave the static profile again
+CAPACITY_HYSTERESIS = 5
+# Minimum seconds between two profile switches (absorbs AC flapping when docking)
+MIN_DWELL_SECONDS = 10.0
+# Fallback polling interval when kernel uevents are not available
+POLL_SECONDS = 30.0
+
+
+def get_power_settings(self):
+    """Return the power profile settings (global keys, taken from the first Screen config)"""
+    settings = POWER_DEFAULTS.copy()
+    for screen in getattr(self, "detected_screens", []):
+        cfg = self.screen_configs.get(screen)
+        if cfg:
+            settings.update({k: cfg[k] for k in POWER_DEFAULTS if k in cfg})
+            break
+    return settings
+
+
+def _read_sysfs(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def read_power_state(root=POWER_SUPPLY_PATH):
+    """
+    Read AC and battery state from sysfs.
+    Returns {"on_ac": bool, "capacity": int or None}; machines without a battery count as on AC.
+    """
+    ac_online = None
+    capacities = []
+    discharging = False
+    try:
+        supplies = os.listdir(root)
+    except OSError:
+        supplies = []
+    for name in supplies:
+        supply = os.path.join(root, name)
+        supply_type = _read_sysfs(os.path.join(supply, "type"))
+        if supply_type == "Mains":
+            online = _read_sysfs(os.path.join(supply, "online"))
+            ac_online = bool(ac_online) or online == "1"
+        elif supply_type == "Battery":
+            # Skip peripheral batteries (mice, keyboards) reported with scope Device
+            if _read_sysfs(os.path.join(supply, "scope")) == "Device":
+                continue
+            capacity = _read_sysfs(os.path.join(supply, "capacity"))
+            if capacity and capacity.isdigit():
+                capacities.append(int(capacity))
+            discharging = discharging or _read_sysfs(os.path.join(supply, "status")) == "Discharging"
+
+    if not capacities:
+        return {"on_ac": True, "capacity": None}
+    on_ac = ac_online if ac_online is not None else not discharging
+    return {"on_ac": on_ac, "capacity": min(capacities)}
+
+
+def choose_profile(settings, power_state, current):
+    """Pick the profile for the power state, with a capacity hysteresis band around static_below"""
+    if not settings["power_profiles"] or power_state["on_ac"]:
+        return "full"
+    battery_profile = settings["battery_profile"]
+    capacity = power_state["capacity"]
+    threshold = settings["static_below"]
+    if capacity is None or not threshold:
+        return battery_profile
+    if capacity <= threshold:
+        return "static"
+    if current == "static" and capacity < threshold + CAPACITY_HYSTERESIS:
+        return "static"
+    return battery_profile
+
+
+def get_profile_script_path(self, profile):
+    """Get the precomputed script path of a power profile"""
+    if profile == "full":
+        return self.script_path
+    base, ext = os.path.splitext(self.script_path)
+    return f"{base}-{profile}{ext}"
+
+
+def get_active_script_path(self):
+    """Get the script of the power profile currently in use"""
+    return get_profile_script_path(self, getattr(self, "power_profile", "full"))
+
+
+def render_static_script(self, wallpaper_paths):
+    """Render a script that shows each wallpaper's preview image instead of running the engine"""
+    previews = []
+    for screen, path in wallpaper_paths.items():
+        for name in ("preview.jpg", "preview.png"):
+            if os.path.exists(os.path.join(path, name)):
+                previews.append((screen, os.path.join(path, name)))
+                break
+
+    lines = [
+        "#!/bin/bash",
+        "",
+        "# Automatically generated file by WallpaperEngineConfigurator.py (static power profile)",
+        "# Do not edit manually - changes will be overwritten",
+        "",
+        "pkill -f linux-wallpaperengine 2>/dev/null",
+    ]
+    if not previews:
+        lines.append('echo "$(date): No preview images for the static profile" >> /tmp/wallpaper-engine.log')
+    elif os.environ.get("WAYLAND_DISPLAY") and shutil.which("swaybg"):
+        args = " ".join(f"-o {shlex.quote(s)} -i {shlex.quote(p)} -m fill" for s, p in previews)
+        lines.append(f"exec swaybg {args}")
+    elif shutil.which("xwallpaper"):
+        args = " ".join(f"--output {shlex.quote(s)} --zoom {shlex.quote(p)}" for s, p in previews)
+        lines.append(f"exec xwallpaper {args}")
+    elif shutil.which("feh"):
+        # feh assigns images to screens in Xinerama order
+        args = " ".join(shlex.quote(p) for _, p in previews)
+        lines.append(f"exec feh --no-fehbg --bg-fill {args}")
+    else:
+        lines.append('echo "$(date): Install swaybg, xwallpaper or feh for the static profile" >> /tmp/wallpaper-engine.log')
+    return "\n".join(lines) + "\n"
+
+
+def write_profile_scripts(self, wallpaper_paths):
+    """
+    Precompute the reduced and static profile scripts so switching needs no generation.
+    Returns True if a script changed.
+    """
+    from Scripts.launch_plan import write_script
+    from Scripts.start_script import update_script_with_assigned_screens
+
+    settings = get_power_settings(self)
+    if not settings["power_profiles"] or not wallpaper_paths:
+        return False
+    reduced_changed = update_script_with_assigned_screens(
+        self,
+        wallpaper_paths,
+        script_path=get_profile_script_path(self, "reduced"),
+        max_fps=settings["reduced_fps"],
+    )
+    static_changed = write_script(
+        get_profile_script_path(self, "static"), render_static_script(self, wallpaper_paths)
+    )
+    return reduced_changed or static_changed
+
+
+def build_active_plan(self, wallpaper_paths):
+    """Launch plan of the power profile in use (None for static, which runs no engine)"""
+    from Scripts.launch_plan import build_launch_plan
+
+    profile = getattr(self, "power_profile", "full")
+    if profile == "static":
+        return None
+    max_fps = get_power_settings(self)["reduced_fps"] if profile == "reduced" else None
+    return build_launch_plan(self, wallpaper_paths, max_fps)
+
+
+class PowerProfileManager:
+    """
+    Switches between the precomputed power profile scripts when the AC or battery
+    state changes. Driven by power_supply kernel uevents, with polling as fallback.
+    """
+
+    def __init__(self, state, read_state=read_power_state, clock=time.monotonic, switch_func=None):
+        self.state = state
+        self.read_state = read_state
+        self.clock = clock
+        self.switch_func = switch_func or switch_power_profile
+        self._lock = threading.Lock()
+        self._last_switch = None
+        self._pending_timer = None
+        self._listener = None
+        self._poll_stop = threading.Event()
+        if not hasattr(state, "power_profile"):
+            state.power_profile = "full"
+
+    def start(self):
+        from System.uevents import UeventListener
+
+        try:
+            self._listener = UeventListener(["power_supply"], lambda event: self.evaluate())
+            self._listener.start()
+        except OSError as e:
+            print(f"Power supply uevents unavailable ({e}), polling every {POLL_SECONDS:.0f} s")
+            threading.Thread(target=self._poll, name="power-poll", daemon=True).start()
+        # A switch restarts the engine and waits until it is ready: not on the caller's (GUI) thread
+        threading.Thread(target=self._evaluate_initial, name="power-evaluate", daemon=True).start()
+        return self
+
+    def _evaluate_initial(self):
+        try:
+            self.evaluate()
+        except Exception as e:
+            print(f"Power profile error: {e}")
+
+    def _poll(self):
+        while not self._poll_stop.wait(POLL_SECONDS):
+            self.evaluate()
+
+    def evaluate(self):
+        """Re-read the power state and switch profile if needed. Returns the active profile"""
+        with self._lock:
+            current = self.state.power_profile
+            target = choose_profile(get_power_settings(self.state), self.read_state(), current)
+            if target == current:
+                return current
+            if self._last_switch is not None:
+                remaining = MIN_DWELL_SECONDS - (self.clock() - self._last_switch)
+                if remaining > 0:
+                    # Too soon after the last switch: evaluate again once the dwell time is over
+                    if self._pending_timer is None:
+                        self._pending_timer = threading.Timer(remaining, self._evaluate_pending)
+                        self._pending_timer.daemon = True
+                        self._pending_timer.start()
+                    return current
+            self._last_switch = self.clock()
+            print(f"Power profile: {current} -> {target}")
+            self.switch_func(self.state, target)
+            # Still the previous profile if the new one did not start
+            return self.state.power_profile
+
+    def _evaluate_pending(self):
+        self._pending_timer = None
+        self.evaluate()
+
+    def stop(self):
+        if self._listener:
+            self._listener.stop()
+        self._poll_stop.set()
+        if self._pending_timer:
+            self._pending_timer.cancel()
+
+
+def switch_power_profile(self, profile):
+    """
+    Restart what runs with the precomputed script of the given profile; nothing is started
+    when nothing was running. If the profile does not start, the previous one is restored.
+    Runs under the apply lock, so it never interleaves with an apply of the GUI or the control socket.
+    Returns True if the profile is in use.
+    """
+    from Scripts.apply_queue import get_apply_lock
+    from Scripts.config_setter import get_assigned_wallpaper_paths, snapshot_scripts
+    from Wallpaper_Engine.process_manager import check_wallpaper_process, stop_wallpaper_engine, \
+        start_wallpaper_engine
+
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown power profile: {profile}")
+    if profile != "full" and not os.path.exists(get_profile_script_path(self, profile)):
+        print(f"Power profile script for '{profile}' not generated yet, staying on full")
+        profile = "full"
+    with get_apply_lock(self):
+        previous = getattr(self, "power_profile", "full")
+        if profile == previous:
+            return True
+        static_process = getattr(self, "static_wallpaper_process", None)
+        was_running = check_wallpaper_process(self) or (static_process is not None and static_process.poll() is None)
+        self.power_profile = profile
+        if not was_running:
+            # Stopped by the user: the profile is used by the next start
+            return True
+
+        wallpaper_paths, _ = get_assigned_wallpaper_paths(self)
+        stop_wallpaper_engine(self)
+        if start_wallpaper_engine(self):
+            self.running_plan = build_active_plan(self, wallpaper_paths) if wallpaper_paths else None
+            self.last_good_plan = self.running_plan
+            self.last_good_scripts = snapshot_scripts(self)
+            return True
+
+        print(
+            f"Power profile {profile} did not start "
+            f"({getattr(self, 'last_start_reason', 'unknown reason')}), restoring {previous}"
+        )
+        self.power_profile = previous
+        stop_wallpaper_engine(self)
+        if not start_wallpaper_engine(self):
+            self.running_plan = None
+        return False
+
+
+def start_power_profiles(self):
+    """Start the power profile manager for a configurator state (once)"""
+    if getattr(self, "power_profile_manager", None) is None:
+        self.power_profile_manager = PowerProfileManager(self).start()
+    return self.power_profile_manager
@@ -1,10 +1,22 @@
+import os
+import re
 import subprocess
+import time
 
 import psutil
 
+from Files.log_sink import log_fd_variable
+from Wallpaper_Engine.metrics import record_metric
+from Wallpaper_Engine.power_profiles import get_active_script_path
+from Wallpaper_Engine.scheduling import apply_engine_scheduling, find_engine_processes, get_engine_screens
+from Wallpaper_Engine.readiness import get_log_offset, wait_for_engine_ready
+from Wallpaper_Engine.systemd_backend import uses_systemd, is_systemd_available, is_unit_active, stop_unit, start_unit
+
 
 def check_wallpaper_process(self):
     """Check if wallpaper engine is running"""
+    if uses_systemd(self):
+        return is_unit_active()
     try:
         for proc in psutil.process_iter(["pid", "name", "cmdline"]):
             try:
@@ -42,8 +54,17 @@ def check_wallpaper_process(self):
 
 def stop_wallpaper_engine(self):
     """Stop the wallpaper engine process"""
-    import os
-
+    # The static power profile runs an image setter that is not matched below
+    static_process = getattr(self, "static_wallpaper_process", None)
+    if static_process is not None:
+        static_process.terminate()
+        self.static_wallpaper_process = None
+    if uses_systemd(self):
+        # The unit owns its cgroup, stopping it terminates every process in it
+        return stop_unit()
+    # A unit left from the systemd launcher would keep its own engine alive
+    if is_systemd_available() and is_unit_active():
+        stop_unit()
     stopped_processes = []
     current_pid = os.getpid()  # PID del proceso actual (python)
     try:
@@ -80,7 +101,9 @@ def stop_wallpaper_engine(self):
                         f"Stopping process: {proc.info['name']} (PID: {proc.info['pid']})"
                     )
                     proc.terminate()
-                    stopped_processes.append(proc.info["pid"])
+                    # A process suspended by the idle monitor only handles SIGTERM once continued
+                    proc.resume()
+                    stopped_processes.append(proc)
 
             except (
                     psutil.NoSuchProcess,
@@ -89,20 +112,13 @@ def stop_wallpaper_engine(self):
             ):
                 continue
 
-        # Wait for processes to finish
+        # Wait for processes to finish, force termination of the ones still alive
         if stopped_processes:
-            import time
-
-            time.sleep(2)
-
-            # Check if still running and force termination
-            for proc in psutil.process_iter(["pid", "name"]):
+            _, alive = psutil.wait_procs(stopped_processes, timeout=2)
+            for proc in alive:
                 try:
-                    if proc.info["pid"] in stopped_processes and proc.is_running():
-                        proc.kill()
-                        print(
-                            f"Forcing termination of process PID: {proc.info['pid']}"
-                        )
+                    proc.kill()
+                    print(f"Forcing termination of process PID: {proc.pid}")
                 except (
                         psutil.NoSuchProcess,
                         psutil.AccessDenied,
@@ -117,57 +133,108 @@ def stop_wallpaper_engine(self):
         return False
 
 
-def start_wallpaper_engine(self):
-    """Start wallpaper engine in the background"""
-    try:
-        print("Starting wallpaper engine...")
-
-        # Run the script in the background
-        process = subprocess.Popen(
-            [self.script_path],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            start_new_session=True,
-        )
-
-        print(f"Script started with PID: {process.pid}")
-
-        # Wait longer for the script to execute (it has sleep 5)
-        import time
-
-        print("Waiting for the script to initialize...")
-
-        # Try to detect the process with longer intervals
-        for attempt in range(15):  # 15 attempts over 15 seconds
-            time.sleep(1)  # Wait 1 second between attempts
-
-            if check_wallpaper_process(self):
-                print(
-                    f"✓ Wallpaper engine detected successfully (attempt {attempt + 1})"
-                )
-                return True
-
-            # Show progress every 3 attempts
-            if attempt % 3 == 2:
-                print(f"Waiting... ({attempt + 1}/15 attempts)")
-
-        # If we reach here, it was not detected in 15 seconds
-        print("⚠ Wallpaper engine not detected in 15 seconds")
-
-        # Check if the bash script is still running
+def stop_engine_screens(self, screens):
+    """Stop only the engines rendering the given screens (one engine per Screen mode)"""
+    stopped = []
+    for proc in find_engine_processes():
+        if set(get_engine_screens(proc)) & set(screens):
+            try:
+                print(f"Stopping engine of {', '.join(get_engine_screens(proc))} (PID: {proc.pid})")
+                proc.terminate()
+                proc.resume()
+                stopped.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    _, alive = psutil.wait_procs(stopped, timeout=2)
+    for proc in alive:
         try:
-            if process.poll() is None:  # The process is still running
-                print(
-                    "✓ The script is still running, probably started successfully"
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return len(stopped) > 0
+
+
+def open_engine_log_pipes(self, script_path, screen=None):
+    """
+    Pipes from the engines to the configurator's log sink, as ({variable: fd}, fds to close after the start):
+    one per Screen when each Screen runs its own engine, else one for the engine.
+    Empty without a log sink, the script then appends to the log file itself.
+    """
+    sink = getattr(self, "log_sink", None)
+    if sink is None:
+        return {}
+    try:
+        with open(script_path, "r") as f:
+            content = f.read()
+    except OSError:
+        return {}
+    if re.search(r"# Processes: per_screen", content):
+        screens = [screen] if screen else re.findall(r"--screen-root\s+([\w-]+)", content)
+        return {log_fd_variable(name): sink.open_pipe(name) for name in screens}
+    return {log_fd_variable(): sink.open_pipe()}
+
+
+def start_wallpaper_engine(self, screen=None):
+    """
+    Start wallpaper engine in the background and wait until it is actually up.
+    With a screen, only that Screen's engine is started (one engine per Screen mode).
+    """
+    try:
+        print(f"Starting wallpaper engine{f' for {screen}' if screen else ''}...")
+        started = time.monotonic()
+        log_offset = get_log_offset()
+        script_path = get_active_script_path(self)
+        static = getattr(self, "power_profile", "full") == "static"
+
+        if uses_systemd(self) and not screen:
+            process = start_unit(self)
+            print(f"Systemd unit started with main PID: {process.pid}")
+        else:
+            # The configurator only runs inside a ready session, skip the login wait
+            env = os.environ.copy()
+            env["WPE_SKIP_STARTUP_WAIT"] = "1"
+            # The engine output goes through pipes to the log sink, instead of a tee per engine
+            log_pipes = {} if static else open_engine_log_pipes(self, script_path, screen)
+            if log_pipes:
+                env["WPE_LOG_SINK"] = "1"
+                env.update({variable: str(fd) for variable, fd in log_pipes.items()})
+
+            # Run the script in the background
+            try:
+                process = subprocess.Popen(
+                    [script_path] + ([screen] if screen else []),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                    env=env,
+                    pass_fds=tuple(log_pipes.values()),
                 )
-                return True
-            else:
-                print("✗ The script ended unexpectedly")
-                return False
-        except:
-            print("✓ Assuming successful start")
+            finally:
+                # The script and its engines hold the write ends now
+                for fd in log_pipes.values():
+                    os.close(fd)
+
+            print(f"Script started with PID: {process.pid}")
+            if static:
+                self.static_wallpaper_process = process
+
+        if static:
+            # No engine runs in the static power profile, there is nothing to wait for
+            self.last_start_reason = "static power profile"
+            print("✓ Static wallpaper set (power profile)")
             return True
 
+        ready, reason = wait_for_engine_ready(process, log_offset)
+        latency_ms = (time.monotonic() - started) * 1000
+        self.last_start_reason = reason
+        if ready:
+            record_metric("engine_start_latency_ms", latency_ms)
+            apply_engine_scheduling(self)
+            print(f"✓ Wallpaper engine ready in {latency_ms:.0f} ms ({reason})")
+        else:
+            print(f"✗ Wallpaper engine failed to start: {reason}")
+        return ready
+
     except Exception as e:
         print(f"Error starting wallpaper engine: {e}")
         return False
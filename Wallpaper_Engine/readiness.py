@@ -0,0 +1,117 @@
+import os
+import time
+
+import psutil
+
+LOG_FILE = "/tmp/wallpaper-engine.log"
+
+# Lines printed by linux-wallpaperengine once the renderer is up
+READY_MARKERS = (
+    "Found wallpaper engine's assets",
+    "Using X11",
+    "Using Wayland",
+    "Running with:",
+    "Loaded scene",
+    "Playing video",
+)
+
+# Lines that mean the start failed (script checks or engine errors)
+FAILURE_MARKERS = (
+    "Error: Wallpaper for",
+    "Cannot find a valid assets folder",
+    "Segmentation fault",
+    "terminate called",
+    "Failed to initialize",
+)
+
+
+def get_log_offset(log_file=LOG_FILE):
+    """Return the current size of the log, used as the starting point for tailing"""
+    try:
+        return os.path.getsize(log_file)
+    except OSError:
+        return 0
+
+
+def read_new_log_lines(log_file, offset):
+    """Read complete lines appended to the log since offset. Returns (lines, new_offset)"""
+    try:
+        with open(log_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size < offset:
+                # The log was truncated (e.g. "Clear Logs"), start over
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+
+    # Keep a partial trailing line for the next read
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    lines = data[: end + 1].decode("utf-8", errors="replace").splitlines()
+    return lines, offset + end + 1
+
+
+def engine_processes(process):
+    """Return the linux-wallpaperengine processes spawned by the start script"""
+    if not process.pid:
+        return []
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return []
+    engines = []
+    for child in children:
+        try:
+            if "linux-wallpaperengine" in child.name():
+                engines.append(child)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return engines
+
+
+def wait_for_engine_ready(
+        process,
+        log_offset=0,
+        log_file=LOG_FILE,
+        timeout=15.0,
+        poll_interval=0.1,
+        settle_time=1.5,
+):
+    """
+    Wait until the engine started by the script is actually up.
+    The engine log is tailed for initialization markers; if the engine never prints
+    one, a process that stays alive for settle_time is considered ready.
+    Returns (ready, reason).
+    """
+    deadline = time.monotonic() + timeout
+    alive_since = None
+    offset = log_offset
+
+    while time.monotonic() < deadline:
+        lines, offset = read_new_log_lines(log_file, offset)
+        for line in lines:
+            if any(marker in line for marker in FAILURE_MARKERS):
+                return False, line.strip()
+            if any(marker in line for marker in READY_MARKERS):
+                return True, f"log marker: {line.strip()}"
+
+        if engine_processes(process):
+            if alive_since is None:
+                alive_since = time.monotonic()
+            elif time.monotonic() - alive_since >= settle_time:
+                return True, "engine process alive"
+        else:
+            alive_since = None
+            exit_code = process.poll()
+            if exit_code is not None:
+                return False, f"start script exited with code {exit_code}"
+
+        time.sleep(poll_interval)
+
+    if process.poll() is None:
+        return True, "script still running after timeout"
+    return False, f"engine not detected within {timeout:.0f} seconds"
@@ -0,0 +1,147 @@
+import os
+import re
+
+import psutil
+
+# Per-Screen scheduling options (empty affinity means all CPUs)
+SCHEDULING_DEFAULTS = {
+    "cpu_affinity": "",
+    "process_nice": 0,
+    "sched_policy": "normal",
+    "io_class": "best-effort",
+}
+
+SCHED_POLICIES = {
+    "normal": os.SCHED_OTHER,
+    "batch": os.SCHED_BATCH,
+    "idle": os.SCHED_IDLE,
+}
+
+IO_CLASSES = {
+    "best-effort": psutil.IOPRIO_CLASS_BE,
+    "idle": psutil.IOPRIO_CLASS_IDLE,
+}
+
+# Ordered from least to most background-friendly, used to merge screens sharing one engine
+_POLICY_ORDER = ["normal", "batch", "idle"]
+_IO_ORDER = ["best-effort", "idle"]
+
+# PIDs that already received their scheduling options (cleared when they exit)
+_applied_pids = {}
+
+
+def parse_cpu_list(text):
+    """Parse a CPU list like '0-3,8,10-11' into a set of CPU numbers. Empty text means no restriction"""
+    cpus = set()
+    text = (text or "").strip()
+    if not text:
+        return cpus
+    for part in text.split(","):
+        part = part.strip()
+        match = re.fullmatch(r"(\d+)(?:-(\d+))?", part)
+        if not match:
+            raise ValueError(f"Invalid CPU list entry: '{part}'")
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else first
+        if last < first:
+            raise ValueError(f"Invalid CPU range: '{part}'")
+        cpus.update(range(first, last + 1))
+    available = os.sched_getaffinity(0)
+    if not cpus & available:
+        raise ValueError(f"None of the CPUs {text} are available")
+    return cpus
+
+
+def get_screen_scheduling(self, screen):
+    """Return the scheduling options of a Screen, filled with defaults"""
+    options = SCHEDULING_DEFAULTS.copy()
+    cfg = self.screen_configs.get(screen, {})
+    options.update({k: cfg[k] for k in SCHEDULING_DEFAULTS if k in cfg})
+    return options
+
+
+def merge_scheduling(options_list):
+    """
+    Merge the options of several screens that share one engine process:
+    affinity is the union of the masks, nice/policy/IO class the most background-friendly.
+    """
+    if not options_list:
+        return SCHEDULING_DEFAULTS.copy()
+    masks = [parse_cpu_list(o["cpu_affinity"]) for o in options_list]
+    cpus = set() if any(not m for m in masks) else set().union(*masks)
+    return {
+        "cpus": cpus,
+        "process_nice": max(int(o["process_nice"]) for o in options_list),
+        "sched_policy": max((o["sched_policy"] for o in options_list), key=_POLICY_ORDER.index),
+        "io_class": max((o["io_class"] for o in options_list), key=_IO_ORDER.index),
+    }
+
+
+def get_engine_screens(proc):
+    """Return the screens a linux-wallpaperengine process renders (from its --screen-root args)"""
+    cmdline = proc.info.get("cmdline") if hasattr(proc, "info") else proc.cmdline()
+    cmdline = cmdline or []
+    return [cmdline[i + 1] for i, arg in enumerate(cmdline[:-1]) if arg == "--screen-root"]
+
+
+def find_engine_processes():
+    """Return the running linux-wallpaperengine processes"""
+    engines = []
+    for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+        if proc.info["name"] and "linux-wallpaperengine" in proc.info["name"]:
+            engines.append(proc)
+    return engines
+
+
+def apply_process_scheduling(pid, options):
+    """Apply merged scheduling options to every thread of a process"""
+    try:
+        tids = [int(t) for t in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        tids = [pid]
+    policy = SCHED_POLICIES.get(options["sched_policy"], os.SCHED_OTHER)
+    io_class = IO_CLASSES.get(options["io_class"], psutil.IOPRIO_CLASS_BE)
+    for tid in tids:
+        try:
+            if options["cpus"]:
+                os.sched_setaffinity(tid, options["cpus"] & os.sched_getaffinity(0))
+            os.sched_setscheduler(tid, policy, os.sched_param(0))
+            psutil.Process(tid).ionice(io_class)
+            # Also for 0: the engine may inherit another nice value from its parent.
+            # Last, lowering the inherited value needs privileges and may fail
+            os.setpriority(os.PRIO_PROCESS, tid, int(options["process_nice"]))
+        except (ProcessLookupError, psutil.NoSuchProcess):
+            continue
+        except (PermissionError, psutil.AccessDenied) as e:
+            print(f"Could not apply scheduling to thread {tid} of PID {pid}: {e}")
+
+
+def apply_engine_scheduling(self, only_new=False):
+    """
+    Apply the per-Screen scheduling options to the running engines.
+    With only_new, processes that were already configured are skipped. Returns the PIDs configured.
+    """
+    configured = []
+    alive = set()
+    for proc in find_engine_processes():
+        alive.add(proc.pid)
+        try:
+            create_time = proc.create_time()
+        except psutil.Error:
+            continue
+        if only_new and _applied_pids.get(proc.pid) == create_time:
+            continue
+        screens = get_engine_screens(proc) or list(self.detected_screens)
+        try:
+            options = merge_scheduling([get_screen_scheduling(self, s) for s in screens])
+        except ValueError as e:
+            print(f"Invalid scheduling options for {', '.join(screens)}: {e}")
+            continue
+        apply_process_scheduling(proc.pid, options)
+        _applied_pids[proc.pid] = create_time
+        configured.append(proc.pid)
+        print(f"Scheduling applied to engine PID {proc.pid} ({', '.join(screens)})")
+    for pid in list(_applied_pids):
+        if pid not in alive:
+            del _applied_pids[pid]
+    return configured
@@ -0,0 +1,45 @@
+import threading
+
+from Wallpaper_Engine.metrics import record_metric
+from Wallpaper_Engine.scheduling import apply_engine_scheduling
+
+
+class EngineSupervisor(threading.Thread):
+    """
+    Background thread that watches the engine processes and re-applies the
+    per-Screen scheduling options whenever an engine is (re)started outside
+    the configurator, e.g. by the login script or systemd Restart=.
+    """
+
+    def __init__(self, state, interval=5.0):
+        super().__init__(name="engine-supervisor", daemon=True)
+        self.state = state
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                if apply_engine_scheduling(self.state, only_new=True):
+                    record_metric("engine_processes_configured", 1)
+            except Exception as e:
+                print(f"Engine supervisor error: {e}")
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def wake(self):
+        """Check the engines now instead of waiting for the next interval"""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+
+def start_supervisor(self):
+    """Start the engine supervisor for a configurator state (once)"""
+    if getattr(self, "engine_supervisor", None) is None:
+        self.engine_supervisor = EngineSupervisor(self)
+        self.engine_supervisor.start()
+    return self.engine_supervisor
@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+
+from Files.config_files import write_file_atomic
+from Wallpaper_Engine.power_profiles import get_active_script_path
+
+UNIT_NAME = "wallpaper-engine.service"
+
+# Default resource limits (0 means "no limit" for CPU quota and memory)
+LAUNCHER_DEFAULTS = {
+    "launcher": "script",
+    "cpu_quota": 0,
+    "memory_max": 0,
+    "io_weight": 100,
+    "nice": 0,
+}
+
+# Session variables the engine needs inside the user manager
+SESSION_VARIABLES = ["DISPLAY", "WAYLAND_DISPLAY", "XAUTHORITY", "XDG_RUNTIME_DIR", "XDG_SESSION_TYPE"]
+
+
+def get_launcher_settings(self):
+    """Return the launcher settings (global keys, taken from the first Screen config)"""
+    settings = LAUNCHER_DEFAULTS.copy()
+    for screen in getattr(self, "detected_screens", []):
+        cfg = self.screen_configs.get(screen)
+        if cfg:
+            settings.update({k: cfg[k] for k in LAUNCHER_DEFAULTS if k in cfg})
+            break
+    return settings
+
+
+def uses_systemd(self):
+    """True when the engine should be managed as a systemd user unit"""
+    return get_launcher_settings(self)["launcher"] == "systemd" and is_systemd_available()
+
+
+def is_systemd_available():
+    """Check that systemctl exists and a systemd user manager is running"""
+    return bool(shutil.which("systemctl")) and os.path.isdir(f"/run/user/{os.getuid()}/systemd")
+
+
+def get_unit_path():
+    """Get the systemd user unit path"""
+    unit_dir = os.path.expanduser("~/.config/systemd/user")
+    os.makedirs(unit_dir, exist_ok=True)
+    return os.path.join(unit_dir, UNIT_NAME)
+
+
+def systemctl(*args):
+    """Run `systemctl --user` with the given arguments"""
+    return subprocess.run(
+        ["systemctl", "--user", *args], capture_output=True, text=True
+    )
+
+
+def render_unit(self):
+    """Render the service unit that runs the start script with the configured resource limits"""
+    s = get_launcher_settings(self)
+    lines = [
+        "# Automatically generated file by WallpaperEngineConfigurator.py",
+        "# Do not edit manually - changes will be overwritten",
+        "[Unit]",
+        "Description=Linux Wallpaper Engine",
+        "PartOf=graphical-session.target",
+        "After=graphical-session.target",
+        "",
+        "[Service]",
+        "Type=simple",
+        f"ExecStart={get_active_script_path(self)}",
+        "KillMode=control-group",
+        "Restart=on-failure",
+        "RestartSec=2",
+    ]
+    if s["cpu_quota"]:
+        lines.append(f"CPUQuota={int(s['cpu_quota'])}%")
+    if s["memory_max"]:
+        lines.append(f"MemoryMax={int(s['memory_max'])}M")
+    lines.append(f"IOWeight={int(s['io_weight'])}")
+    lines.append(f"Nice={int(s['nice'])}")
+    lines += ["", "[Install]", "WantedBy=graphical-session.target", ""]
+    return "\n".join(lines)
+
+
+def write_unit_file(self):
+    """Write the unit file and reload the user manager only if the content changed"""
+    unit_path = get_unit_path()
+    content = render_unit(self)
+    try:
+        with open(unit_path, "r") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    # systemd may read the unit at any time (daemon-reload of another program)
+    write_file_atomic(unit_path, content)
+    systemctl("daemon-reload")
+    print(f"Systemd unit written: {unit_path}")
+    return True
+
+
+def is_unit_active():
+    """Check if the wallpaper engine unit is running"""
+    return systemctl("is-active", "--quiet", UNIT_NAME).returncode == 0
+
+
+def stop_unit():
+    """Stop the wallpaper engine unit. Returns True if it was running"""
+    was_active = is_unit_active()
+    if was_active:
+        systemctl("stop", UNIT_NAME)
+    return was_active
+
+
+def start_unit(self):
+    """Write the unit if needed and (re)start it. Returns a process-like handle for readiness checks"""
+    write_unit_file(self)
+    present = [name for name in SESSION_VARIABLES if os.environ.get(name)]
+    if present:
+        systemctl("import-environment", *present)
+    result = systemctl("restart", UNIT_NAME)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"systemctl restart {UNIT_NAME} failed")
+    return UnitProcess()
+
+
+def set_unit_enabled(enabled):
+    """Enable or disable the unit at login"""
+    result = systemctl("enable" if enabled else "disable", UNIT_NAME)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+
+
+def is_unit_enabled():
+    return systemctl("is-enabled", "--quiet", UNIT_NAME).returncode == 0
+
+
+class UnitProcess:
+    """Minimal Popen-like view of the unit main process (pid and poll) for the readiness probe"""
+
+    def __init__(self):
+        result = systemctl("show", "-p", "MainPID", "--value", UNIT_NAME)
+        try:
+            self.pid = int(result.stdout.strip() or 0)
+        except ValueError:
+            self.pid = 0
+
+    def poll(self):
+        if is_unit_active():
+            return None
+        result = systemctl("show", "-p", "ExecMainStatus", "--value", UNIT_NAME)
+        try:
+            return int(result.stdout.strip() or 1)
+        except ValueError:
+            return 1
@@ -0,0 +1,63 @@
+import json
+import types
+
+import Files.config_files as config_files
+
+# A start script of an install from before the config store
+SCRIPT = """#!/bin/bash
+# FPS: requested=48
+WALLPAPER1="{base}/111"
+WALLPAPER2="{base}/222"
+
+linux-wallpaperengine \\
+ --scaling fit \\
+ --screen-root DP-1 \\
+ --bg "$WALLPAPER1" \\
+ --set-property color="1 0 0" \\
+ --set-property speed=2 \\
+ --scaling fill \\
+ --screen-root HDMI-A-1 \\
+ --bg "$WALLPAPER2" \\
+ --fps 48 \\
+2>&1
+"""
+
+
+def make_state(tmp_path):
+    return types.SimpleNamespace(
+        detected_screens=["DP-1", "HDMI-A-1"],
+        selected_wallpapers={},
+        screen_configs={},
+        wallpapers={"111": {}, "222": {}},
+        wallpaper_base_path=str(tmp_path / "workshop"),
+        script_path=str(tmp_path / "start-wallpaperengine.sh"),
+    )
+
+
+def test_settings_are_imported_from_the_script_without_a_store(tmp_path, monkeypatch):
+    store = tmp_path / "wallpaperengine_config.json"
+    monkeypatch.setattr(config_files, "get_config_path", lambda: str(store))
+    state = make_state(tmp_path)
+    with open(state.script_path, "w") as f:
+        f.write(SCRIPT.format(base=state.wallpaper_base_path))
+
+    config_files.load_current_config(state)
+
+    assert state.selected_wallpapers == {"DP-1": "111", "HDMI-A-1": "222"}
+    assert state.screen_configs["DP-1"]["fps"] == 48
+    assert state.screen_configs["DP-1"]["properties"] == {"color": "1 0 0", "speed": "2"}
+    assert state.screen_configs["HDMI-A-1"]["properties"] == {}
+    saved = json.loads(store.read_text())
+    assert saved["version"] == config_files.CONFIG_VERSION
+    assert saved["selected_wallpapers"] == state.selected_wallpapers
+
+
+def test_the_placeholder_script_assigns_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_files, "get_config_path", lambda: str(tmp_path / "wallpaperengine_config.json"))
+    state = make_state(tmp_path)
+    with open(state.script_path, "w") as f:
+        f.write(SCRIPT.format(base="/path/to/default"))
+
+    config_files.load_current_config(state)
+
+    assert state.selected_wallpapers == {"DP-1": None, "HDMI-A-1": None}
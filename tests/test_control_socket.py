@@ -0,0 +1,46 @@
+import types
+
+import pytest
+
+from Control import control_socket
+from Control.control_socket import execute_operation
+
+
+@pytest.fixture
+def state(monkeypatch):
+    saves = []
+    monkeypatch.setattr(control_socket, "save_current_config", lambda state: saves.append(state))
+    return types.SimpleNamespace(detected_screens=["DP-1"], screen_configs={}, saves=saves)
+
+
+@pytest.mark.parametrize("config", [
+    {"fsp": 30},
+    {"fps": "30"},
+    {"fps": True},
+    {"silent": 1},
+    {"clamp": "mirror"},
+    {"process_mode": "per-screen"},
+    {"sched_policy": "fifo"},
+    {"playlist": ["a", 1]},
+    {"playlist_times": ["25:00"]},
+    {"cpu_affinity": "0-x"},
+    {"properties": {"a b": 1}},
+])
+def test_invalid_config_is_rejected_before_saving(state, config):
+    with pytest.raises(ValueError):
+        execute_operation(state, {"op": "set_config", "screen": "DP-1", "config": config})
+    assert state.screen_configs == {}
+    assert state.saves == []
+
+
+def test_valid_config_and_properties_are_saved(state):
+    execute_operation(state, {"op": "set_config", "screen": "DP-1", "config": {"fps": 60, "clamp": "repeat"}})
+    execute_operation(state, {"op": "set_properties", "screen": "DP-1", "properties": {"speed": 2, "text": "a b"}})
+    assert state.screen_configs["DP-1"] == {"fps": 60, "clamp": "repeat", "properties": {"speed": 2, "text": "a b"}}
+    assert len(state.saves) == 2
+
+
+def test_invalid_property_value_is_rejected(state):
+    with pytest.raises(ValueError):
+        execute_operation(state, {"op": "set_properties", "screen": "DP-1", "properties": {"color": [1, 0, 0]}})
+    assert state.saves == []
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from Screen.backends import FIXTURES_PATH, ReplayBackend, add_monitor_identities, list_fixtures, parse_xrandr
+from Screen.drm import DrmConnector, EdidInfo
+from Screen.topology import Monitor, build_topology
+
+# The topology each recorded output must give: names, layout geometry (rotated and
+# scaled), refresh rate, primary and identity; disconnected and disabled outputs are skipped
+EXPECTED = {
+    "disconnected.xrandr": [
+        Monitor("eDP-1", 0, 0, 1920, 1200, 60.0, primary=True),
+    ],
+    "dual.swaymsg": [
+        Monitor("DP-1", 0, 0, 2048, 1152, 59.951, primary=True, identity="Dell Inc.-DELL U2719D-8JRLS13"),
+        Monitor("HDMI-A-1", 2048, 0, 1080, 1920, 60.0, identity="Goldstar Company Ltd-LG ULTRAFINE-0x0000B2A4"),
+    ],
+    "dual.wlr-randr": [
+        Monitor("DP-1", 0, 0, 2048, 1152, 59.951),
+        Monitor("HDMI-A-1", 2048, 0, 1920, 1080, 60.0),
+    ],
+    "dual.xrandr": [
+        Monitor("DP-1", 0, 0, 2560, 1440, 143.97, primary=True, identity="DEL-A0C4-8JRLS13"),
+        Monitor("HDMI-1", 2560, 360, 1920, 1080, 60.0, identity="GSM-5B08-0000B2A4"),
+    ],
+    "rotated.wlr-randr": [
+        Monitor("HDMI-A-1", 1920, 0, 1080, 1920, 60.0),
+        Monitor("eDP-1", 0, 840, 1920, 1080, 60.008),
+    ],
+    "rotated.xrandr": [
+        Monitor("DP-1", 0, 420, 1920, 1080, 60.0, primary=True),
+        Monitor("HDMI-1", 1920, 0, 1080, 1920, 60.0),
+    ],
+    "xrdp.xrandr": [
+        Monitor("rdp0", 0, 0, 1920, 1080, 50.0, primary=True),
+    ],
+}
+
+
+def test_every_fixture_has_an_expected_topology():
+    assert sorted(os.path.basename(path) for path in list_fixtures()) == sorted(EXPECTED)
+
+
+@pytest.mark.parametrize("fixture", sorted(EXPECTED))
+def test_fixture_topology(fixture):
+    backend = ReplayBackend(os.path.join(FIXTURES_PATH, fixture))
+    topology = build_topology(backend.name, backend.detect())
+    assert topology.method == fixture.split(".", 1)[1]
+    assert topology.monitors == EXPECTED[fixture]
+
+
+def test_xrandr_edid_at_the_end_of_the_output():
+    with open(os.path.join(FIXTURES_PATH, "dual.xrandr"), encoding="utf-8") as f:
+        text = f.read()
+    # Cut right after the EDID of HDMI-1, without a trailing newline
+    text = text[:text.index("\tscaling mode", text.index("HDMI-1 connected"))].rstrip("\n")
+    monitors = parse_xrandr(text)
+    assert [m.identity for m in monitors] == ["DEL-A0C4-8JRLS13", "GSM-5B08-0000B2A4"]
+
+
+def connector(name, identity_serial, status="connected"):
+    edid = EdidInfo(vendor="DEL", product=0xA0C4, serial=identity_serial)
+    return DrmConnector(name=name, status=status, enabled=True, modes=(), edid=edid)
+
+
+def test_drm_identities_are_matched_by_connector_name():
+    monitors = [Monitor("DP-1"), Monitor("HDMI-A-1"), Monitor("DP-2")]
+    connectors = [connector("DP-1", 1), connector("HDMI-A-1", 2), connector("DP-2", 3, status="disconnected")]
+    assert [m.identity for m in add_monitor_identities(monitors, connectors)] == [
+        "DEL-A0C4-00000001", "DEL-A0C4-00000002", None,
+    ]
+
+
+def test_drm_names_of_several_gpus_are_not_matched():
+    monitors = [Monitor("DP-1")]
+    connectors = [connector("DP-1", 1), connector("DP-1", 2)]
+    assert add_monitor_identities(monitors, connectors)[0].identity is None
@@ -0,0 +1,122 @@
+import signal
+import types
+
+from Wallpaper_Engine.idle_monitor import IdleMonitor, SimulatedIdleSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSignals:
+    """signal_func of the monitor: records the signals and pretends engine PIDs 11 and 12 run"""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, sig, pids=None):
+        self.sent.append((sig, pids))
+        return [11, 12] if pids is None else list(pids)
+
+
+def make_monitor(idle_timeout, engine_pids=(11, 12)):
+    clock = FakeClock()
+    source = SimulatedIdleSource(clock)
+    signals = RecordingSignals()
+    state = types.SimpleNamespace(detected_screens=["DP-1"], screen_configs={"DP-1": {"idle_timeout": idle_timeout}})
+    monitor = IdleMonitor(state, source=source, clock=clock, signal_func=signals, pids_func=lambda: list(engine_pids))
+    return monitor, source, clock, signals
+
+
+def test_suspends_after_the_timeout():
+    monitor, source, clock, signals = make_monitor(60)
+    source.set_idle(59)
+    delay = monitor.check()
+    assert signals.sent == []
+    assert not monitor.suspended
+    # Nothing can change before the timeout is reached
+    assert delay == 1
+
+    source.set_idle(60)
+    assert monitor.check() == source.poll_interval
+    assert signals.sent == [(signal.SIGSTOP, None)]
+    assert monitor.suspended
+
+    # Still idle: no second SIGSTOP
+    clock.now += 30
+    monitor.check()
+    assert signals.sent == [(signal.SIGSTOP, None)]
+
+
+def test_engines_started_while_suspended_are_stopped_and_resumed():
+    engine_pids = [11, 12]
+    monitor, source, clock, signals = make_monitor(60, engine_pids)
+    source.set_idle(120)
+    monitor.check()
+    # A playlist rotation replaced engine 12 by engine 13
+    engine_pids[1:] = [13]
+    clock.now += 0.5
+    monitor.check()
+    assert signals.sent == [(signal.SIGSTOP, None)]
+    # The process table is scanned once a second
+    clock.now += 0.5
+    monitor.check()
+    assert signals.sent[-1] == (signal.SIGSTOP, [13])
+    clock.now += 1
+    monitor.check()
+    assert len(signals.sent) == 2
+
+    source.set_idle(0)
+    monitor.check()
+    assert signals.sent[-1] == (signal.SIGCONT, [11, 12, 13])
+
+
+def test_resumes_the_suspended_pids_on_activity():
+    monitor, source, clock, signals = make_monitor(60)
+    source.set_idle(120)
+    monitor.check()
+    clock.now += 5
+    source.set_idle(0)
+    monitor.check()
+    assert signals.sent == [(signal.SIGSTOP, None), (signal.SIGCONT, [11, 12])]
+    assert not monitor.suspended
+
+
+def test_a_locked_session_suspends_before_the_timeout():
+    monitor, source, clock, signals = make_monitor(600)
+    source.set_locked(True)
+    monitor.check()
+    assert signals.sent == [(signal.SIGSTOP, None)]
+    source.set_locked(False)
+    monitor.check()
+    assert signals.sent[-1] == (signal.SIGCONT, [11, 12])
+
+
+def test_no_signals_when_the_timeout_is_zero():
+    monitor, source, clock, signals = make_monitor(0)
+    source.set_idle(10_000)
+    source.set_locked(True)
+    assert monitor.check() == 5.0
+    assert signals.sent == []
+
+
+def test_no_signals_without_an_idle_source():
+    monitor, source, clock, signals = make_monitor(60)
+    monitor.source = None
+    monitor.check()
+    assert signals.sent == []
+
+
+def test_disabling_the_timeout_resumes_a_suspended_engine():
+    monitor, source, clock, signals = make_monitor(60)
+    source.set_idle(120)
+    monitor.check()
+    monitor.state.screen_configs["DP-1"]["idle_timeout"] = 0
+    monitor.check()
+    assert signals.sent == [(signal.SIGSTOP, None), (signal.SIGCONT, [11, 12])]
+    monitor.check()
+    assert len(signals.sent) == 2
@@ -0,0 +1,51 @@
+import subprocess
+import types
+
+from Scripts.launch_plan import build_launch_plan, render_launch_plan
+from Scripts.start_script import load_assignments_from_script, load_config_from_script
+
+# Values that would run commands or break the script if pasted into bash unquoted
+HOSTILE = "$(touch pwned) `id`; \"it's\" \\"
+
+
+def make_state(tmp_path, config):
+    return types.SimpleNamespace(
+        detected_screens=["DP-1"],
+        selected_wallpapers={"DP-1": "111"},
+        screen_configs={"DP-1": config},
+        wallpaper_base_path=str(tmp_path / "work shop"),
+        script_path=str(tmp_path / "start-wallpaperengine.sh"),
+    )
+
+
+def render(state):
+    paths = {"DP-1": f"{state.wallpaper_base_path}/111"}
+    content = render_launch_plan(build_launch_plan(state, paths))
+    with open(state.script_path, "w") as f:
+        f.write(content)
+    return content
+
+
+def test_values_are_quoted_and_read_back(tmp_path):
+    state = make_state(tmp_path, {"properties": {"text": HOSTILE, "speed": 2}})
+    render(state)
+    subprocess.run(["bash", "-n", state.script_path], check=True)
+
+    assert load_assignments_from_script(state) == {"DP-1": "111"}
+    assert load_config_from_script(state)["DP-1"]["properties"] == {"text": HOSTILE, "speed": "2"}
+
+
+def test_invalid_choices_and_property_names_are_dropped(tmp_path):
+    state = make_state(tmp_path, {
+        "scaling": "fill; reboot",
+        "clamp": "$(reboot)",
+        "process_mode": "per_screen",
+        "fps": "60",
+        "properties": {"a b": 1, "ok": 1},
+    })
+    plan = build_launch_plan(state, {"DP-1": "/wallpapers/111"})
+    assert plan.screens[0].scaling == "fill"
+    assert plan.screens[0].properties == {"ok": 1}
+    assert plan.options.clamp == "border"
+    assert plan.options.process_mode == "per_screen"
+    assert plan.options.fps == 30
@@ -0,0 +1,156 @@
+import datetime
+import types
+
+from Wallpaper_Engine.playlists import PREWARM_SECONDS, PlaylistScheduler
+
+
+class FakeTimer:
+    """Stands in for threading.Timer: started timers are recorded and fired by hand"""
+
+    def __init__(self, created, delay, func, args):
+        self.delay = delay
+        self.func = func
+        self.args = args
+        self.daemon = False
+        self.started = False
+        self.cancelled = False
+        created.append(self)
+
+    def start(self):
+        self.started = True
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        self.func(*self.args)
+
+
+def local_timestamp(hour, minute):
+    return datetime.datetime(2026, 3, 2, hour, minute).timestamp()
+
+
+class Harness:
+    """A scheduler driven by a fake clock and fake timers, recording rotations and prewarms"""
+
+    def __init__(self, screen_configs, selected, now=None):
+        self.state = types.SimpleNamespace(
+            detected_screens=list(screen_configs),
+            screen_configs=screen_configs,
+            selected_wallpapers=dict(selected),
+        )
+        self.now = local_timestamp(12, 0) if now is None else now
+        self.timers = []
+        self.rotations = []
+        self.prewarmed = []
+        self.scheduler = PlaylistScheduler(
+            self.state,
+            self.rotate,
+            clock=lambda: self.now,
+            timer_factory=lambda delay, func, args: FakeTimer(self.timers, delay, func, args),
+            prewarm_func=lambda state, wallpaper_id: self.prewarmed.append(wallpaper_id),
+        )
+
+    def rotate(self, screen, wallpaper_id):
+        self.rotations.append((screen, wallpaper_id))
+        self.state.selected_wallpapers[screen] = wallpaper_id
+
+    def live(self, screen=None):
+        return [t for t in self.timers if not t.cancelled and (screen is None or t.args[0] == screen)]
+
+    def pending(self, screen, name):
+        """The live timer of a screen that calls the named scheduler method"""
+        matches = [t for t in self.live(screen) if t.func.__name__ == name]
+        assert len(matches) == 1
+        return matches[0]
+
+    def rotate_next(self, screen):
+        timer = self.pending(screen, "_rotate")
+        # The timer fired: it is done, as threading.Timer would be
+        timer.cancelled = True
+        timer.fire()
+        return timer
+
+
+def interval(items, minutes=30):
+    return {"playlist": items, "playlist_mode": "interval", "playlist_interval": minutes}
+
+
+def test_interval_rotation_order_per_screen():
+    h = Harness(
+        {"DP-1": interval(["a", "b", "c"]), "HDMI-A-1": interval(["x", "y"], 10)},
+        {"DP-1": "a", "HDMI-A-1": None},
+    )
+    h.scheduler.start()
+    assert all(t.started and t.daemon for t in h.timers)
+    assert h.pending("DP-1", "_rotate").delay == 30 * 60
+    assert h.pending("HDMI-A-1", "_rotate").delay == 10 * 60
+
+    for _ in range(4):
+        h.rotate_next("DP-1")
+    # Starts after the item on screen and wraps around
+    assert [w for s, w in h.rotations if s == "DP-1"] == ["b", "c", "a", "b"]
+
+    for _ in range(3):
+        h.rotate_next("HDMI-A-1")
+    # Nothing from the playlist on screen: starts with the first item
+    assert [w for s, w in h.rotations if s == "HDMI-A-1"] == ["x", "y", "x"]
+
+
+def test_interval_handling():
+    h = Harness(
+        {"DP-1": interval(["a", "b"], 0), "HDMI-A-1": interval(["x"])},
+        {"DP-1": "a", "HDMI-A-1": "x"},
+    )
+    h.scheduler.start()
+    # At least a minute between rotations
+    assert h.pending("DP-1", "_rotate").delay == 60
+    # A single item never rotates
+    assert h.live("HDMI-A-1") == []
+
+    # A changed interval reschedules the screen, without the old timers
+    old = h.live("DP-1")
+    h.state.screen_configs["DP-1"]["playlist_interval"] = 5
+    h.scheduler.reschedule()
+    assert all(t.cancelled for t in old)
+    assert h.pending("DP-1", "_rotate").delay == 5 * 60
+
+    # A timer of the old schedule that fires anyway does nothing
+    old[-1].fire()
+    assert h.rotations == []
+
+
+def test_prewarm_fires_before_the_rotation():
+    h = Harness({"DP-1": interval(["a", "b"])}, {"DP-1": "a"})
+    h.scheduler.start()
+    prewarm = h.pending("DP-1", "_prewarm")
+    rotate = h.pending("DP-1", "_rotate")
+    assert prewarm.delay == rotate.delay - PREWARM_SECONDS
+    prewarm.fire()
+    assert h.prewarmed == ["b"]
+    assert h.rotations == []
+    h.rotate_next("DP-1")
+    assert h.rotations == [("DP-1", "b")]
+
+
+def test_time_of_day_shows_the_current_slot_then_waits_for_the_next():
+    config = {"playlist": ["day", "night"], "playlist_mode": "time_of_day", "playlist_times": ["08:00", "20:00"]}
+    # 07:30 is still in yesterday's 20:00 slot
+    h = Harness({"DP-1": config}, {"DP-1": "day"}, now=local_timestamp(7, 30))
+    h.scheduler.start()
+    assert h.pending("DP-1", "_rotate").delay == 0
+    h.rotate_next("DP-1")
+    assert h.rotations == [("DP-1", "night")]
+    assert h.pending("DP-1", "_rotate").delay == 30 * 60
+    assert h.pending("DP-1", "_prewarm").delay == 30 * 60 - PREWARM_SECONDS
+
+
+def test_stop_cancels_every_timer():
+    h = Harness(
+        {"DP-1": interval(["a", "b"]), "HDMI-A-1": interval(["x", "y"])},
+        {"DP-1": "a", "HDMI-A-1": "x"},
+    )
+    h.scheduler.start()
+    assert len(h.live()) == 4
+    h.scheduler.stop()
+    assert h.timers and all(t.cancelled for t in h.timers)